@@ -0,0 +1,140 @@
+"""
+Recall@k and memory of the reduced-precision fact index against exact float32.
+
+Facts are synthetic clustered unit vectors (topics with paraphrase-like noise),
+queries are perturbed copies of random facts.  The vectors are written to a
+real embedding sidecar and memory file, and every query goes through
+``SemanticMemory.search`` -- the path recall uses -- once per precision with
+and without exact float32 rescoring.  The script reports index size,
+recall@k and mean query latency.
+
+    python benchmarks/embedding_precision.py --facts 100000 --dim 384
+    python benchmarks/embedding_precision.py --set ann_index=true --set ann_min_facts=20000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.config import Settings  # noqa: E402
+from src.embeddings import EmbeddingStore  # noqa: E402
+from src.memory import create_memory  # noqa: E402
+from src.quantize import PRECISIONS  # noqa: E402
+import src.semantic  # noqa: E402
+
+# Rows written to the sidecar per append.
+WRITE_BLOCK = 16384
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    return (x / np.linalg.norm(x, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def make_data(n: int, dim: int, queries: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    topics = _unit(rng.standard_normal((max(1, n // 50), dim)))
+    noise = 2.0 / np.sqrt(dim)
+    facts = _unit(topics[rng.integers(len(topics), size=n)] + noise * rng.standard_normal((n, dim)))
+    qs = _unit(facts[rng.integers(n, size=queries)] + noise * rng.standard_normal((queries, dim)))
+    return facts, qs
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top])]
+
+
+def fact_id(i: int) -> str:
+    return f"fact-{i:07d}"
+
+
+def parse_override(text: str) -> Tuple[str, Any]:
+    key, _, value = text.partition("=")
+    lowered = value.strip().lower()
+    if lowered in ("true", "false"):
+        return key.strip(), lowered == "true"
+    for cast in (int, float):
+        try:
+            return key.strip(), cast(value)
+        except ValueError:
+            pass
+    return key.strip(), value
+
+
+def make_settings(directory: Path, overrides: Dict[str, Any]) -> Settings:
+    cfg = Settings()
+    values = {"memory_path": str(directory / "memory.json"), "embedding_cache_size": 0, **overrides}
+    for key, value in values.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def populate(cfg: Settings, facts: np.ndarray) -> None:
+    """Write the vectors to the sidecar and store one fact pointing at each row."""
+    store = EmbeddingStore(Path(cfg.memory_path).with_suffix(".embeddings.npy"))
+    for start in range(0, len(facts), WRITE_BLOCK):
+        store.append_many(facts[start:start + WRITE_BLOCK])
+    memory = create_memory(cfg)
+    try:
+        memory.add_facts({
+            fact_id(i): {"text": f"synthetic fact {i}", "timestamp": None, "embedding_row": i}
+            for i in range(len(facts))
+        })
+    finally:
+        memory.close()
+
+
+def measure(cfg: Settings, queries: np.ndarray, truth: List[set], k: int) -> Tuple[float, float, float]:
+    """Open the store at the configured precision and run every query through search()."""
+    memory = create_memory(cfg)
+    semantic = src.semantic.SemanticMemory(memory, cfg)
+    try:
+        semantic.ready.result()
+        found = 0
+        start = time.perf_counter()
+        for q, expected in zip(queries, truth):
+            hits = semantic.search(q, k)
+            found += len(expected & {int(fid.rsplit("-", 1)[1]) for fid, _ in hits})
+        ms = (time.perf_counter() - start) / len(queries) * 1000
+        return semantic._matrix.nbytes / 1e6, found / (k * len(queries)), ms
+    finally:
+        semantic.close()
+        memory.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--facts", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a setting, e.g. --set memory_backend=sqlite.")
+    args = parser.parse_args()
+
+    # Vectors are synthetic; never load the sentence-transformers model.
+    src.semantic.SentenceTransformer = None
+    overrides = dict(parse_override(o) for o in args.overrides)
+    facts, queries = make_data(args.facts, args.dim, args.queries)
+    truth = [set(top_k(facts @ q, args.k).tolist()) for q in queries]
+    print(f"{args.facts} facts x {args.dim} dims, {args.queries} queries, recall@{args.k} vs exact float32")
+    print(f"{'precision':<10}{'MB':>8}{'recall':>10}{'ms/query':>10}{'+rescore':>10}{'ms/query':>10}")
+    with tempfile.TemporaryDirectory(prefix="precision-") as tmp:
+        populate(make_settings(Path(tmp), overrides), facts)
+        for precision in PRECISIONS:
+            row = []
+            for rescore in (False, True):
+                cfg = make_settings(Path(tmp), {**overrides, "embedding_precision": precision,
+                                                "embedding_rescore": rescore})
+                row.append(measure(cfg, queries, truth, args.k))
+            (mb, raw, raw_ms), (_, rescored, rescored_ms) = row
+            print(f"{precision:<10}{mb:>8.1f}{raw:>10.4f}{raw_ms:>10.2f}{rescored:>10.4f}{rescored_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""
+Offline replay benchmark for the assistant core.
+
+Drives ``PersonalAI._process`` with a stream of utterances, either recorded
+(the ``user_command`` interactions of an ``ai_memory.json``) or synthetic,
+against a silent stub ``VoiceIO`` and a deterministic local fake of the
+OpenAI client with configurable latency.  Nothing touches the network,
+microphone or speakers.
+
+Each scenario scales one dimension -- stored facts, pending reminders or
+registered plugin commands -- and for every size reports turns/sec, per-stage
+latency from the tracer, memory-file growth and process RSS, so regressions
+in ``Memory``, ``SemanticMemory`` and dispatch show up before deploy.
+
+    python benchmarks/replay.py --scenario facts --sizes 0,1000,10000
+    python benchmarks/replay.py --utterances ai_memory.json --latency-ms 300 --stream
+    python benchmarks/replay.py --scenario plugins --sizes 10,100,1000 --set memory_backend=sqlite
+"""
+import argparse
+import datetime as dt
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace as NS
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.config import Settings  # noqa: E402
+from src.dispatch import CommandMatcher  # noqa: E402
+from src.memory import create_memory  # noqa: E402
+import src.semantic  # noqa: E402
+
+SCENARIOS = ("baseline", "facts", "reminders", "plugins")
+# Tracer stage groups reported; the stub voice produces no tts spans.
+STAGES = ("turn", "dispatch", "plugin", "route", "cache", "llm", "tool", "memory")
+
+TOPICS = ["car", "dentist", "passport", "wifi password", "garden", "anniversary", "gym", "landlord", "bank", "dog"]
+SYNTHETIC = [
+    "what time is it",
+    "what's the date today",
+    "what's my name",
+    "remember that my {topic} note number {n} is {word}",
+    "what do you remember about my {topic}",
+    "add {word} to my todo list",
+    "show my todo list",
+    "remind me to call the {topic} at 6pm",
+    "tell me something interesting about {word}",
+    "how do i fix my {topic}",
+]
+WORDS = ["blue", "friday", "seven", "lemon", "quartz", "maple", "river", "copper", "tango", "north"]
+
+
+class StubVoice:
+    """Silent VoiceIO: records what would be spoken and never blocks."""
+
+    def __init__(self) -> None:
+        self.spoken = 0
+
+    def synthesize(self, text: str) -> Optional[bytes]:
+        return None
+
+    def play(self, text: str, audio: Optional[bytes] = None, on_start: Any = None) -> None:
+        if on_start:
+            on_start()
+        self.spoken += 1
+
+    def speak(self, text: str, on_start: Any = None) -> None:
+        self.play(text, None, on_start)
+
+    def stop(self) -> None:
+        return None
+
+    def listen(self) -> str:
+        return ""
+
+
+class FakeCompletions:
+    """
+    Deterministic stand-in for ``client.chat.completions`` with fixed latency.
+
+    Tool choice follows simple keyword rules on the last user message; replies
+    come from recorded ``ai_response`` interactions when the command was
+    recorded, otherwise from a template.
+    """
+
+    RULES = [
+        (re.compile(r"\b(time)\b"), "get_current_time", lambda m: {}),
+        (re.compile(r"\b(date|what day)\b"), "get_current_date", lambda m: {}),
+        (re.compile(r"my name is (\w+)"), "remember_user_name", lambda m: {"name": m.group(1)}),
+        (re.compile(r"what'?s my name"), "recall_user_name", lambda m: {}),
+        (re.compile(r"remember that (.+)"), "remember_fact", lambda m: {"fact": m.group(1)}),
+        (re.compile(r"remember about (?:my )?(.+)"), "recall_facts", lambda m: {"topic": m.group(1)}),
+    ]
+
+    def __init__(self, latency_ms: float, token_ms: float, replies: Dict[str, str]) -> None:
+        self.latency = latency_ms / 1000
+        self.token = token_ms / 1000
+        self.replies = replies
+        self.calls = 0
+        self._ids = itertools.count()
+
+    def _reply(self, messages: List[Any]) -> Tuple[str, List[Tuple[str, Dict[str, Any]]]]:
+        last = messages[-1]
+        role = last.get("role") if isinstance(last, dict) else getattr(last, "role", "assistant")
+        if role == "tool":
+            return f"Done. {str(last['content'])[:120]}", []
+        text = last["content"].lower()
+        for pattern, tool, args in self.RULES:
+            match = pattern.search(text)
+            if match:
+                return "", [(tool, args(match))]
+        return self.replies.get(text, f"Here is a short answer about {text[:60]}. I hope that helps."), []
+
+    def create(self, messages: List[Any], tools: Any = None, stream: bool = False, **_: Any) -> Any:
+        self.calls += 1
+        content, calls = self._reply(messages)
+        if not tools:
+            calls = []
+        tool_calls = [
+            NS(id=f"call_{next(self._ids)}", index=i, function=NS(name=name, arguments=json.dumps(args)))
+            for i, (name, args) in enumerate(calls)
+        ] or None
+        time.sleep(self.latency)
+        if not stream:
+            return NS(choices=[NS(message=NS(role="assistant", content=content or None, tool_calls=tool_calls))])
+
+        def chunks() -> Iterator[Any]:
+            for word in re.findall(r"\S+\s*", content):
+                time.sleep(self.token)
+                yield NS(choices=[NS(delta=NS(content=word, tool_calls=None))])
+            if tool_calls:
+                yield NS(choices=[NS(delta=NS(content=None, tool_calls=tool_calls))])
+        return chunks()
+
+
+def recorded(path: Path) -> Tuple[List[str], Dict[str, str]]:
+    """User commands from a memory file, and the recorded reply to each."""
+    interactions = json.loads(path.read_text(encoding="utf-8")).get("interactions", [])
+    commands, replies = [], {}
+    for current, following in zip(interactions, interactions[1:] + [{}]):
+        if current.get("type") != "user_command" or not current.get("content"):
+            continue
+        commands.append(current["content"])
+        if following.get("type") == "ai_response" and following.get("content"):
+            replies[current["content"].lower()] = following["content"]
+    return commands, replies
+
+
+def synthetic(seed: int, plugin_keywords: List[str]) -> Iterator[str]:
+    """An endless, seeded mix of questions, facts, plugin commands and small talk."""
+    rng = random.Random(seed)
+    for n in itertools.count():
+        if plugin_keywords and rng.random() < 0.15:
+            yield f"{rng.choice(plugin_keywords)} {rng.choice(WORDS)}"
+            continue
+        yield rng.choice(SYNTHETIC).format(topic=rng.choice(TOPICS), word=rng.choice(WORDS), n=n)
+
+
+def rss_mb() -> float:
+    """Current resident set size (peak where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        if resource is None:
+            return 0.0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def store_bytes(directory: Path) -> int:
+    return sum(p.stat().st_size for p in directory.iterdir() if p.is_file())
+
+
+def make_settings(directory: Path, overrides: Dict[str, Any]) -> Settings:
+    cfg = Settings()
+    values = {
+        "memory_path": str(directory / "memory.json"),
+        "openai_api_key": "",
+        "api_key": "",
+        "tracing": True,
+        "trace_file": "",
+        "wake_words": ["hey assistant"],
+        **overrides,
+    }
+    for key, value in values.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def populate(cfg: Settings, scenario: str, size: int) -> None:
+    """Seed the store before the assistant starts."""
+    if scenario not in ("facts", "reminders") or size <= 0:
+        return
+    memory = create_memory(cfg)
+    try:
+        if scenario == "facts":
+            base = dt.datetime(2024, 1, 1)
+            memory.add_facts({
+                (base + dt.timedelta(seconds=i)).isoformat(): {
+                    "text": f"my {TOPICS[i % len(TOPICS)]} note number {i} is {WORDS[i % len(WORDS)]}",
+                    "timestamp": (base + dt.timedelta(seconds=i)).isoformat(),
+                    "embedding_row": None,
+                }
+                for i in range(size)
+            })
+        else:
+            due = dt.datetime.now() + dt.timedelta(days=30)
+            for i in range(size):
+                memory.add_reminder(f"synthetic reminder {i}", due + dt.timedelta(minutes=i))
+    finally:
+        memory.close()
+
+
+def add_plugins(ai: Any, count: int) -> List[str]:
+    """Register synthetic plugin commands and rebuild the dispatcher."""
+    keywords = [f"skill{i}" for i in range(count)]
+    for keyword in keywords:
+        ai.commands[keyword] = lambda command, *a, _k=keyword, **kw: f"{_k} handled: {command}"
+    ai.dispatcher = CommandMatcher(ai.commands)
+    return keywords
+
+
+def run_case(args: argparse.Namespace, scenario: str, size: int, overrides: Dict[str, Any],
+             commands: Optional[List[str]], replies: Dict[str, str]) -> Dict[str, Any]:
+    from src.assistant import PersonalAI
+
+    with tempfile.TemporaryDirectory(prefix="replay-") as tmp:
+        directory = Path(tmp)
+        cfg = make_settings(directory, overrides)
+        populate(cfg, scenario, size)
+        rss_before = rss_mb()
+        voice = StubVoice()
+        ai = PersonalAI(cfg, voice_io=voice)
+        completions = FakeCompletions(args.latency_ms, args.token_ms, replies)
+        ai.llm.openai_client = NS(chat=NS(completions=completions))
+        ai.stream_responses = args.stream
+        keywords = add_plugins(ai, size if scenario == "plugins" else 0)
+        # Warm-up (model load, queued fact embeddings) is not part of the measurement.
+        ai.semantic.ready.result()
+        source = itertools.cycle(commands) if commands else synthetic(args.seed, keywords)
+        utterances = list(itertools.islice(source, args.turns))
+        ai.memory.flush()
+        bytes_before = store_bytes(directory)
+        started = time.perf_counter()
+        for utterance in utterances:
+            ai._process(utterance)
+        elapsed = time.perf_counter() - started
+        stages = ai.tracer.summary()
+        bytes_after = store_bytes(directory)
+        result = {
+            "scenario": scenario,
+            "size": size,
+            "turns": len(utterances),
+            "turns_per_sec": len(utterances) / elapsed if elapsed else 0.0,
+            "llm_calls": completions.calls,
+            "store_kb_before": bytes_before / 1024,
+            "store_kb_growth": (bytes_after - bytes_before) / 1024,
+            "rss_mb": rss_mb(),
+            "rss_mb_growth": rss_mb() - rss_before,
+            "stages": {
+                group: _merge([s for name, s in stages.items() if name.split(":")[0].split(".")[0] == group])
+                for group in STAGES
+            },
+        }
+        ai.tracer.close()
+        ai.plugin_executor.close()
+        ai.tools.close()
+        ai.semantic.close()
+        ai.memory.close()
+        return result
+
+
+def _merge(stats: List[Dict[str, float]]) -> Optional[Dict[str, float]]:
+    """Combine stages of one group (e.g. every ``tool:*``), weighting by count."""
+    stats = [s for s in stats if s["count"]]
+    if not stats:
+        return None
+    count = sum(s["count"] for s in stats)
+    return {
+        "count": count,
+        **{q: sum(s[q] * s["count"] for s in stats) / count for q in ("p50", "p95", "p99")},
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    header = f"{'scenario':<10}{'size':>7}{'turns/s':>9}{'store KB':>10}{'+KB':>8}{'RSS MB':>8}"
+    header += "".join(f"{stage + ' p50/p95':>22}" for stage in STAGES)
+    print(header)
+    for r in results:
+        line = f"{r['scenario']:<10}{r['size']:>7}{r['turns_per_sec']:>9.1f}"
+        line += f"{r['store_kb_before']:>10.0f}{r['store_kb_growth']:>8.0f}{r['rss_mb']:>8.0f}"
+        for stage in STAGES:
+            s = r["stages"][stage]
+            cell = f"{s['p50']:.1f}/{s['p95']:.1f}" if s else "-"
+            line += f"{cell:>22}"
+        print(line)
+
+
+def parse_override(text: str) -> Tuple[str, Any]:
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except json.JSONDecodeError:
+        return key, value
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=SCENARIOS, action="append",
+                        help="Dimension to scale; repeat for several (default: every scenario).")
+    parser.add_argument("--sizes", default="0,1000,10000",
+                        help="Comma-separated facts/reminders/plugin counts per scenario.")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--utterances", type=Path,
+                        help="Replay user commands recorded in this memory file instead of synthetic ones.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake OpenAI latency per request.")
+    parser.add_argument("--token-ms", type=float, default=2.0, help="Fake delay per streamed word.")
+    parser.add_argument("--stream", action="store_true", help="Use streamed completions.")
+    parser.add_argument("--no-model", action="store_true",
+                        help="Skip the sentence-transformers model (keyword recall only).")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="Override a setting, e.g. --set memory_backend=sqlite.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, help="Also write the results to this file.")
+    args = parser.parse_args()
+
+    if args.no_model:
+        src.semantic.SentenceTransformer = None
+    overrides = dict(parse_override(o) for o in args.overrides)
+    commands, replies = recorded(args.utterances) if args.utterances else (None, {})
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results = []
+    for scenario in args.scenario or SCENARIOS:
+        for size in ([0] if scenario == "baseline" else sizes):
+            results.append(run_case(args, scenario, size, overrides, commands, replies))
+    print_results(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
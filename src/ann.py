@@ -0,0 +1,207 @@
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from src.logging import get_logger
+
+# Rows scored per block when assigning vectors to centroids.
+ASSIGN_BLOCK = 8192
+# Training uses at most this many sampled vectors.
+TRAIN_SAMPLE = 50000
+
+
+def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Return the index of the most similar centroid for each row."""
+    out = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), ASSIGN_BLOCK):
+        block = vectors[start:start + ASSIGN_BLOCK]
+        out[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+def _spherical_kmeans(vectors: np.ndarray, k: int, iters: int = 10, seed: int = 0) -> np.ndarray:
+    """Cluster unit vectors by cosine similarity; returns unit-norm centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iters):
+        labels = _assign(vectors, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, vectors)
+        counts = np.bincount(labels, minlength=k)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF-flat) approximate nearest-neighbour index.
+
+    Vectors are clustered with spherical k-means; each cluster keeps the
+    positions of its members in the caller's normalized matrix.  A query scores
+    the centroids, then only the members of the ``nprobe`` closest clusters.
+    Raising ``nprobe`` trades latency for recall.
+    """
+
+    def __init__(self, path: Path, nprobe: int = 8) -> None:
+        """
+        Initialize an empty index.
+        Args:
+            path (Path): Where the index is persisted (``.npz``).
+            nprobe (int): Number of clusters scanned per query.
+        """
+        self.path = Path(path)
+        self.nprobe = nprobe
+        self.logger = get_logger(__name__)
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[List[int]] = []
+        self._labels: List[int] = []
+        self._ids: List[str] = []
+        self._trained_size = 0
+        self._lock = threading.RLock()
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def train(self, ids: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        (Re)build the index from scratch.
+        Args:
+            ids (Sequence[str]): Fact id for each matrix position.
+            vectors (np.ndarray): Normalized vectors, row i at position i.
+        """
+        n = len(ids)
+        if n == 0:
+            return
+        k = max(1, int(np.sqrt(n)))
+        rng = np.random.default_rng(0)
+        sample = vectors if n <= TRAIN_SAMPLE else vectors[rng.choice(n, TRAIN_SAMPLE, replace=False)]
+        centroids = _spherical_kmeans(np.asarray(sample, dtype=np.float32), min(k, len(sample)))
+        labels = _assign(vectors, centroids)
+        lists: List[List[int]] = [[] for _ in range(len(centroids))]
+        for pos, label in enumerate(labels.tolist()):
+            lists[label].append(pos)
+        with self._lock:
+            self.centroids = centroids
+            self._labels = labels.tolist()
+            self._lists = lists
+            self._ids = list(ids)
+            self._trained_size = n
+        self.logger.info(f"Trained IVF index with {len(centroids)} lists over {n} facts.")
+
+    def needs_retrain(self) -> bool:
+        """True once the index has doubled in size since it was trained."""
+        return self.trained and len(self) >= 2 * self._trained_size
+
+    def add(self, position: int, fact_id: str, vector: np.ndarray) -> None:
+        """
+        Insert or move a single normalized vector.
+        Args:
+            position (int): The vector's row in the caller's matrix.
+            fact_id (str): Fact id stored at that row.
+            vector (np.ndarray): The normalized vector.
+        """
+        if not self.trained:
+            return
+        label = int(np.argmax(self.centroids @ vector))
+        with self._lock:
+            if position < len(self._labels):
+                self._lists[self._labels[position]].remove(position)
+                self._labels[position] = label
+                self._ids[position] = fact_id
+            else:
+                self._labels.append(label)
+                self._ids.append(fact_id)
+            self._lists[label].append(position)
+
+    def search(
+        self,
+        query: np.ndarray,
+        matrix: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Approximate top-k search.
+        Args:
+            query (np.ndarray): Normalized query vector.
+            matrix (np.ndarray): The normalized matrix the positions refer to.
+            k (int): Number of results.
+            nprobe (Optional[int]): Override for the number of clusters scanned.
+            limit (Optional[int]): Ignore positions at or past this one (added after
+                ``matrix`` was captured).
+        Returns:
+            List[Tuple[int, float]]: (position, score) pairs, best first.
+        """
+        with self._lock:
+            centroids = self.centroids
+            nprobe = min(nprobe or self.nprobe, len(centroids))
+            probe = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+            # Copies: add() mutates the lists in place from other threads.
+            members = [list(self._lists[c]) for c in probe.tolist()]
+        candidates = np.fromiter(
+            (pos for lst in members for pos in lst), dtype=np.int64, count=sum(len(m) for m in members)
+        )
+        if limit is not None:
+            candidates = candidates[candidates < limit]
+        if len(candidates) == 0:
+            return []
+        scores = matrix[candidates] @ query
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def save(self) -> None:
+        """Persist centroids and list assignments."""
+        if not self.trained:
+            return
+        with self._lock:
+            labels = np.asarray(self._labels, dtype=np.int32)
+            ids = np.asarray(self._ids, dtype=str)
+            trained_size = self._trained_size
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as fh:
+            np.savez(fh, centroids=self.centroids, labels=labels, ids=ids, trained_size=trained_size)
+        tmp.replace(self.path)
+
+    def load(self, ids: Sequence[str]) -> bool:
+        """
+        Load a persisted index if it matches the current matrix layout.
+        Args:
+            ids (Sequence[str]): Fact id for each matrix position.
+        Returns:
+            bool: True if loaded; positions added since the save still need :meth:`add`.
+        """
+        if not self.path.exists():
+            return False
+        try:
+            with np.load(self.path) as saved:
+                saved_ids = saved["ids"].tolist()
+                if list(ids[: len(saved_ids)]) != saved_ids:
+                    return False
+                centroids = saved["centroids"].astype(np.float32)
+                labels = saved["labels"].tolist()
+                trained_size = int(saved["trained_size"])
+        except (OSError, KeyError, ValueError) as exc:
+            self.logger.warning(f"Ignoring unreadable ANN index {self.path.name}: {exc}")
+            return False
+        lists: List[List[int]] = [[] for _ in range(len(centroids))]
+        for pos, label in enumerate(labels):
+            lists[label].append(pos)
+        with self._lock:
+            self.centroids = centroids
+            self._labels = labels
+            self._lists = lists
+            self._ids = saved_ids
+            self._trained_size = trained_size
+        return True
@@ -0,0 +1,179 @@
+import gzip
+import json
+import threading
+import datetime as dt
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from src.logging import get_logger
+
+
+def _parse_ts(value: Optional[str]) -> Optional[dt.datetime]:
+    try:
+        return dt.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class InteractionArchive:
+    """
+    Cold storage for interactions evicted from the live history window.
+
+    Records are buffered in memory and spilled to gzip-compressed JSONL segments
+    partitioned by day (``YYYY-MM-DD.jsonl.gz``).  Each flush appends one gzip
+    member per touched segment, so segments never need to be rewritten.
+
+    Callers that number their records pass the number to :meth:`add`; it is
+    stored with the record and anything at or below the highest number
+    already archived is dropped, so a record evicted again after a crash is
+    never written twice.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        """
+        Initialize the archive.
+        Args:
+            directory (Path): Directory holding the archive segments.
+        """
+        self.directory = Path(directory)
+        self.logger = get_logger(__name__)
+        self._buffer: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.last_seq = self._scan_last_seq()
+
+    @staticmethod
+    def _partition(record: Dict[str, Any]) -> str:
+        ts = _parse_ts(record.get("timestamp"))
+        return (ts or dt.datetime.now()).date().isoformat()
+
+    @property
+    def _seq_path(self) -> Path:
+        return self.directory / "last_seq"
+
+    def _scan_last_seq(self) -> int:
+        """
+        Find the highest record number on disk.  The marker written after each
+        flush is the starting point; segments touched since then (a crash
+        between the segment write and the marker) are scanned for newer numbers.
+        Returns:
+            int: The highest archived record number, or 0 if none is numbered.
+        """
+        last, since = 0, 0.0
+        try:
+            last = int(self._seq_path.read_text(encoding="utf-8").strip() or 0)
+            since = self._seq_path.stat().st_mtime
+        except (OSError, ValueError):
+            pass
+        for segment in self.segments():
+            try:
+                if segment.stat().st_mtime < since:
+                    continue
+                with gzip.open(segment, "rt", encoding="utf-8") as fh:
+                    for line in fh:
+                        last = max(last, json.loads(line).get("seq") or 0)
+            except (OSError, EOFError, json.JSONDecodeError) as exc:
+                self.logger.warning(f"Stopped scanning archive segment {segment.name}: {exc}")
+        return last
+
+    def add(self, record: Dict[str, Any], seq: Optional[int] = None) -> bool:
+        """
+        Queue an evicted interaction for the next flush.
+        Args:
+            record (Dict[str, Any]): The interaction.
+            seq (Optional[int]): The record's number in its store, if it has one.
+        Returns:
+            bool: False if a record with this number was already archived.
+        """
+        with self._lock:
+            if seq is not None:
+                if seq <= self.last_seq:
+                    return False
+                self.last_seq = seq
+                record = {**record, "seq": seq}
+            self._buffer.append(record)
+        return True
+
+    def flush(self) -> None:
+        """Write buffered records to their day segments."""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+            last_seq = self.last_seq
+        if not records:
+            return
+        by_day: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for record in records:
+            by_day[self._partition(record)].append(record)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            for day, items in by_day.items():
+                payload = "".join(json.dumps(r) + "\n" for r in items)
+                with gzip.open(self.directory / f"{day}.jsonl.gz", "at", encoding="utf-8") as fh:
+                    fh.write(payload)
+        except OSError:
+            with self._lock:
+                self._buffer = records + self._buffer
+            raise
+        if any("seq" in r for r in records):
+            tmp = self._seq_path.with_suffix(".tmp")
+            tmp.write_text(str(last_seq), encoding="utf-8")
+            tmp.replace(self._seq_path)
+
+    def segments(self) -> List[Path]:
+        """Return archive segment paths in chronological order."""
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.jsonl.gz"))
+
+    def query(
+        self,
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+        types: Optional[Iterable[str]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream archived interactions within a time range.
+        Args:
+            start (Optional[datetime]): Inclusive lower bound on the timestamp.
+            end (Optional[datetime]): Inclusive upper bound on the timestamp.
+            types (Optional[Iterable[str]]): Interaction types to include.
+        Returns:
+            Iterator[Dict[str, Any]]: Matching records, oldest segment first.
+        """
+        wanted = set(types) if types else None
+        first_day = start.date().isoformat() if start else None
+        last_day = end.date().isoformat() if end else None
+        with self._lock:
+            pending = list(self._buffer)
+        for segment in self.segments():
+            day = segment.name[:10]
+            if (first_day and day < first_day) or (last_day and day > last_day):
+                continue
+            try:
+                with gzip.open(segment, "rt", encoding="utf-8") as fh:
+                    for line in fh:
+                        record = json.loads(line)
+                        record.pop("seq", None)
+                        if self.matches(record, start, end, wanted):
+                            yield record
+            except (OSError, EOFError, json.JSONDecodeError) as exc:
+                self.logger.warning(f"Skipping unreadable archive segment {segment.name}: {exc}")
+        for record in pending:
+            if self.matches(record, start, end, wanted):
+                yield {k: v for k, v in record.items() if k != "seq"}
+
+    @staticmethod
+    def matches(
+        record: Dict[str, Any],
+        start: Optional[dt.datetime],
+        end: Optional[dt.datetime],
+        wanted: Optional[set],
+    ) -> bool:
+        """Return True if the record falls in the time range and type set."""
+        if wanted is not None and record.get("type") not in wanted:
+            return False
+        if start is None and end is None:
+            return True
+        ts = _parse_ts(record.get("timestamp"))
+        if ts is None:
+            return False
+        return (start is None or ts >= start) and (end is None or ts <= end)
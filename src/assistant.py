@@ -4,15 +4,24 @@ import os
 import subprocess
 import webbrowser
 import json
-from typing import Any
+import threading
+from typing import Any, Callable
 from src.config import Settings
-from src.memory import Memory
+from src.memory import create_memory
 from src.voice import VoiceIO
 from src.llm import LLMClient
 from src.semantic import SemanticMemory
-import importlib
-import pkgutil
-from src.plugins.base import AssistantPlugin
+from src.embedding_cache import normalize_text
+from src.scheduler import ReminderScheduler
+from src.dispatch import CommandMatcher
+from src.tools import Tool, ToolRegistry, parameters
+from src.streaming import SentenceChunker, SpeechPipeline, collect_stream
+from src.turn import Turn
+from src.intents import Intent, IntentRouter
+from src.response_cache import ResponseCache
+from src.tracing import configure_tracing, span
+from src.plugin_loader import discover_plugins
+from src.plugin_executor import PluginExecutor
 
 try:
     from duckduckgo_search import DDGS
@@ -31,16 +40,62 @@ class PersonalAI:
             cfg (Settings): The runtime configuration.
         """
         self.cfg = cfg
-        self.memory = Memory(cfg.memory_path, cfg.max_interactions)
+        self.tracer = configure_tracing(cfg)
+        self.memory = create_memory(cfg)
         self.voice = voice_io if voice_io else VoiceIO(cfg)
         self.llm = LLMClient(cfg, self.memory)
         self.semantic = SemanticMemory(self.memory, cfg)
+        self.scheduler = ReminderScheduler(self.memory, self._announce_reminder)
         self.logger = get_logger(__name__)
         self.logger.info("Assistant ready – say a wake word to begin.")
         self.plugins = {}
         self.commands = {}
+        self._command_plugins: dict = {}
+        self.dispatcher = CommandMatcher({})
+        self.plugin_executor = PluginExecutor(
+            max_workers=getattr(cfg, "plugin_workers", 4),
+            default_timeout=getattr(cfg, "plugin_timeout_sec", 8.0),
+            ack_after=getattr(cfg, "plugin_ack_sec", 1.5),
+            failure_threshold=getattr(cfg, "plugin_failure_threshold", 3),
+            reset_after=getattr(cfg, "plugin_reset_sec", 60.0),
+            on_late=self._announce_late,
+        )
+        self.tools = ToolRegistry(
+            max_workers=getattr(cfg, "tool_workers", 4),
+            default_timeout=getattr(cfg, "tool_timeout_sec", 10.0),
+        )
+        self._register_core_tools()
+        self.router: IntentRouter | None = None
+        if getattr(cfg, "intent_routing", True):
+            self.router = IntentRouter(
+                self.semantic.encode,
+                threshold=getattr(cfg, "intent_threshold", 0.8),
+            )
+            self._register_core_intents()
+        self._system_prompts: dict = {}
+        self.response_cache: ResponseCache | None = None
+        if getattr(cfg, "response_cache", False):
+            self.response_cache = ResponseCache(
+                threshold=getattr(cfg, "response_cache_threshold", 0.95),
+                ttl_sec=getattr(cfg, "response_cache_ttl_sec", 3600.0),
+                capacity=getattr(cfg, "response_cache_size", 256),
+            )
+        # Bumped whenever remembered state changes; part of the response cache key.
+        self._state_version = 0
+        # remember_fact checks for a duplicate, then writes: the pair must not interleave.
+        self._fact_lock = threading.Lock()
+        self.stream_responses = getattr(cfg, "stream_responses", False)
         self._load_plugins()
 
+    def _announce_reminder(self, reminder: dict) -> None:
+        """Speak a reminder as soon as the scheduler fires it."""
+        self.voice.speak(f"Reminder: {reminder['text']}")
+
+    def _announce_late(self, plugin: str, reply: str) -> None:
+        """Speak a plugin reply that arrived after its turn had given up waiting."""
+        self.voice.speak(reply)
+        self.memory.append("plugin_response", reply)
+
     def _get_current_time(self) -> str:
         """Return the current time as a formatted string."""
         return dt.datetime.now().strftime("%I:%M %p")
@@ -85,8 +140,9 @@ class PersonalAI:
         try:
             if not name or not isinstance(name, str) or len(name.strip()) == 0:
                 return "Please provide a valid name to remember."
-            self.memory.data["user_preferences"]["name"] = name.strip()
-            self.memory.save()
+            with self.memory.durable():
+                self.memory.set_preference("name", name.strip())
+            self._state_version += 1
             return f"Okay, I'll remember your name is {name.strip()}."
         except Exception as e:
             self.logger.error(f"Error remembering user name '{name}': {e}")
@@ -98,7 +154,7 @@ class PersonalAI:
         Returns:
             str: The user's name or a message if unknown.
         """
-        name = self.memory.data.get("user_preferences", {}).get("name")
+        name = self.memory.get_preference("name")
         if name:
             return f"Your name is {name}."
         return "I don't believe I know your name yet."
@@ -115,15 +171,32 @@ class PersonalAI:
             if not fact or not isinstance(fact, str) or len(fact.strip()) == 0:
                 return "Please provide a valid fact to remember."
             fact_text = fact.strip()
-            fact_id = dt.datetime.now().isoformat()
-            fact_embedding = self.semantic.embed_fact(fact_text)
-            self.memory.data.setdefault("learned_facts", {})[fact_id] = {
-                "text": fact_text,
-                "timestamp": fact_id,
-                "embedding": fact_embedding
-            }
-            self.memory.save()
-            return f"Okay, I've remembered that: {fact_text}"
+            # On disk before the reply confirms it, not at the next write-behind tick.
+            with self._fact_lock, self.memory.durable():
+                fact_id = dt.datetime.now().isoformat()
+                duplicate_id = self.semantic.find_duplicate(fact_text)
+                if duplicate_id is not None:
+                    existing = self.memory.get_fact(duplicate_id) or {}
+                    self.memory.add_fact(duplicate_id, {
+                        **existing,
+                        "text": fact_text,
+                        "timestamp": fact_id,
+                        "mentions": existing.get("mentions", 1) + 1,
+                    })
+                    if normalize_text(existing.get("text", "")) != normalize_text(fact_text):
+                        # Re-embed the newer wording in place of the old one.
+                        self.semantic.embed_fact(fact_text, duplicate_id)
+                    self._state_version += 1
+                    return f"Okay, I already knew that. I've updated it to: {fact_text}"
+                self.memory.add_fact(fact_id, {
+                    "text": fact_text,
+                    "timestamp": fact_id,
+                    "embedding_row": None
+                })
+                # Attaches the embedding row to the stored fact, or queues it during warm-up.
+                self.semantic.embed_fact(fact_text, fact_id)
+                self._state_version += 1
+                return f"Okay, I've remembered that: {fact_text}"
         except Exception as e:
             self.logger.error(f"Error remembering fact '{fact}': {e}")
             return "Sorry, I had trouble remembering that fact."
@@ -190,28 +263,128 @@ class PersonalAI:
         elif key == "lock":
             os.system("rundll32.exe user32.dll,LockWorkStation")
 
+    def _register_core_tools(self) -> None:
+        """Declare the assistant's built-in LLM tools."""
+        for tool in (
+            Tool("get_current_time", "Get the current time.", self._get_current_time, idempotent=True),
+            Tool("get_current_date", "Get the current date.", self._get_current_date, idempotent=True),
+            Tool(
+                "open_application",
+                "Opens a specified application like notepad, calculator, or browser.",
+                self._open_application,
+                parameters(["app_name"], app_name="The name of the application to open (e.g., 'notepad', 'calculator', 'browser')."),
+            ),
+            Tool(
+                "remember_user_name",
+                "Remembers the user's name.",
+                self._remember_user_name,
+                parameters(["name"], name="The user's name."),
+            ),
+            Tool(
+                "recall_user_name",
+                "Recalls the user's name if it has been previously remembered.",
+                self._recall_user_name,
+                cacheable=True,
+                idempotent=True,
+            ),
+            Tool(
+                "remember_fact",
+                "Stores a specific piece of information or fact provided by the user for later recall. Example: 'Remember that my anniversary is on June 5th.'",
+                self._remember_fact,
+                parameters(["fact"], fact="The fact or piece of information to remember."),
+            ),
+            Tool(
+                "recall_facts",
+                "Recalls previously remembered facts. Can optionally filter by a topic if the user specifies one. Example: 'What do you remember about my car?'",
+                self._recall_facts,
+                parameters(topic="An optional topic to filter recalled facts."),
+                cacheable=True,
+                idempotent=True,
+                max_concurrency=4,
+            ),
+            Tool("lock_computer", "Locks the computer workstation.", self._lock_computer),
+            Tool(
+                "search_web",
+                "Searches the web for information on a given query and provides a summary or top results. Use this for real-time information, current events, or topics not covered by other tools.",
+                self._search_web,
+                parameters(["query"], query="The search query."),
+                idempotent=True,
+                max_concurrency=4,
+            ),
+        ):
+            self.tools.register(tool)
+
+    def _register_core_intents(self) -> None:
+        """Declare exemplar phrasings answered without the LLM."""
+        for intent in (
+            Intent(
+                "get_current_time",
+                ["what time is it", "what's the time", "tell me the time", "do you know the time",
+                 "what time is it right now", "current time"],
+                lambda _: f"It's {self._get_current_time()}.",
+            ),
+            Intent(
+                "get_current_date",
+                ["what's the date", "what's today's date", "what day is it", "what's the date today",
+                 "which day is it today", "today's date"],
+                lambda _: f"Today is {self._get_current_date()}.",
+            ),
+            Intent(
+                "recall_user_name",
+                ["what's my name", "do you know my name", "who am i", "what do you call me",
+                 "tell me my name"],
+                lambda _: self._recall_user_name(),
+            ),
+            # Near misses: phrasings close to the intents above that need the LLM.
+            Intent(
+                "llm",
+                ["what time is it in tokyo", "what time does the store close", "how long until midnight",
+                 "what's the date of easter", "what day is christmas this year", "what's my wife's name",
+                 "what's your name", "what date is thanksgiving"],
+            ),
+        ):
+            self.router.add(intent)
+
+    def _system_prompt(self, user_name: str) -> str:
+        """Return the system prompt, built once per user name."""
+        prompt = self._system_prompts.get(user_name)
+        if prompt is None:
+            prompt = (
+                "You are a helpful and concise voice assistant. "
+                f"{f'The user you are talking to is named {user_name}. ' if user_name else ''}"
+                "Use the available tools to answer questions, perform actions, or remember information. "
+                "When a tool provides information or an outcome (success or error), incorporate it naturally into your response to the user. "
+                "If a tool reports an error, inform the user clearly about the problem. "
+                "If the user asks to quit or says goodbye, respond conversationally and prepare to terminate. "
+                "Keep your spoken responses brief and natural for a voice interface."
+            )
+            self._system_prompts[user_name] = prompt
+        return prompt
+
     def _load_plugins(self) -> None:
         """
-        Dynamically discover and load plugins from the plugins directory.
-        Registers plugin commands for dispatch.
-        """
-        package = 'src.plugins'
-        for _, modname, ispkg in pkgutil.iter_modules([os.path.join(os.path.dirname(__file__), 'plugins')]):
-            if ispkg or modname == 'base':
-                continue
-            module = importlib.import_module(f'src.plugins.{modname}')
-            for attr in dir(module):
-                obj = getattr(module, attr)
-                if isinstance(obj, type) and issubclass(obj, AssistantPlugin) and obj is not AssistantPlugin:
-                    plugin = obj()
-                    if hasattr(plugin, "setup"):
-                        try:
-                            plugin.setup(self)
-                        except TypeError:
-                            pass
-                    self.plugins[plugin.name] = plugin
-                    for cmd, handler in plugin.register().items():
-                        self.commands[cmd] = handler
+        Discover plugins and register their commands, LLM tools and intents.
+        Plugins listed in the plugin manifest are imported on first use (see
+        :mod:`src.plugin_loader`); the rest load now.
+        """
+        for plugin in discover_plugins(self, lazy=getattr(self.cfg, "lazy_plugins", True)):
+            self.plugins[plugin.name] = plugin
+            self.plugin_executor.configure(plugin.name, plugin.timeout, plugin.max_concurrency)
+            for cmd, handler in plugin.commands().items():
+                self.commands[cmd] = handler
+                self._command_plugins[cmd.lower().strip()] = plugin.name
+            for tool in plugin.tools():
+                self.tools.register(tool)
+            if self.router is not None:
+                for intent in plugin.intents():
+                    if intent.handler is not None:
+                        intent = Intent(intent.name, intent.examples, self._plugin_call(plugin.name, intent.handler))
+                    self.router.add(intent)
+        self.dispatcher = CommandMatcher(self.commands)
+
+    def _plugin_call(self, name: str, handler: Callable[[str], str]) -> Callable[[str], str]:
+        """Wrap a plugin intent handler so it runs on the plugin executor."""
+        return lambda text: self.plugin_executor.run(name, handler, text)
 
     def _process(self, cmd: str) -> bool:
         """
@@ -221,127 +394,276 @@ class PersonalAI:
         Returns:
             bool: True to continue, False to terminate session.
         """
+        turn = Turn()
+        first_audio = lambda: self._mark_first_audio(turn)
+        self.tracer.begin_turn()
+        # Only streamed replies produce several sentences worth overlapping synthesis for.
+        pipeline = SpeechPipeline(self.voice, on_first_audio=first_audio) if self.stream_responses else None
+        try:
+            if pipeline is not None:
+                return self.respond(cmd, pipeline.say, turn)
+            return self.respond(cmd, lambda text: self.voice.speak(text, on_start=first_audio), turn)
+        finally:
+            if pipeline is not None:
+                pipeline.close()
+            # Turn boundary: commit everything the turn wrote.
+            self.memory.flush()
+            self.tracer.end_turn()
+
+    def respond(self, cmd: str, say: Callable[[str], None], turn: Turn | None = None) -> bool:
+        """
+        Handle one user command, handing everything to be spoken to ``say``.
+        Args:
+            cmd (str): The user command.
+            say (Callable[[str], None]): Receives each sentence or reply to speak, in order.
+            turn (Turn | None): Per-turn state; cancelling it stops the turn between
+                the LLM, tool and memory steps (raising ``TurnCancelled``).
+        Returns:
+            bool: True to continue, False to terminate session.
+        """
+        turn = turn or Turn()
         # Check for plugin command
-        cmd_lower = cmd.lower().strip()
-        for command, handler in self.commands.items():
-            if command in cmd_lower:
-                result = handler(cmd)
-                self.voice.speak(str(result))
-                self.memory.append("plugin_response", str(result))
-                return True
+        with span("dispatch"):
+            matched = self.dispatcher.match(cmd)
+        if matched:
+            keyword, handler = matched
+            with span(f"plugin:{keyword}"):
+                # Off the voice loop, with the plugin's timeout; slow handlers get a spoken acknowledgement.
+                result = self.plugin_executor.run(self._command_plugins.get(keyword, keyword), handler, cmd, say)
+            turn.check()
+            say(str(result))
+            self.memory.append("plugin_response", str(result))
+            return True
         self.memory.append("user_command", cmd, cmd)
+        routed = self._route(cmd)
+        turn.check()
+        if routed is not None:
+            say(routed)
+            self.memory.append("ai_response", routed)
+            return True
         if not self.llm.openai_client:
-            self.voice.speak("My advanced thinking capabilities are offline. Please configure the OpenAI API key.")
+            say("My advanced thinking capabilities are offline. Please configure the OpenAI API key.")
             if any(w in cmd for w in ("quit", "exit", "goodbye", "stop")):
-                self.voice.speak("Goodbye!")
+                say("Goodbye!")
                 return False
-            self.voice.speak("Sorry, I can't process that without my core intelligence.")
+            say("Sorry, I can't process that without my core intelligence.")
             return True
         # Prepare conversation history for context
-        history = self.memory.data.get("interactions", [])
-        user_name = self.memory.data.get("user_preferences", {}).get("name", "")
-        system_prompt = (
-            "You are a helpful and concise voice assistant. "
-            f"{f'The user you are talking to is named {user_name}. ' if user_name else ''}"
-            "Use the available tools to answer questions, perform actions, or remember information. "
-            "When a tool provides information or an outcome (success or error), incorporate it naturally into your response to the user. "
-            "If a tool reports an error, inform the user clearly about the problem. "
-            "If the user asks to quit or says goodbye, respond conversationally and prepare to terminate. "
-            "Keep your spoken responses brief and natural for a voice interface."
-        )
-        messages = [{"role": "system", "content": system_prompt}]
-        for interaction in history[-5:]:
+        history = self.memory.recent_interactions(5)
+        user_name = self.memory.get_preference("name", "")
+        cache_key = self._cache_key(cmd, user_name)
+        if cache_key is not None:
+            with span("cache"):
+                cached = self.response_cache.get(*cache_key)
+            turn.check()
+            if cached is not None:
+                say(cached)
+                self.memory.append("ai_response", cached)
+                return True
+        messages = [{"role": "system", "content": self._system_prompt(user_name)}]
+        for interaction in history:
             if interaction["type"] == "user_command":
                 messages.append({"role": "user", "content": interaction["content"]})
             elif interaction["type"] == "ai_response":
                 if interaction.get("content"):
                     messages.append({"role": "assistant", "content": interaction["content"]})
         messages.append({"role": "user", "content": cmd})
-        tools = [
-            {"type": "function", "function": {"name": "get_current_time", "description": "Get the current time."}},
-            {"type": "function", "function": {"name": "get_current_date", "description": "Get the current date."}},
-            {"type": "function", "function": {"name": "open_application", "description": "Opens a specified application like notepad, calculator, or browser.", "parameters": {"type": "object", "properties": {"app_name": {"type": "string", "description": "The name of the application to open (e.g., 'notepad', 'calculator', 'browser')."}}, "required": ["app_name"]}}},
-            {"type": "function", "function": {"name": "remember_user_name", "description": "Remembers the user's name.", "parameters": {"type": "object", "properties": {"name": {"type": "string", "description": "The user's name."}}, "required": ["name"]}}},
-            {"type": "function", "function": {"name": "recall_user_name", "description": "Recalls the user's name if it has been previously remembered."}},
-            {"type": "function", "function": {"name": "remember_fact", "description": "Stores a specific piece of information or fact provided by the user for later recall. Example: 'Remember that my anniversary is on June 5th.'", "parameters": {"type": "object", "properties": {"fact": {"type": "string", "description": "The fact or piece of information to remember."}}, "required": ["fact"]}}},
-            {"type": "function", "function": {"name": "recall_facts", "description": "Recalls previously remembered facts. Can optionally filter by a topic if the user specifies one. Example: 'What do you remember about my car?'", "parameters": {"type": "object", "properties": {"topic": {"type": "string", "description": "An optional topic to filter recalled facts."}}}}},
-            {"type": "function", "function": {"name": "lock_computer", "description": "Locks the computer workstation."}},
-            {"type": "function", "function": {"name": "search_web", "description": "Searches the web for information on a given query and provides a summary or top results. Use this for real-time information, current events, or topics not covered by other tools.", "parameters": {"type": "object", "properties": {"query": {"type": "string", "description": "The search query."}}, "required": ["query"]}}}
-        ]
-        available_functions = {
-            "get_current_time": self._get_current_time,
-            "get_current_date": self._get_current_date,
-            "open_application": self._open_application,
-            "remember_user_name": self._remember_user_name,
-            "recall_user_name": self._recall_user_name,
-            "remember_fact": self._remember_fact,
-            "recall_facts": self._recall_facts,
-            "lock_computer": self._lock_computer,
-            "search_web": self._search_web,
-        }
         try:
-            llm_response = self.llm.openai_client.chat.completions.create(
-                model=self.cfg.openai_model_name,
-                messages=messages,
-                tools=tools,
-                tool_choice="auto",
-                temperature=0.7,
-                max_tokens=150
-            )
-            response_message = llm_response.choices[0].message
-            tool_calls = response_message.tool_calls
-            if tool_calls:
-                self.memory.append("ai_tool_decision", f"Decided to call tools: {[tc.function.name for tc in tool_calls]}", cmd)
-                messages.append(response_message)
-                for tool_call in tool_calls:
-                    function_name = tool_call.function.name
-                    function_to_call = available_functions[function_name]
-                    function_args = json.loads(tool_call.function.arguments)
-                    self.memory.append("tool_call", f"Calling: {function_name} with args: {function_args}", cmd)
-                    function_response = function_to_call(**function_args)
-                    self.memory.append("tool_response", f"Function {function_name} returned: {function_response}", cmd)
-                    messages.append({
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": function_response,
-                    })
-                second_response = self.llm.openai_client.chat.completions.create(
-                    model=self.cfg.openai_model_name,
-                    messages=messages,
-                )
-                ai_text_response = second_response.choices[0].message.content.strip()
+            if self.stream_responses:
+                ai_text_response = self._stream_reply(messages, cmd, say, turn)
+                spoken = bool(ai_text_response)
+                ai_text_response = ai_text_response or "I'm not sure how to respond to that."
             else:
-                ai_text_response = response_message.content.strip() if response_message.content else "I'm not sure how to respond to that."
+                ai_text_response = self._complete_reply(messages, cmd, turn)
+                spoken = False
+            turn.check()
             if any(w in cmd.lower() for w in ("quit", "exit", "stop")) or "goodbye" in ai_text_response.lower():
                 final_goodbye = ai_text_response or f"Goodbye{', ' + user_name if user_name else ''}!"
-                self.voice.speak(final_goodbye)
+                if not spoken:
+                    say(final_goodbye)
                 self.memory.append("session_end", final_goodbye)
                 return False
-            self.voice.speak(ai_text_response)
+            if not spoken:
+                say(ai_text_response)
             self.memory.append("ai_response", ai_text_response)
+            if cache_key is not None and turn.cacheable and ai_text_response != "I'm not sure how to respond to that.":
+                self.response_cache.put(*cache_key, ai_text_response)
             return True
         except Exception as e:
             self.logger.error(f"LLM processing error: {e}")
-            self.voice.speak("I seem to have trouble thinking right now. Please try again.")
+            say("I seem to have trouble thinking right now. Please try again.")
             return True
 
+    def _route(self, cmd: str) -> str | None:
+        """Answer simple requests through the intent router; None sends the command to the LLM."""
+        if self.router is None or any(w in cmd.lower() for w in ("quit", "exit", "stop", "goodbye")):
+            return None
+        try:
+            with span("route"):
+                return self.router.route(cmd)
+        except Exception as e:
+            self.logger.error(f"Intent routing failed: {e}")
+            return None
+
+    def _cache_key(self, cmd: str, user_name: str) -> tuple | None:
+        """
+        Build the response cache key for a command.
+        Returns:
+            tuple | None: (utterance embedding, context), or None if the cache is off,
+            no model is loaded, or the command ends the session.
+        """
+        if self.response_cache is None or any(w in cmd.lower() for w in ("quit", "exit", "stop", "goodbye")):
+            return None
+        vectors = self.semantic.encode([cmd])
+        if vectors is None:
+            return None
+        # Facts embedded after warm-up or by a compaction change recall without a remember call.
+        return vectors[0], (user_name, self._state_version, self.semantic.version)
+
+    def _mark_first_audio(self, turn: Turn) -> None:
+        """Record and report time-to-first-audio for a turn."""
+        ms = turn.mark_first_audio()
+        if ms is not None:
+            self.logger.info(f"Time to first audio: {ms:.0f} ms")
+
+    def _run_tool_calls(self, tool_calls: list, messages: list, cmd: str, turn: Turn) -> None:
+        """
+        Execute the model's tool calls and append their results to the conversation.
+        Args:
+            tool_calls (list): ``{"id", "function": {"name", "arguments"}}`` dicts.
+            messages (list): The chat messages; tool messages are appended in call order.
+            cmd (str): The user command, for the interaction log.
+            turn (Turn): The current turn; checked for cancellation before and after the calls.
+        """
+        turn.check()
+        self.memory.append("ai_tool_decision", f"Decided to call tools: {[tc['function']['name'] for tc in tool_calls]}", cmd)
+        calls = []
+        for tool_call in tool_calls:
+            function_name = tool_call["function"]["name"]
+            function_args = json.loads(tool_call["function"]["arguments"] or "{}")
+            self.memory.append("tool_call", f"Calling: {function_name} with args: {function_args}", cmd)
+            calls.append((function_name, function_args))
+            tool = self.tools.get(function_name)
+            if tool is None or not tool.cacheable:
+                turn.cacheable = False
+        # Independent calls run concurrently; results come back in call order.
+        results = self.tools.run_many(calls)
+        turn.check()
+        for tool_call, function_response in zip(tool_calls, results):
+            function_name = tool_call["function"]["name"]
+            self.memory.append("tool_response", f"Function {function_name} returned: {function_response}", cmd)
+            messages.append({
+                "tool_call_id": tool_call["id"],
+                "role": "tool",
+                "name": function_name,
+                "content": function_response,
+            })
+
+    def _complete_reply(self, messages: list, cmd: str, turn: Turn) -> str:
+        """Get the reply with blocking completions, running any tool calls in between."""
+        with span("llm"):
+            llm_response = self.llm.openai_client.chat.completions.create(
+                model=self.cfg.openai_model_name,
+                messages=messages,
+                tools=self.tools.payload,
+                tool_choice="auto",
+                temperature=0.7,
+                max_tokens=150
+            )
+        turn.check()
+        response_message = llm_response.choices[0].message
+        if not response_message.tool_calls:
+            return response_message.content.strip() if response_message.content else "I'm not sure how to respond to that."
+        messages.append(response_message)
+        self._run_tool_calls(
+            [
+                {"id": tc.id, "type": "function", "function": {"name": tc.function.name, "arguments": tc.function.arguments}}
+                for tc in response_message.tool_calls
+            ],
+            messages,
+            cmd,
+            turn,
+        )
+        with span("llm"):
+            second_response = self.llm.openai_client.chat.completions.create(
+                model=self.cfg.openai_model_name,
+                messages=messages,
+            )
+        return second_response.choices[0].message.content.strip()
+
+    def _stream_reply(self, messages: list, cmd: str, say: Callable[[str], None], turn: Turn) -> str:
+        """
+        Stream the reply, handing each sentence to ``say`` as soon as it is complete.
+        Args:
+            messages (list): The chat messages.
+            cmd (str): The user command, for the interaction log.
+            say (Callable[[str], None]): Receives each finished sentence.
+            turn (Turn): The current turn; checked for cancellation between steps.
+        Returns:
+            str: The full reply text (already handed to ``say``), or "" if the model produced none.
+        """
+        chunker = SentenceChunker()
+
+        def on_text(delta: str) -> None:
+            turn.check()
+            for sentence in chunker.feed(delta):
+                say(sentence)
+
+        with span("llm"):
+            content, tool_calls = collect_stream(
+                self.llm.openai_client.chat.completions.create(
+                    model=self.cfg.openai_model_name,
+                    messages=messages,
+                    tools=self.tools.payload,
+                    tool_choice="auto",
+                    temperature=0.7,
+                    max_tokens=150,
+                    stream=True,
+                ),
+                on_text,
+            )
+        if tool_calls:
+            messages.append({"role": "assistant", "content": content or None, "tool_calls": tool_calls})
+            self._run_tool_calls(tool_calls, messages, cmd, turn)
+            with span("llm"):
+                more, _ = collect_stream(
+                    self.llm.openai_client.chat.completions.create(
+                        model=self.cfg.openai_model_name,
+                        messages=messages,
+                        stream=True,
+                    ),
+                    on_text,
+                )
+            content = f"{content} {more}" if content.strip() else more
+        rest = chunker.flush()
+        if rest:
+            say(rest)
+        return content.strip()
+
     def run(self) -> None:
         """
         Main loop: listens for user input and processes commands until exit.
         """
         self.voice.speak("Personal AI online.")
-        while True:
-            for rem in self.memory.pop_due_reminders():
-                self.voice.speak(f"Reminder: {rem['text']}")
-            heard = self.voice.listen()
-            if not heard:
-                continue
-            if any(wake in heard for wake in self.cfg.wake_words):
-                name = self.memory.data["user_preferences"].get("name", "")
-                self.voice.speak(f"Yes{', ' + name if name else ''}?")
+        self.scheduler.start()
+        try:
+            while True:
                 heard = self.voice.listen()
-            if not heard:
-                continue
-            if not self._process(heard):
-                break 
\ No newline at end of file
+                if not heard:
+                    continue
+                if any(wake in heard for wake in self.cfg.wake_words):
+                    name = self.memory.get_preference("name", "")
+                    self.voice.speak(f"Yes{', ' + name if name else ''}?")
+                    heard = self.voice.listen()
+                if not heard:
+                    continue
+                keep_going = self._process(heard)
+                if not keep_going:
+                    break
+        finally:
+            self.scheduler.stop()
+            self.tracer.close()
+            self.plugin_executor.close()
+            self.tools.close()
+            self.semantic.close()
+            self.memory.close() 
\ No newline at end of file
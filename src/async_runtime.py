@@ -0,0 +1,240 @@
+"""
+asyncio runtime for the voice assistant.
+
+    python -m src.async_runtime
+
+Microphone capture, thinking (LLM calls and tools), speech synthesis,
+playback and reminder timers run as concurrent tasks.  Blocking pieces
+(``VoiceIO``, the OpenAI client, plugins and tools) run on executor threads.
+The microphone stays open while the assistant speaks, so utterances that
+mostly repeat what it just said are dropped as its own echo.  With
+``barge_in`` on, speaking while a reply is still being generated or played
+cancels it and the new utterance is handled; otherwise the new utterance
+waits for the reply to finish.
+"""
+import asyncio
+import math
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Deque, Iterator, List, Optional, Set, Tuple
+from src.logging import get_logger
+from src.tracing import bind_turn
+from src.turn import Turn, TurnCancelled
+
+# How often the reminder task re-checks for reminders scheduled meanwhile.
+REMINDER_POLL_SEC = 1.0
+# Seconds after playback ends during which a heard utterance may still be its echo
+# (the phrase was captured while playing and recognized afterwards).
+ECHO_WINDOW_SEC = 3.0
+# Share of an utterance's words found in recently spoken text for it to count as echo.
+ECHO_OVERLAP = 0.6
+
+
+def _words(text: str) -> Set[str]:
+    return set(re.findall(r"[a-z0-9']+", text.lower()))
+
+
+class AsyncRuntime:
+    """
+    Event-loop driver for a :class:`~src.assistant.PersonalAI`.
+    """
+
+    def __init__(self, assistant: Any) -> None:
+        """
+        Wrap an assistant.
+        Args:
+            assistant: The PersonalAI whose memory, tools and voice are used.
+        """
+        self.ai = assistant
+        self.voice = assistant.voice
+        self.barge_in = getattr(assistant.cfg, "barge_in", False)
+        self.logger = get_logger(__name__)
+        self._staged = hasattr(self.voice, "synthesize") and hasattr(self.voice, "play")
+        # Listening blocks for up to listen_timeout; keep it off the shared pool.
+        self._listen_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="listen")
+        self._turn: Optional[asyncio.Task] = None
+        # [end time (inf while playing), words] of recent speech, for the echo check.
+        self._spoken: Deque[List[Any]] = deque(maxlen=8)
+
+    async def _blocking(self, fn: Any, *args: Any) -> Any:
+        # Bound to the calling task's context so spans land in that task's turn.
+        return await asyncio.get_running_loop().run_in_executor(None, bind_turn(fn), *args)
+
+    @contextmanager
+    def _speaking(self, text: str) -> Iterator[None]:
+        """Remember ``text`` as being spoken, for the echo check."""
+        entry = [math.inf, _words(text)]
+        self._spoken.append(entry)
+        try:
+            yield
+        finally:
+            entry[0] = time.monotonic()
+
+    def _is_echo(self, text: str) -> bool:
+        """True if ``text`` is mostly words the assistant is saying or just said."""
+        heard = _words(text)
+        if not heard:
+            return False
+        cutoff = time.monotonic() - ECHO_WINDOW_SEC
+        return any(
+            ended >= cutoff and len(heard & spoken) >= ECHO_OVERLAP * len(heard)
+            for ended, spoken in list(self._spoken)
+        )
+
+    async def _listen(self, heard: "asyncio.Queue[str]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            text = await loop.run_in_executor(self._listen_pool, self.voice.listen)
+            if not text:
+                continue
+            if self._is_echo(text):
+                self.logger.debug(f"Ignoring '{text}': echo of the assistant's own speech.")
+                continue
+            await heard.put(text)
+
+    def _say(self, text: str) -> None:
+        with self._speaking(text):
+            self.voice.speak(text)
+
+    def _play(self, turn: Turn, text: str, audio: Optional[bytes]) -> None:
+        with self._speaking(text):
+            if self._staged:
+                self.voice.play(text, audio, on_start=lambda: self.ai._mark_first_audio(turn))
+            else:
+                self.ai._mark_first_audio(turn)
+                self.voice.speak(text)
+
+    async def _speak(self, turn: Turn, sentences: "asyncio.Queue[Optional[str]]") -> None:
+        """Synthesize the next sentence while the current one plays."""
+        audio_q: "asyncio.Queue[Optional[Tuple[str, Optional[bytes]]]]" = asyncio.Queue(maxsize=2)
+
+        async def synthesize() -> None:
+            while True:
+                text = await sentences.get()
+                if text is None:
+                    await audio_q.put(None)
+                    return
+                audio = await self._blocking(self.voice.synthesize, text) if self._staged else None
+                await audio_q.put((text, audio))
+
+        synth = asyncio.create_task(synthesize())
+        try:
+            while True:
+                item = await audio_q.get()
+                if item is None:
+                    return
+                await self._blocking(self._play, turn, *item)
+        finally:
+            synth.cancel()
+
+    async def _run_turn(self, cmd: str) -> bool:
+        """Think and speak one reply; cancellable at any await."""
+        loop = asyncio.get_running_loop()
+        turn = Turn()
+        sentences: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
+
+        def say(text: str) -> None:
+            turn.check()
+            loop.call_soon_threadsafe(sentences.put_nowait, text)
+
+        # Set in this task's context only; overlapping turns keep separate breakdowns.
+        trace = self.ai.tracer.begin_turn()
+        speaker = asyncio.create_task(self._speak(turn, sentences))
+        try:
+            keep_going = await self._blocking(self.ai.respond, cmd, say, turn)
+            sentences.put_nowait(None)
+            await speaker
+            await self._blocking(self.ai.memory.flush)
+            return keep_going
+        except asyncio.CancelledError:
+            # The worker thread stops at its next check (between LLM, tool and
+            # memory steps, or at say()); playback is cut now.
+            turn.cancel()
+            speaker.cancel()
+            if hasattr(self.voice, "stop"):
+                self.voice.stop()
+            raise
+        finally:
+            self.ai.tracer.end_turn(trace)
+
+    async def _reminders(self) -> None:
+        scheduler = self.ai.scheduler
+        while True:
+            for reminder in await self._blocking(scheduler.pop_due):
+                try:
+                    await self._blocking(self._say, f"Reminder: {reminder['text']}")
+                except Exception as e:
+                    self.logger.error(f"Error announcing reminder '{reminder.get('text')}': {e}")
+                    scheduler.retry(reminder)
+                    continue
+                # Deleted only once spoken; a reminder cut off by shutdown fires on the next start.
+                await self._blocking(scheduler.complete, reminder)
+            due = scheduler.next_due()
+            delay = REMINDER_POLL_SEC if due is None else due - time.time()
+            await asyncio.sleep(min(max(delay, 0.0), REMINDER_POLL_SEC))
+
+    async def _interrupt(self) -> None:
+        """Finish with the current turn: cancel it (barge-in) or wait for it."""
+        turn, self._turn = self._turn, None
+        if turn is None or turn.done():
+            return
+        if self.barge_in:
+            self.logger.info("Barge-in: cancelling the current reply.")
+            turn.cancel()
+        await asyncio.wait([turn])
+
+    async def run(self) -> None:
+        """Run until the user ends the session."""
+        heard: "asyncio.Queue[str]" = asyncio.Queue()
+        background = [
+            asyncio.create_task(self._listen(heard)),
+            asyncio.create_task(self._reminders()),
+        ]
+        try:
+            await self._blocking(self._say, "Personal AI online.")
+            next_heard: Optional[asyncio.Task] = None
+            while True:
+                if next_heard is None:
+                    next_heard = asyncio.create_task(heard.get())
+                turn = self._turn
+                waiting = {next_heard} | ({turn} if turn is not None else set())
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if turn in done:
+                    self._turn = None
+                    if turn.exception() is not None:
+                        self.logger.error(f"Turn failed: {turn.exception()}")
+                    elif turn.result() is False:
+                        next_heard.cancel()
+                        return
+                if next_heard not in done:
+                    continue
+                text, next_heard = next_heard.result(), None
+                await self._interrupt()
+                if any(wake in text for wake in self.ai.cfg.wake_words):
+                    name = self.ai.memory.get_preference("name", "")
+                    self._turn = asyncio.create_task(
+                        self._blocking(self._say, f"Yes{', ' + name if name else ''}?")
+                    )
+                    continue
+                self._turn = asyncio.create_task(self._run_turn(text))
+        finally:
+            for task in background:
+                task.cancel()
+            if self._turn is not None:
+                self._turn.cancel()
+            self._listen_pool.shutdown(wait=False)
+            self.ai.tracer.close()
+            self.ai.plugin_executor.close()
+            self.ai.tools.close()
+            self.ai.semantic.close()
+            self.ai.memory.close()
+
+
+if __name__ == "__main__":
+    from src.assistant import PersonalAI
+    from src.config import Settings
+
+    asyncio.run(AsyncRuntime(PersonalAI(Settings.load())).run())
@@ -0,0 +1,106 @@
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i in is it its me my of on or "
+    "that the their this to was were what with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with common stopwords removed."""
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Incrementally updated inverted index with Okapi BM25 scoring.
+
+    Each term maps to a posting list of ``{doc_id: term frequency}``; a query
+    only touches the postings of its own terms, so its cost depends on how
+    common those terms are rather than on the number of documents.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        """
+        Initialize an empty index.
+        Args:
+            k1 (float): Term-frequency saturation.
+            b (float): Document-length normalization strength.
+        """
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, List[str]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: str, text: str) -> None:
+        """
+        Index a document, replacing any previous text under the same id.
+        Args:
+            doc_id (str): Document id.
+            text (str): Document text.
+        """
+        tokens = tokenize(text)
+        counts: Dict[str, int] = defaultdict(int)
+        for token in tokens:
+            counts[token] += 1
+        with self._lock:
+            self.remove(doc_id)
+            for token, tf in counts.items():
+                self._postings[token][doc_id] = tf
+            self._lengths[doc_id] = len(tokens)
+            self._terms[doc_id] = list(counts)
+            self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        """Drop a document from the index; unknown ids are ignored."""
+        with self._lock:
+            length = self._lengths.pop(doc_id, None)
+            if length is None:
+                return
+            self._total_length -= length
+            for token in self._terms.pop(doc_id):
+                posting = self._postings[token]
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[token]
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Return the ``k`` best-scoring documents for a free-text query.
+        Args:
+            query (str): The query text.
+            k (int): Number of results.
+        Returns:
+            List[Tuple[str, float]]: (doc_id, BM25 score) pairs, best first.
+        """
+        terms = set(tokenize(query))
+        scores: Dict[str, float] = defaultdict(float)
+        with self._lock:
+            n = len(self._lengths)
+            if n == 0 or not terms:
+                return []
+            avg_length = self._total_length / n or 1.0
+            for term in terms:
+                posting = self._postings.get(term)
+                if not posting:
+                    continue
+                idf = math.log(1.0 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    norm = tf + self.k1 * (1.0 - self.b + self.b * self._lengths[doc_id] / avg_length)
+                    scores[doc_id] += idf * tf * (self.k1 + 1.0) / norm
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
@@ -26,7 +26,18 @@ def _load_yaml_config(path: str) -> dict:
 
 
 def _env_or_yaml(key: str, yaml_cfg: dict, default=None):
-    return os.getenv(key) or yaml_cfg.get(key.lower()) or default
+    # Presence, not truthiness: ``false`` and ``0`` in config.yaml are real settings.
+    value = os.getenv(key)
+    if value:
+        return value
+    value = yaml_cfg.get(key.lower())
+    return default if value is None else value
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
 
 
 class Settings(BaseModel if USE_PYDANTIC else object):
@@ -42,6 +53,42 @@ class Settings(BaseModel if USE_PYDANTIC else object):
         "hey assistant", "hello assistant", "assistant"
     ])
     max_interactions: int = 100
+    memory_backend: str = "json"
+    memory_journal: bool = False
+    journal_compact_threshold: int = 1000
+    memory_flush_interval_ms: int = 200
+    archive_interactions: bool = True
+    embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_server: str = ""
+    embedding_server_authkey: str = ""
+    embedding_cache_size: int = 1024
+    embedding_cache_persist: bool = True
+    embedding_precision: str = "float32"
+    embedding_rescore: bool = True
+    hybrid_recall: bool = False
+    fact_dedup_threshold: float = 0.92
+    tool_workers: int = 4
+    tool_timeout_sec: float = 10.0
+    stream_responses: bool = False
+    barge_in: bool = False
+    intent_routing: bool = True
+    intent_threshold: float = 0.8
+    response_cache: bool = False
+    response_cache_threshold: float = 0.95
+    response_cache_ttl_sec: float = 3600.0
+    response_cache_size: int = 256
+    lazy_plugins: bool = True
+    tracing: bool = False
+    trace_file: str = ""
+    trace_window: int = 1000
+    plugin_workers: int = 4
+    plugin_timeout_sec: float = 8.0
+    plugin_ack_sec: float = 1.5
+    plugin_failure_threshold: int = 3
+    plugin_reset_sec: float = 60.0
+    ann_index: bool = False
+    ann_nprobe: int = 8
+    ann_min_facts: int = 20000
     ambient_adjust_sec: float = 0.5
     listen_timeout: int = 10
     phrase_time_limit: int = 7
@@ -66,6 +113,42 @@ class Settings(BaseModel if USE_PYDANTIC else object):
                 "hey assistant", "hello assistant", "assistant"
             ],
             "max_interactions": int(_env_or_yaml("MAX_INTERACTIONS", yaml_cfg, 100)),
+            "memory_backend": _env_or_yaml("MEMORY_BACKEND", yaml_cfg, "json"),
+            "memory_journal": _as_bool(_env_or_yaml("MEMORY_JOURNAL", yaml_cfg, False)),
+            "journal_compact_threshold": int(_env_or_yaml("JOURNAL_COMPACT_THRESHOLD", yaml_cfg, 1000)),
+            "memory_flush_interval_ms": int(_env_or_yaml("MEMORY_FLUSH_INTERVAL_MS", yaml_cfg, 200)),
+            "archive_interactions": _as_bool(_env_or_yaml("ARCHIVE_INTERACTIONS", yaml_cfg, True)),
+            "embedding_model": _env_or_yaml("EMBEDDING_MODEL", yaml_cfg, "all-MiniLM-L6-v2"),
+            "embedding_server": _env_or_yaml("EMBEDDING_SERVER", yaml_cfg, ""),
+            "embedding_server_authkey": _env_or_yaml("EMBEDDING_SERVER_AUTHKEY", yaml_cfg, ""),
+            "embedding_cache_size": int(_env_or_yaml("EMBEDDING_CACHE_SIZE", yaml_cfg, 1024)),
+            "embedding_cache_persist": _as_bool(_env_or_yaml("EMBEDDING_CACHE_PERSIST", yaml_cfg, True)),
+            "embedding_precision": _env_or_yaml("EMBEDDING_PRECISION", yaml_cfg, "float32"),
+            "embedding_rescore": _as_bool(_env_or_yaml("EMBEDDING_RESCORE", yaml_cfg, True)),
+            "hybrid_recall": _as_bool(_env_or_yaml("HYBRID_RECALL", yaml_cfg, False)),
+            "fact_dedup_threshold": float(_env_or_yaml("FACT_DEDUP_THRESHOLD", yaml_cfg, 0.92)),
+            "tool_workers": int(_env_or_yaml("TOOL_WORKERS", yaml_cfg, 4)),
+            "tool_timeout_sec": float(_env_or_yaml("TOOL_TIMEOUT_SEC", yaml_cfg, 10.0)),
+            "stream_responses": _as_bool(_env_or_yaml("STREAM_RESPONSES", yaml_cfg, False)),
+            "barge_in": _as_bool(_env_or_yaml("BARGE_IN", yaml_cfg, False)),
+            "intent_routing": _as_bool(_env_or_yaml("INTENT_ROUTING", yaml_cfg, True)),
+            "intent_threshold": float(_env_or_yaml("INTENT_THRESHOLD", yaml_cfg, 0.8)),
+            "response_cache": _as_bool(_env_or_yaml("RESPONSE_CACHE", yaml_cfg, False)),
+            "response_cache_threshold": float(_env_or_yaml("RESPONSE_CACHE_THRESHOLD", yaml_cfg, 0.95)),
+            "response_cache_ttl_sec": float(_env_or_yaml("RESPONSE_CACHE_TTL_SEC", yaml_cfg, 3600.0)),
+            "response_cache_size": int(_env_or_yaml("RESPONSE_CACHE_SIZE", yaml_cfg, 256)),
+            "lazy_plugins": _as_bool(_env_or_yaml("LAZY_PLUGINS", yaml_cfg, True)),
+            "tracing": _as_bool(_env_or_yaml("TRACING", yaml_cfg, False)),
+            "trace_file": _env_or_yaml("TRACE_FILE", yaml_cfg, ""),
+            "trace_window": int(_env_or_yaml("TRACE_WINDOW", yaml_cfg, 1000)),
+            "plugin_workers": int(_env_or_yaml("PLUGIN_WORKERS", yaml_cfg, 4)),
+            "plugin_timeout_sec": float(_env_or_yaml("PLUGIN_TIMEOUT_SEC", yaml_cfg, 8.0)),
+            "plugin_ack_sec": float(_env_or_yaml("PLUGIN_ACK_SEC", yaml_cfg, 1.5)),
+            "plugin_failure_threshold": int(_env_or_yaml("PLUGIN_FAILURE_THRESHOLD", yaml_cfg, 3)),
+            "plugin_reset_sec": float(_env_or_yaml("PLUGIN_RESET_SEC", yaml_cfg, 60.0)),
+            "ann_index": _as_bool(_env_or_yaml("ANN_INDEX", yaml_cfg, False)),
+            "ann_nprobe": int(_env_or_yaml("ANN_NPROBE", yaml_cfg, 8)),
+            "ann_min_facts": int(_env_or_yaml("ANN_MIN_FACTS", yaml_cfg, 20000)),
             "ambient_adjust_sec": float(_env_or_yaml("AMBIENT_ADJUST_SEC", yaml_cfg, 0.5)),
             "listen_timeout": int(_env_or_yaml("LISTEN_TIMEOUT", yaml_cfg, 10)),
             "phrase_time_limit": int(_env_or_yaml("PHRASE_TIME_LIMIT", yaml_cfg, 7)),
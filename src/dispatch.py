@@ -0,0 +1,60 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Handler = Callable[..., Any]
+
+
+class CommandMatcher:
+    """
+    Routes an utterance to a plugin command keyword with one compiled regex.
+
+    All keywords are folded into a single case-insensitive alternation,
+    anchored on word boundaries and wrapped in a lookahead so one scan reports
+    every position where some keyword starts.  When several keywords occur the
+    winner is chosen deterministically: the longest keyword, then the earliest
+    position in the utterance, then the earliest registration.
+    """
+
+    def __init__(self, commands: Dict[str, Handler]) -> None:
+        """
+        Compile the matcher.
+        Args:
+            commands (Dict[str, Handler]): Keyword to handler, in registration order.
+        """
+        self._handlers: Dict[str, Handler] = {}
+        self._order: Dict[str, int] = {}
+        for keyword, handler in commands.items():
+            key = keyword.lower().strip()
+            if not key:
+                continue
+            self._order.setdefault(key, len(self._order))
+            self._handlers[key] = handler
+        self._pattern: Optional[re.Pattern] = None
+        if self._handlers:
+            # Longest first, so each position reports its longest keyword.
+            keywords = sorted(self._handlers, key=lambda k: (-len(k), self._order[k]))
+            alternation = "|".join(re.escape(k) for k in keywords)
+            self._pattern = re.compile(rf"(?=(?<!\w)({alternation})(?!\w))", re.IGNORECASE)
+
+    def __len__(self) -> int:
+        return len(self._handlers)
+
+    def matches(self, text: str) -> List[Tuple[int, str]]:
+        """Return (position, keyword) for every keyword occurrence in ``text``."""
+        if self._pattern is None:
+            return []
+        return [(m.start(), m.group(1).lower()) for m in self._pattern.finditer(text)]
+
+    def match(self, text: str) -> Optional[Tuple[str, Handler]]:
+        """
+        Pick the command for an utterance.
+        Args:
+            text (str): The user utterance.
+        Returns:
+            Optional[Tuple[str, Handler]]: The winning keyword and its handler, or None.
+        """
+        found = self.matches(text)
+        if not found:
+            return None
+        _, keyword = min(found, key=lambda hit: (-len(hit[1]), hit[0], self._order[hit[1]]))
+        return keyword, self._handlers[keyword]
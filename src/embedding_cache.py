@@ -0,0 +1,163 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from src.logging import get_logger
+
+Encoder = Callable[[List[str]], np.ndarray]
+
+# Bumped when the key derivation changes so stale persisted vectors are never served.
+KEY_VERSION = 2
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace; case is kept because cased models embed it."""
+    return " ".join(text.split())
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of text embeddings keyed by (model name, normalized text hash).
+
+    An in-memory LRU sits in front of a persistent SQLite table, so repeated
+    topics skip the transformer forward pass within a session and across
+    restarts.  Hit/miss counters and the average encode time of misses give an
+    estimate of the latency saved.
+    """
+
+    def __init__(self, path: Optional[Path], model_name: str, capacity: int = 1024) -> None:
+        """
+        Initialize the cache.
+        Args:
+            path (Optional[Path]): SQLite file for the persistent tier, or None for memory only.
+            model_name (str): Embedding model the vectors belong to.
+            capacity (int): Number of vectors kept in the in-memory LRU.
+        """
+        self.model_name = model_name
+        self.capacity = capacity
+        self.logger = get_logger(__name__)
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._miss_seconds = 0.0
+        self.conn: Optional[sqlite3.Connection] = None
+        if path is not None:
+            try:
+                self.conn = sqlite3.connect(str(path), check_same_thread=False)
+                with self.conn:
+                    self.conn.execute(
+                        "CREATE TABLE IF NOT EXISTS embeddings ("
+                        "key TEXT PRIMARY KEY, model TEXT NOT NULL, vector BLOB NOT NULL)"
+                    )
+            except sqlite3.Error as exc:
+                self.logger.warning(f"Embedding cache store unavailable ({exc}); using memory only.")
+                self.conn = None
+
+    def key(self, text: str) -> str:
+        """Cache key for a text under the current model."""
+        digest = hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model_name}:v{KEY_VERSION}:{digest}"
+
+    def _get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._lru.get(key)
+            if vector is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vector
+            if self.conn is None:
+                return None
+            row = self.conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            vector = np.frombuffer(row[0], dtype=np.float32)
+            self._remember(key, vector)
+            self.disk_hits += 1
+            return vector
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.capacity:
+            self._lru.popitem(last=False)
+
+    def _put_many(self, items: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            for key, vector in items.items():
+                self._remember(key, vector)
+            if self.conn is not None:
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO embeddings(key, model, vector) VALUES (?, ?, ?)",
+                        [(k, self.model_name, v.tobytes()) for k, v in items.items()],
+                    )
+
+    def encode(self, text: str, encoder: Encoder) -> np.ndarray:
+        """
+        Return the embedding for ``text``, computing it with ``encoder`` on a miss.
+        Args:
+            text (str): Text to embed.
+            encoder (Encoder): Encodes a list of texts into a (n, dim) array.
+        Returns:
+            np.ndarray: The float32 embedding.
+        """
+        return self.encode_many([text], encoder)[0]
+
+    def encode_many(self, texts: List[str], encoder: Encoder) -> np.ndarray:
+        """
+        Batch variant of :meth:`encode`; only the misses are sent to the encoder.
+        Args:
+            texts (List[str]): Texts to embed.
+            encoder (Encoder): Encodes a list of texts into a (n, dim) array.
+        Returns:
+            np.ndarray: A (len(texts), dim) float32 array.
+        """
+        keys = [self.key(t) for t in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in missing:
+                continue
+            vector = self._get(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                found[key] = vector
+        if missing:
+            start = time.perf_counter()
+            vectors = np.asarray(encoder(list(missing.values())), dtype=np.float32)
+            elapsed = time.perf_counter() - start
+            computed = dict(zip(missing.keys(), vectors))
+            with self._lock:
+                self.misses += len(missing)
+                self._miss_seconds += elapsed
+            self._put_many(computed)
+            found.update(computed)
+        return np.stack([found[k] for k in keys])
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the estimated encode time saved."""
+        with self._lock:
+            hits = self.hits + self.disk_hits
+            avg_miss_ms = (self._miss_seconds / self.misses * 1000) if self.misses else 0.0
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / (hits + self.misses) if hits + self.misses else 0.0,
+                "avg_miss_ms": avg_miss_ms,
+                "saved_ms": hits * avg_miss_ms,
+            }
+
+    def close(self) -> None:
+        """Close the persistent store."""
+        with self._lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
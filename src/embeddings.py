@@ -0,0 +1,131 @@
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+import numpy as np
+from src.logging import get_logger
+
+# Fixed-size .npy header so the row count can be rewritten in place on append.
+HEADER_LEN = 128
+DTYPE = np.dtype("<f4")
+
+
+def _header(rows: int, dim: int) -> bytes:
+    desc = repr({"descr": DTYPE.str, "fortran_order": False, "shape": (rows, dim)})
+    prefix = np.lib.format.magic(1, 0) + struct.pack("<H", HEADER_LEN - 10)
+    body = desc.ljust(HEADER_LEN - len(prefix) - 1) + "\n"
+    return prefix + body.encode("latin1")
+
+
+class EmbeddingStore:
+    """
+    Append-only float32 matrix of fact embeddings kept in a ``.npy`` sidecar.
+
+    Rows are addressed by integer id (``embedding_row`` on each learned fact),
+    appends write only the new rows plus the fixed-size header, and reads go
+    through a memory map so the matrix is never parsed into Python floats.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Open (or lazily create) the embedding sidecar.
+        Args:
+            path (Path): Path to the ``.npy`` file.
+        """
+        self.path = Path(path)
+        self.logger = get_logger(__name__)
+        self._lock = threading.RLock()
+        self._rows = 0
+        self._dim: Optional[int] = None
+        self._mmap: Optional[np.ndarray] = None
+        # Set when an unreadable sidecar was moved aside; stored row ids are then invalid.
+        self.reset_from: Optional[Path] = None
+        if self.path.exists():
+            try:
+                arr = np.load(self.path, mmap_mode="r")
+                self._rows, self._dim = arr.shape
+                self._mmap = arr
+                if arr.offset != HEADER_LEN or arr.dtype != DTYPE:
+                    self._rewrite(np.array(arr, dtype=DTYPE))
+            except (ValueError, OSError) as exc:
+                self._rows, self._dim, self._mmap = 0, None, None
+                aside = self.path.with_name(f"{self.path.name}.corrupt-{int(time.time())}")
+                self.path.replace(aside)
+                self.reset_from = aside
+                self.logger.warning(
+                    f"Embedding sidecar unreadable ({exc}) – moved to {aside.name}, starting fresh."
+                )
+
+    def _rewrite(self, matrix: np.ndarray) -> None:
+        """Rewrite the sidecar with the fixed-size header this store appends to."""
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_bytes(_header(*matrix.shape) + matrix.tobytes())
+        self._mmap = None
+        tmp.replace(self.path)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def dim(self) -> Optional[int]:
+        """Embedding dimensionality, or None before the first append."""
+        return self._dim
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only memory-mapped view of all rows."""
+        with self._lock:
+            if self._rows == 0:
+                return np.empty((0, self._dim or 0), dtype=DTYPE)
+            if self._mmap is None or self._mmap.shape[0] != self._rows:
+                self._mmap = np.load(self.path, mmap_mode="r")
+            return self._mmap
+
+    def get(self, row: int) -> Optional[np.ndarray]:
+        """Return one embedding row, or None if the id is out of range."""
+        if row is None or not 0 <= row < self._rows:
+            return None
+        return self.matrix[row]
+
+    def append(self, vector: Iterable[float]) -> int:
+        """
+        Append one embedding.
+        Args:
+            vector (Iterable[float]): The embedding.
+        Returns:
+            int: The new row id.
+        """
+        return self.append_many(np.asarray(vector, dtype=DTYPE).reshape(1, -1))
+
+    def append_many(self, vectors: np.ndarray) -> int:
+        """
+        Append several embeddings with a single write.
+        Args:
+            vectors (np.ndarray): A (n, dim) array.
+        Returns:
+            int: Row id of the first appended vector.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=DTYPE)
+        if vectors.ndim != 2:
+            raise ValueError("Expected a 2-D array of embeddings.")
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(
+                    f"Embedding dimension {vectors.shape[1]} does not match store dimension {self._dim}."
+                )
+            first = self._rows
+            rows = first + vectors.shape[0]
+            if not self.path.exists():
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.write_bytes(_header(0, self._dim))
+            self._mmap = None
+            with self.path.open("r+b") as fh:
+                fh.seek(HEADER_LEN + first * self._dim * DTYPE.itemsize)
+                fh.write(vectors.tobytes())
+                fh.seek(0)
+                fh.write(_header(rows, self._dim))
+            self._rows = rows
+            return first
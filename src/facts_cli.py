@@ -0,0 +1,82 @@
+"""
+Offline maintenance for learned facts.
+
+    python -m src.facts_cli import facts.txt --workers 4
+    python -m src.facts_cli reindex
+    python -m src.facts_cli compact --threshold 0.92
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Iterator
+from src.config import Settings
+from src.logging import get_logger
+from src.memory import create_memory
+from src.semantic import SemanticMemory
+
+
+def _read_lines(path: Path) -> Iterator[str]:
+    with path.open("r", encoding="utf-8") as fh:
+        for line in fh:
+            yield line.rstrip("\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk fact import, re-embedding and compaction.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Embed and store one fact per line of a text file.")
+    imp.add_argument("file", type=Path)
+    sub.add_parser("reindex", help="Re-embed every stored fact with the configured model.")
+    for p in sub.choices.values():
+        p.add_argument("--batch-size", type=int, default=256)
+        p.add_argument("--workers", type=int, default=1, help="Encoder processes (1 = in-process).")
+    comp = sub.add_parser("compact", help="Merge near-duplicate facts and shrink the stores.")
+    comp.add_argument("--threshold", type=float, default=None, help="Cosine similarity cut-off.")
+    args = parser.parse_args(argv)
+
+    logger = get_logger(__name__)
+    cfg = Settings.load()
+    memory = create_memory(cfg)
+    semantic = SemanticMemory(memory, cfg)
+    try:
+        if args.command == "compact":
+            return _compact(semantic, memory, args.threshold)
+        if args.command == "import":
+            stats = semantic.bulk_import(_read_lines(args.file), args.batch_size, args.workers)
+        else:
+            stats = semantic.reindex(args.batch_size, args.workers)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        semantic.close()
+        memory.close()
+    print(
+        f"{args.command}: {stats['facts']} facts in {stats['seconds']:.1f}s "
+        f"({stats['facts_per_sec']:.0f} facts/s)"
+    )
+    return 0
+
+
+def _size(path: Path) -> int:
+    return path.stat().st_size if path.exists() else 0
+
+
+def _compact(semantic: SemanticMemory, memory, threshold) -> int:
+    # Without the model only exact (case/whitespace-insensitive) duplicates merge.
+    semantic.ready.result()
+    store_before = _size(memory.path)
+    stats = semantic.compact(threshold)
+    memory.compact()
+    store_after = _size(memory.path)
+    before = stats["sidecar_bytes_before"] + store_before
+    after = stats["sidecar_bytes_after"] + store_after
+    print(f"facts:   {stats['facts_before']} -> {stats['facts_after']}")
+    print(f"store:   {store_before} -> {store_after} bytes ({memory.path.name})")
+    print(f"vectors: {stats['sidecar_bytes_before']} -> {stats['sidecar_bytes_after']} bytes")
+    print(f"total:   {before} -> {after} bytes ({(1 - after / before) * 100 if before else 0.0:.1f}% smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
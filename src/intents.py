@@ -0,0 +1,129 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+from src.logging import get_logger
+
+# Cosine similarity an utterance needs with an intent's closest exemplar.
+INTENT_THRESHOLD = 0.8
+# The winning intent must beat the best other intent by at least this much.
+INTENT_MARGIN = 0.05
+
+Encoder = Callable[[List[str]], Optional[np.ndarray]]
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    A simple request that can be answered without the LLM.
+    Args:
+        name (str): Identifier used in logs.
+        examples (Sequence[str]): Exemplar phrasings of the request.
+        handler (Optional[Callable[[str], str]]): Called with the utterance; returns the reply
+            to speak.  None marks near-miss phrasings that must go to the LLM.
+    """
+    name: str
+    examples: Sequence[str]
+    handler: Optional[Callable[[str], str]] = None
+
+
+class IntentRouter:
+    """
+    Nearest-exemplar intent matching with the semantic memory's embedding model.
+
+    Exemplars are embedded once, on the first route after the model is
+    available, into one normalized matrix; routing an utterance is then one
+    encode and one matrix-vector product.  An utterance is routed only when
+    its best exemplar clears ``threshold`` and no other intent comes within
+    ``margin``; anything else, including a closest match among the
+    fall-through exemplars, is left to the LLM.
+    """
+
+    def __init__(
+        self,
+        encode: Encoder,
+        threshold: float = INTENT_THRESHOLD,
+        margin: float = INTENT_MARGIN,
+    ) -> None:
+        """
+        Initialize an empty router.
+        Args:
+            encode (Encoder): Returns L2-normalized embeddings for texts, or None while no model is loaded.
+            threshold (float): Minimum cosine similarity to route an utterance.
+            margin (float): Minimum lead over the runner-up intent.
+        """
+        self.encode = encode
+        self.threshold = threshold
+        self.margin = margin
+        self.logger = get_logger(__name__)
+        self._intents: List[Intent] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._owners: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._intents)
+
+    def add(self, intent: Intent) -> None:
+        """Register an intent; exemplars are (re)embedded on the next route."""
+        if not intent.examples:
+            return
+        with self._lock:
+            self._intents.append(intent)
+            self._matrix = None
+
+    def _exemplars(self) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        with self._lock:
+            if self._matrix is None and self._intents:
+                texts = [text for intent in self._intents for text in intent.examples]
+                vectors = self.encode(texts)
+                if vectors is None:
+                    return None
+                self._matrix = np.asarray(vectors, dtype=np.float32)
+                self._owners = np.repeat(
+                    np.arange(len(self._intents)), [len(i.examples) for i in self._intents]
+                )
+            if self._matrix is None:
+                return None
+            return self._matrix, self._owners
+
+    def match(self, text: str) -> Optional[Tuple[Intent, float]]:
+        """
+        Find the intent an utterance expresses.
+        Args:
+            text (str): The user utterance.
+        Returns:
+            Optional[Tuple[Intent, float]]: The intent and its similarity, or None to use the LLM.
+        """
+        exemplars = self._exemplars()
+        if exemplars is None or not text.strip():
+            return None
+        query = self.encode([text])
+        if query is None:
+            return None
+        matrix, owners = exemplars
+        scores = matrix @ query[0]
+        best = np.full(len(self._intents), -1.0, dtype=np.float32)
+        np.maximum.at(best, owners, scores)
+        order = np.argsort(best)[::-1]
+        winner = self._intents[order[0]]
+        score = float(best[order[0]])
+        runner_up = float(best[order[1]]) if len(order) > 1 else -1.0
+        if winner.handler is None or score < self.threshold or score - runner_up < self.margin:
+            return None
+        return winner, score
+
+    def route(self, text: str) -> Optional[str]:
+        """
+        Answer an utterance directly if it matches an intent.
+        Args:
+            text (str): The user utterance.
+        Returns:
+            Optional[str]: The reply to speak, or None if the LLM should handle it.
+        """
+        matched = self.match(text)
+        if matched is None:
+            return None
+        intent, score = matched
+        self.logger.info(f"Routed '{text}' to intent '{intent.name}' ({score:.2f}).")
+        return intent.handler(text)
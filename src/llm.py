@@ -41,8 +41,8 @@ class LLMClient:
                 "Please configure the OpenAI API key.",
                 True,
             )
-        history = self.memory.data.get("interactions", [])
-        user_name = self.memory.data.get("user_preferences", {}).get("name", "")
+        history = self.memory.recent_interactions(5)
+        user_name = self.memory.get_preference("name", "")
         system_prompt = (
             "You are a helpful and concise voice assistant. "
             f"{f'The user you are talking to is named {user_name}. ' if user_name else ''}"
@@ -56,7 +56,7 @@ class LLMClient:
             "Keep your spoken responses brief and natural for a voice interface."
         )
         messages = [{"role": "system", "content": system_prompt}]
-        for interaction in history[-5:]:
+        for interaction in history:
             if interaction["type"] == "user_command":
                 messages.append({
                     "role": "user",
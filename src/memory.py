@@ -1,26 +1,156 @@
+import atexit
 import json
+import os
+import threading
 import datetime as dt
+import itertools
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict, Optional, List
+from typing import Any, Callable, Dict, Iterator, Optional, List
 from src.logging import get_logger
+from src.archive import InteractionArchive
+from src.tracing import traced
+
+
+class WriteBehind:
+    """
+    Background flusher that coalesces dirty marks into at most one commit per
+    interval.
+    """
+
+    def __init__(self, commit: Callable[[], None], interval_ms: int, name: str = "memory-flusher") -> None:
+        """
+        Start the flusher thread.
+        Args:
+            commit (Callable[[], None]): Persists all pending changes.
+            interval_ms (int): Coalescing window after the first dirty mark.
+            name (str): Thread name.
+        """
+        self._commit_fn = commit
+        self.interval = interval_ms / 1000.0
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+        self._closed = False
+        self.logger = get_logger(__name__)
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def mark_dirty(self) -> None:
+        """Record that there are changes waiting to be committed."""
+        with self._cond:
+            if not self._dirty:
+                self._dirty = True
+                self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._dirty and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self._cond.wait(self.interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception as exc:
+                self.logger.error(f"Background memory flush failed: {exc}")
+
+    def flush(self) -> None:
+        """Commit pending changes now, if there are any."""
+        with self._flush_lock:
+            with self._cond:
+                if not self._dirty:
+                    return
+                self._dirty = False
+            try:
+                self._commit_fn()
+            except Exception:
+                self.mark_dirty()
+                raise
+
+    def close(self) -> None:
+        """Stop the thread and perform a final flush."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
 
 
 class Memory:
     """
     Simple JSON‑backed persistent store for user preferences, interactions, and learned facts.
+
+    With a flush interval, mutations only mark the store dirty and a background
+    thread commits them in groups; use :meth:`flush` or :meth:`durable` when a
+    write must be on disk before continuing.
+
+    In journal mode every mutation is appended as one JSON line to a write-ahead
+    log next to the snapshot file instead of rewriting the whole document.  The
+    log is periodically compacted into the snapshot, and startup replays
+    snapshot plus log.
     """
 
-    def __init__(self, path: Path, max_interactions: int = 100) -> None:
+    def __init__(
+        self,
+        path: Path,
+        max_interactions: int = 100,
+        journal: bool = False,
+        compact_threshold: int = 1000,
+        flush_interval_ms: int = 0,
+        archive: bool = True,
+    ) -> None:
         """
         Initialize the memory store.
         Args:
             path (Path): Path to the memory file.
             max_interactions (int): Maximum number of interactions to keep in memory.
+            journal (bool): Append mutations to a JSONL journal instead of rewriting the file.
+            compact_threshold (int): Number of journal entries after which the journal is
+                compacted into the snapshot.
+            flush_interval_ms (int): When positive, mutations are committed by a background
+                flusher at most this often instead of synchronously.
+            archive (bool): Spill interactions evicted from the history window into
+                compressed day segments instead of discarding them.
         """
-        self.path = path
+        self.path = Path(path)
         self.max_interactions = max_interactions
-        self.data: Dict[str, Any] = self._load()
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.journal_path = self.path.with_suffix(".journal.jsonl")
         self.logger = get_logger(__name__)
+        self._journal_fh = None
+        self._journal_entries = 0
+        self._pending: List[str] = []
+        self._lock = threading.RLock()
+        self._io_lock = threading.RLock()
+        self.archive: Optional[InteractionArchive] = (
+            InteractionArchive(self.path.with_name(self.path.stem + "_archive")) if archive else None
+        )
+        self.data: Dict[str, Any] = self._load()
+        self._journal_seq: int = self.data.pop("_journal_seq", 0)
+        records = self.data.get("interactions", [])
+        # Number of interactions ever appended; the newest in the window has this number.
+        self._interaction_seq: int = self.data.pop("_interaction_seq", None) or (
+            (self.archive.last_seq if self.archive is not None else 0) + len(records)
+        )
+        self.data["interactions"] = self._ring(records)
+        if self.journal:
+            self._replay_journal()
+        elif self.journal_path.exists() and self.journal_path.stat().st_size:
+            # Left behind by a run with journal mode on; fold it in rather than lose it.
+            self._replay_journal()
+            if self._journal_entries:
+                self.logger.info(f"Folded {self._journal_entries} leftover journal entries into the snapshot.")
+            self.compact()
+        self._flusher: Optional[WriteBehind] = None
+        if flush_interval_ms > 0:
+            self._flusher = WriteBehind(self._persist, flush_interval_ms)
+            atexit.register(self.close)
 
     def _load(self) -> Dict[str, Any]:
         """
@@ -43,14 +173,228 @@ class Memory:
             "first_meeting": dt.datetime.now().isoformat(),
         }
 
+    def _ring(self, records: List[Dict[str, Any]]) -> deque:
+        """
+        Build the bounded history window, archiving anything beyond the cap.
+        Args:
+            records (List[Dict[str, Any]]): Interactions, oldest first.
+        Returns:
+            deque: The hot window.
+        """
+        overflow = len(records) - self.max_interactions
+        first = self._interaction_seq - len(records) + 1
+        for offset, record in enumerate(records[:overflow]):
+            self._archive(record, first + offset)
+        return deque(records, maxlen=self.max_interactions)
+
+    def _archive(self, record: Dict[str, Any], seq: int) -> None:
+        """
+        Queue an evicted interaction for the archive.  The archive drops numbers
+        it already holds, so evictions repeated after a crash (the archive was
+        flushed but the snapshot or journal write was lost) or seen again while
+        replaying the journal are written once.
+        Args:
+            record (Dict[str, Any]): The evicted interaction.
+            seq (int): Its interaction number.
+        """
+        if self.archive is not None:
+            self.archive.add(record, seq)
+
+    def _replay_journal(self) -> None:
+        """
+        Apply journal entries newer than the snapshot.  A torn trailing line
+        (from a crash mid-write) is discarded and truncated from the file.
+        """
+        if not self.journal_path.exists():
+            return
+        good_offset = 0
+        with self.journal_path.open("rb") as fh:
+            lines = fh.readlines()
+        for idx, raw in enumerate(lines):
+            try:
+                if not raw.endswith(b"\n"):
+                    raise ValueError("incomplete journal line")
+                entry = json.loads(raw.decode("utf-8"))
+            except (ValueError, UnicodeDecodeError):
+                if idx == len(lines) - 1:
+                    self.logger.warning("Discarding torn last line of memory journal.")
+                    break
+                self.logger.warning(f"Skipping corrupt memory journal entry at line {idx + 1}.")
+                good_offset += len(raw)
+                continue
+            good_offset += len(raw)
+            seq = entry.get("seq", 0)
+            if seq <= self._journal_seq:
+                continue
+            self._apply(entry["op"], entry.get("args", {}))
+            self._journal_seq = seq
+            self._journal_entries += 1
+        if good_offset < self.journal_path.stat().st_size:
+            with self.journal_path.open("r+b") as fh:
+                fh.truncate(good_offset)
+
+    def _apply(self, op: str, args: Dict[str, Any]) -> None:
+        """
+        Apply a single mutation to the in-memory document.
+        Args:
+            op (str): The operation name.
+            args (Dict[str, Any]): The operation arguments.
+        """
+        if op == "append":
+            interactions = self.data["interactions"]
+            # Number the record before _commit journals the args, so replay restores it.
+            seq = args.setdefault("seq", self._interaction_seq + 1)
+            if len(interactions) == interactions.maxlen and interactions.maxlen:
+                self._archive(interactions[0], seq - len(interactions))
+            interactions.append(args["record"])
+            self._interaction_seq = seq
+        elif op == "add_reminder":
+            self.data.setdefault("reminders", []).append(args["reminder"])
+        elif op == "remove_reminders":
+            ids = set(args["ids"])
+            self.data["reminders"] = [
+                r for r in self.data.get("reminders", []) if r.get("id") not in ids
+            ]
+        elif op == "add_todo":
+            self.data.setdefault("todo_tasks", []).append(args["task"])
+        elif op == "complete_todo":
+            for task in self.data.get("todo_tasks", []):
+                if task.get("id") == args["id"]:
+                    task["done"] = True
+        elif op == "set_preference":
+            self.data.setdefault("user_preferences", {})[args["key"]] = args["value"]
+        elif op == "add_fact":
+            self.data.setdefault("learned_facts", {})[args["id"]] = args["fact"]
+        elif op == "add_facts":
+            self.data.setdefault("learned_facts", {}).update(args["facts"])
+        elif op == "remove_facts":
+            facts = self.data.get("learned_facts", {})
+            for fact_id in args["ids"]:
+                facts.pop(fact_id, None)
+        else:
+            self.logger.warning(f"Unknown memory journal operation '{op}' ignored.")
+
+    def _commit(self, op: str, **args: Any) -> None:
+        """
+        Apply a mutation and persist it, either immediately or through the
+        write-behind flusher when one is running.
+        Args:
+            op (str): The operation name.
+            **args: The operation arguments.
+        """
+        with self._lock:
+            self._apply(op, args)
+            if self.journal:
+                self._journal_seq += 1
+                self._pending.append(
+                    json.dumps({"seq": self._journal_seq, "op": op, "args": args})
+                )
+        if self._flusher is not None:
+            self._flusher.mark_dirty()
+        else:
+            self._persist()
+
+    @traced("memory.persist")
+    def _persist(self) -> None:
+        """
+        Write pending changes to disk: a full snapshot in plain mode, or the
+        buffered journal lines with a single fsync in journal mode.
+        """
+        with self._io_lock:
+            if self.archive is not None:
+                self.archive.flush()
+            if not self.journal:
+                self._write_snapshot()
+                return
+            with self._lock:
+                lines, self._pending = self._pending, []
+            if lines:
+                try:
+                    if self._journal_fh is None:
+                        self._journal_fh = self.journal_path.open("a", encoding="utf-8")
+                    self._journal_fh.write("\n".join(lines) + "\n")
+                    self._journal_fh.flush()
+                    os.fsync(self._journal_fh.fileno())
+                except OSError:
+                    with self._lock:
+                        self._pending = lines + self._pending
+                    raise
+                self._journal_entries += len(lines)
+            if self._journal_entries >= self.compact_threshold:
+                self.compact()
+
+    @traced("memory.save")
     def save(self) -> None:
         """
-        Persist memory to disk atomically.
+        Persist memory to disk atomically.  In journal mode this compacts the
+        journal into the snapshot.
         """
+        if self.journal:
+            self.compact()
+        else:
+            with self._io_lock:
+                if self.archive is not None:
+                    self.archive.flush()
+                self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """Atomically write the full document to the snapshot file."""
+        with self._lock:
+            payload = dict(self.data)
+            payload["_interaction_seq"] = self._interaction_seq
+            # Kept in plain mode too, so a leftover journal is never replayed twice.
+            payload["_journal_seq"] = self._journal_seq
+            self._pending = []
+            text = json.dumps(payload, indent=2, default=list)
         tmp = self.path.with_suffix(".tmp")
-        tmp.write_text(json.dumps(self.data, indent=2), encoding="utf-8")
+        tmp.write_text(text, encoding="utf-8")
         tmp.replace(self.path)
 
+    def compact(self) -> None:
+        """
+        Fold the journal into a fresh snapshot and truncate the journal.  The
+        snapshot records the last applied sequence number, so a crash between
+        the two steps cannot replay entries twice.
+        """
+        with self._io_lock:
+            if self.archive is not None:
+                self.archive.flush()
+            self._write_snapshot()
+            if self._journal_fh is not None:
+                self._journal_fh.close()
+                self._journal_fh = None
+            if self.journal_path.exists():
+                self.journal_path.write_text("", encoding="utf-8")
+            self._journal_entries = 0
+
+    def flush(self) -> None:
+        """Block until every mutation made so far is on disk."""
+        if self._flusher is not None:
+            self._flusher.flush()
+
+    @contextmanager
+    def durable(self) -> Iterator["Memory"]:
+        """
+        Context manager for durability-critical writes: mutations made inside
+        the block are flushed to disk before it exits.
+        """
+        try:
+            yield self
+        finally:
+            self.flush()
+
+    def close(self) -> None:
+        """Flush pending writes, stop the flusher and close the journal file handle."""
+        if self._flusher is not None:
+            flusher, self._flusher = self._flusher, None
+            flusher.close()
+        with self._io_lock:
+            if self.archive is not None:
+                self.archive.flush()
+            if self._journal_fh is not None:
+                self._journal_fh.close()
+                self._journal_fh = None
+
     def append(
         self,
         interaction_type: str,
@@ -64,34 +408,99 @@ class Memory:
             content (str): The content of the interaction.
             user_input (Optional[str]): The original user input, if any.
         """
-        self.data.setdefault("interactions", []).append(
-            {
+        self._commit(
+            "append",
+            record={
                 "timestamp": dt.datetime.now().isoformat(),
                 "type": interaction_type,
                 "content": content,
                 "user_input": user_input,
-            }
-        )
-        if len(self.data["interactions"]) > self.max_interactions:
-            self.data["interactions"] = self.data["interactions"][-self.max_interactions:]
-        self.save()
-
-    def add_reminder(self, text: str, when: dt.datetime) -> None:
-        """Store a reminder in memory."""
-        self.data.setdefault("reminders", []).append(
-            {
-                "id": dt.datetime.now().isoformat(),
-                "text": text,
-                "time": when.isoformat(),
-            }
+            },
         )
-        self.save()
+
+    def recent_interactions(self, limit: int) -> List[Dict[str, Any]]:
+        """Return the last ``limit`` interactions, oldest first."""
+        with self._lock:
+            recent = list(itertools.islice(reversed(self.data["interactions"]), limit))
+        recent.reverse()
+        return recent
+
+    def query_interactions(
+        self,
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+        types: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return interactions in a time range from the archive and the live window.
+        Args:
+            start (Optional[datetime]): Inclusive lower bound on the timestamp.
+            end (Optional[datetime]): Inclusive upper bound on the timestamp.
+            types (Optional[List[str]]): Interaction types to include.
+        Returns:
+            List[Dict[str, Any]]: Matching interactions, oldest first.
+        """
+        archived = list(self.archive.query(start, end, types)) if self.archive else []
+        wanted = set(types) if types else None
+        with self._lock:
+            hot = [
+                r for r in self.data["interactions"]
+                if InteractionArchive.matches(r, start, end, wanted)
+            ]
+        return archived + hot
+
+    def get_preference(self, key: str, default: Any = None) -> Any:
+        """Return a stored user preference."""
+        return self.data.get("user_preferences", {}).get(key, default)
+
+    def facts(self) -> Dict[str, Dict[str, Any]]:
+        """Return learned facts keyed by fact id."""
+        return self.data.get("learned_facts", {})
+
+    def get_fact(self, fact_id: str) -> Optional[Dict[str, Any]]:
+        """Return a single learned fact, or None if unknown."""
+        return self.data.get("learned_facts", {}).get(fact_id)
+
+    def set_preference(self, key: str, value: Any) -> None:
+        """Store a user preference."""
+        self._commit("set_preference", key=key, value=value)
+
+    def add_fact(self, fact_id: str, fact: Dict[str, Any]) -> None:
+        """Store a learned fact under the given id."""
+        self._commit("add_fact", id=fact_id, fact=fact)
+
+    def add_facts(self, facts: Dict[str, Dict[str, Any]]) -> None:
+        """Store many learned facts as a single commit."""
+        if facts:
+            self._commit("add_facts", facts=facts)
+
+    def remove_facts(self, fact_ids: List[str]) -> None:
+        """Delete learned facts by id as a single commit."""
+        if fact_ids:
+            self._commit("remove_facts", ids=list(fact_ids))
+
+    def add_reminder(self, text: str, when: dt.datetime) -> Dict[str, Any]:
+        """Store a reminder in memory and return it."""
+        reminder = {
+            "id": dt.datetime.now().isoformat(),
+            "text": text,
+            "time": when.isoformat(),
+        }
+        self._commit("add_reminder", reminder=reminder)
+        return reminder
+
+    def pending_reminders(self) -> List[Dict[str, Any]]:
+        """Return all stored reminders."""
+        return list(self.data.get("reminders", []))
+
+    def remove_reminder(self, reminder_id: str) -> None:
+        """Delete a reminder by id."""
+        self._commit("remove_reminders", ids=[reminder_id])
 
     def pop_due_reminders(self, now: Optional[dt.datetime] = None) -> List[Dict[str, Any]]:
         """Return and remove reminders that are due."""
         now = now or dt.datetime.now()
         due = []
-        remaining = []
         for rem in self.data.get("reminders", []):
             try:
                 rem_time = dt.datetime.fromisoformat(rem.get("time"))
@@ -99,23 +508,20 @@ class Memory:
                 rem_time = now
             if rem_time <= now:
                 due.append(rem)
-            else:
-                remaining.append(rem)
         if due:
-            self.data["reminders"] = remaining
-            self.save()
+            self._commit("remove_reminders", ids=[r.get("id") for r in due])
         return due
 
     def add_todo(self, text: str) -> None:
         """Add a todo task."""
-        self.data.setdefault("todo_tasks", []).append(
-            {
+        self._commit(
+            "add_todo",
+            task={
                 "id": dt.datetime.now().isoformat(),
                 "text": text,
                 "done": False,
-            }
+            },
         )
-        self.save()
 
     def list_todo(self) -> List[str]:
         """Return a list of incomplete todo task texts."""
@@ -124,8 +530,38 @@ class Memory:
     def complete_todo(self, text: str) -> bool:
         """Mark a todo task as completed."""
         for task in self.data.get("todo_tasks", []):
-            if task["text"].lower() == text.lower() and not task.get("done"):
-                task["done"] = True
-                self.save()
+            if task["text"].casefold() == text.casefold() and not task.get("done"):
+                self._commit("complete_todo", id=task["id"])
                 return True
         return False
+
+
+def create_memory(cfg: Any) -> Any:
+    """
+    Build the memory store selected by ``cfg.memory_backend``.
+    Args:
+        cfg: The configuration/settings object.
+    Returns:
+        Memory | SQLiteMemory: The configured memory store.
+    """
+    backend = getattr(cfg, "memory_backend", "json")
+    if backend == "sqlite":
+        from src.sqlite_memory import SQLiteMemory
+
+        return SQLiteMemory(
+            Path(cfg.memory_path).with_suffix(".db"),
+            cfg.max_interactions,
+            import_from=Path(cfg.memory_path),
+            flush_interval_ms=cfg.memory_flush_interval_ms,
+            archive=cfg.archive_interactions,
+        )
+    if backend != "json":
+        raise ValueError(f"Unknown memory backend '{backend}'.")
+    return Memory(
+        cfg.memory_path,
+        cfg.max_interactions,
+        journal=cfg.memory_journal,
+        compact_threshold=cfg.journal_compact_threshold,
+        flush_interval_ms=cfg.memory_flush_interval_ms,
+        archive=cfg.archive_interactions,
+    )
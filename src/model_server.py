@@ -0,0 +1,125 @@
+"""
+Shared embedding model process.
+
+Run ``python -m src.model_server`` once and point ``embedding_server`` at it;
+assistants then connect to the already-loaded SentenceTransformer instead of
+loading their own copy on every start.
+
+The server never runs without an authkey: unless ``embedding_server_authkey``
+is set, it generates one into a key file readable only by the current user,
+which assistants of the same user pick up automatically.
+"""
+import argparse
+import os
+import secrets
+from multiprocessing.managers import BaseManager
+from pathlib import Path
+from typing import Any, List, Tuple, Union
+import numpy as np
+from src.logging import get_logger
+
+DEFAULT_ADDRESS = "127.0.0.1:50055"
+KEY_FILE = Path.home() / ".voice_assistant" / "model_server.key"
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def load_authkey(authkey: str = "", create: bool = False, path: Path = KEY_FILE) -> str:
+    """
+    Resolve the shared secret for the model server.
+    Args:
+        authkey (str): Configured key; used as-is when set.
+        create (bool): Generate and store a key if the key file does not exist yet.
+        path (Path): Key file, created with owner-only permissions.
+    Returns:
+        str: The authkey.
+    Raises:
+        ValueError: If no key is configured and none can be read or created.
+    """
+    if authkey:
+        return authkey
+    if path.exists():
+        key = path.read_text(encoding="utf-8").strip()
+        if key:
+            return key
+    if not create:
+        raise ValueError(f"No embedding server authkey configured and no key file at {path}.")
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    key = secrets.token_hex(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as fh:
+        fh.write(key + "\n")
+    get_logger(__name__).info(f"Generated an embedding server authkey in {path}.")
+    return key
+
+
+class EmbeddingService:
+    """Wraps a loaded SentenceTransformer behind a picklable ``encode`` call."""
+
+    def __init__(self, model_name: str) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+
+    def name(self) -> str:
+        return self.model_name
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32) -> Any:
+        return self.model.encode(texts, batch_size=batch_size)
+
+
+class ModelManager(BaseManager):
+    """Manager exposing the shared :class:`EmbeddingService`."""
+
+
+class RemoteModel:
+    """
+    Client-side stand-in for a SentenceTransformer served by the model server.
+    """
+
+    def __init__(self, address: str, authkey: str, model_name: str) -> None:
+        """
+        Connect to a running model server.
+        Args:
+            address (str): ``host:port`` of the server.
+            authkey (str): Shared secret configured on the server; "" reads the key file.
+            model_name (str): Expected model; a mismatch raises ``RuntimeError``.
+        """
+        authkey = load_authkey(authkey)
+        ModelManager.register("get_service")
+        self._manager = ModelManager(address=parse_address(address), authkey=authkey.encode())
+        self._manager.connect()
+        self._service = self._manager.get_service()
+        served = self._service.name()
+        if served != model_name:
+            raise RuntimeError(f"Model server serves '{served}', expected '{model_name}'.")
+
+    def encode(self, texts: Union[str, List[str]], batch_size: int = 32, **_: Any) -> np.ndarray:
+        return np.asarray(self._service.encode(texts, batch_size), dtype=np.float32)
+
+
+def serve(address: str, authkey: str, model_name: str) -> None:
+    """Load the model and serve it until interrupted; an empty authkey uses (or creates) the key file."""
+    logger = get_logger(__name__)
+    authkey = load_authkey(authkey, create=True)
+    service = EmbeddingService(model_name)
+    ModelManager.register("get_service", callable=lambda: service)
+    manager = ModelManager(address=parse_address(address), authkey=authkey.encode())
+    logger.info(f"Serving {model_name} on {address}.")
+    manager.get_server().serve_forever()
+
+
+if __name__ == "__main__":
+    from src.config import Settings
+
+    cfg = Settings.load()
+    parser = argparse.ArgumentParser(description="Serve the embedding model to assistant processes.")
+    parser.add_argument("--address", default=cfg.embedding_server or DEFAULT_ADDRESS)
+    parser.add_argument("--authkey", default=cfg.embedding_server_authkey)
+    parser.add_argument("--model", default=cfg.embedding_model)
+    args = parser.parse_args()
+    serve(args.address, args.authkey, args.model)
@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+from src.logging import get_logger
+from src.plugins.base import PluginError
+from src.tracing import bind_turn
+
+ACK_TEXT = "Still working on that."
+
+
+@dataclass
+class _PluginState:
+    timeout: float
+    slots: threading.BoundedSemaphore
+    failures: int = 0
+    opened_at: Optional[float] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class PluginExecutor:
+    """
+    Runs plugin command handlers off the voice loop.
+
+    Handlers run on a bounded thread pool.  Each plugin has its own timeout
+    and a limit on concurrently running handlers; a handler still running
+    after ``ack_after`` seconds triggers a spoken acknowledgement.  A handler
+    still running at the timeout is not abandoned: the caller is told the
+    answer will follow, and the result goes to ``on_late`` once it arrives.
+    A circuit breaker opens after ``failure_threshold`` consecutive failed
+    calls and answers immediately until ``reset_after`` seconds have passed,
+    when a single trial call is let through.  A call fails when its handler
+    raises (:class:`PluginError` carries the reply to speak) or times out.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        default_timeout: float = 8.0,
+        ack_after: float = 1.5,
+        failure_threshold: int = 3,
+        reset_after: float = 60.0,
+        on_late: Optional[Callable[[str, str], None]] = None,
+    ) -> None:
+        """
+        Start the worker pool.
+        Args:
+            max_workers (int): Threads shared by all plugin handlers.
+            default_timeout (float): Seconds before a handler is abandoned, unless the plugin sets one.
+            ack_after (float): Seconds before the acknowledgement is spoken; 0 disables it.
+            failure_threshold (int): Consecutive failures that open a plugin's circuit.
+            reset_after (float): Seconds an open circuit waits before a trial call.
+            on_late (Optional[Callable[[str, str], None]]): Receives the plugin name and reply
+                of a handler that finished after its timeout; without it late replies are dropped.
+        """
+        self.default_timeout = default_timeout
+        self.ack_after = ack_after
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.on_late = on_late
+        self._closed = False
+        self.logger = get_logger(__name__)
+        self._plugins: Dict[str, _PluginState] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="plugin")
+
+    def configure(self, name: str, timeout: Optional[float] = None, max_concurrency: int = 1) -> None:
+        """
+        Set a plugin's limits.
+        Args:
+            name (str): Plugin name.
+            timeout (Optional[float]): Seconds per call; None uses the default.
+            max_concurrency (int): Handlers of this plugin allowed to run at once.
+        """
+        with self._lock:
+            self._plugins[name] = _PluginState(
+                timeout if timeout is not None else self.default_timeout,
+                threading.BoundedSemaphore(max(1, max_concurrency)),
+            )
+
+    def _state(self, name: str) -> _PluginState:
+        with self._lock:
+            if name not in self._plugins:
+                self._plugins[name] = _PluginState(self.default_timeout, threading.BoundedSemaphore(1))
+            return self._plugins[name]
+
+    def _allow(self, state: _PluginState) -> bool:
+        """Closed circuit, or open long enough for one trial call."""
+        with state.lock:
+            if state.opened_at is None:
+                return True
+            if time.monotonic() - state.opened_at >= self.reset_after:
+                # Half-open: the trial's outcome closes or re-opens the circuit.
+                state.opened_at = time.monotonic()
+                return True
+            return False
+
+    def _record(self, name: str, state: _PluginState, ok: bool) -> None:
+        with state.lock:
+            if ok:
+                if state.opened_at is not None:
+                    self.logger.info(f"Plugin {name} recovered; circuit closed.")
+                state.failures, state.opened_at = 0, None
+                return
+            state.failures += 1
+            if state.failures >= self.failure_threshold:
+                if state.opened_at is None:
+                    self.logger.warning(f"Plugin {name} failed {state.failures} times in a row; circuit opened.")
+                state.opened_at = time.monotonic()
+
+    def run(
+        self,
+        name: str,
+        handler: Callable[..., Any],
+        command: str,
+        on_slow: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Run a plugin handler with the plugin's timeout, concurrency limit and circuit breaker.
+        Failures never raise; they produce a spoken explanation instead.
+        Args:
+            name (str): Plugin name.
+            handler (Callable[..., Any]): The command handler, called with ``command``.
+            command (str): The user command.
+            on_slow (Optional[Callable[[str], None]]): Receives the acknowledgement if the handler is slow.
+        Returns:
+            str: The handler's reply, or a message explaining why there is none.
+        """
+        state = self._state(name)
+        if not self._allow(state):
+            return f"The {name} service isn't responding right now. Please try again later."
+        if not state.slots.acquire(blocking=False):
+            return f"I'm still getting your last {name} answer. I'll tell you as soon as it's ready."
+        try:
+            future = self._pool.submit(bind_turn(handler), command)
+        except RuntimeError:
+            state.slots.release()
+            raise
+        # The slot is held until the handler really returns, even after a timeout.
+        future.add_done_callback(lambda _: state.slots.release())
+        started = time.monotonic()
+        try:
+            if on_slow is not None and 0 < self.ack_after < state.timeout:
+                try:
+                    result = future.result(timeout=self.ack_after)
+                except FutureTimeout:
+                    on_slow(ACK_TEXT)
+                    result = future.result(timeout=max(0.0, state.timeout - (time.monotonic() - started)))
+            else:
+                result = future.result(timeout=state.timeout)
+        except FutureTimeout:
+            self.logger.warning(f"Plugin {name} still running after {state.timeout:g}s; its reply will follow.")
+            self._record(name, state, ok=False)
+            future.add_done_callback(lambda done: self._finish_late(name, state, done))
+            return f"The {name} answer is taking a while. I'll tell you as soon as it's ready."
+        except PluginError as e:
+            self.logger.warning(f"Plugin {name} failed: {e}")
+            self._record(name, state, ok=False)
+            return str(e)
+        except Exception as e:
+            self.logger.error(f"Plugin {name} failed: {e}")
+            self._record(name, state, ok=False)
+            return f"Sorry, {name} ran into a problem."
+        self._record(name, state, ok=True)
+        return str(result)
+
+    def _finish_late(self, name: str, state: _PluginState, future: "Future[Any]") -> None:
+        """
+        Hand a timed-out handler's reply to ``on_late``.  The timeout already
+        counted as a failure, so a late reply neither closes the circuit nor
+        counts twice.
+        """
+        try:
+            result = str(future.result())
+        except PluginError as e:
+            self.logger.warning(f"Plugin {name} failed after its timeout: {e}")
+            result = str(e)
+        except Exception as e:
+            self.logger.error(f"Plugin {name} failed after its timeout: {e}")
+            result = f"Sorry, {name} ran into a problem with your earlier request."
+        if self.on_late is not None and not self._closed:
+            try:
+                self.on_late(name, result)
+            except Exception as e:
+                self.logger.error(f"Delivering the late {name} reply failed: {e}")
+
+    def close(self) -> None:
+        """Stop accepting calls; running handlers are not waited for and their late replies are dropped."""
+        self._closed = True
+        self._pool.shutdown(wait=False)
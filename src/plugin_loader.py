@@ -0,0 +1,289 @@
+"""
+Plugin discovery with manifest-driven lazy loading.
+
+Plugins listed in ``src/plugins/manifest.yaml`` are not imported at startup:
+their command keywords, tools and intent exemplars are registered from the
+manifest, and the module is imported and ``setup()`` on the first dispatch
+that needs it.  Plugin modules missing from the manifest load eagerly.
+
+    python -m src.plugin_loader
+
+prints the cold import cost of every plugin module, each measured in a fresh
+interpreter.
+"""
+import importlib
+import pkgutil
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+import yaml
+from src.intents import Intent
+from src.logging import get_logger
+from src.plugins.base import AssistantPlugin
+from src.tools import Tool
+
+PLUGIN_PACKAGE = "src.plugins"
+PLUGIN_DIR = Path(__file__).resolve().parent / "plugins"
+MANIFEST_PATH = PLUGIN_DIR / "manifest.yaml"
+
+
+@dataclass
+class PluginLoad:
+    """Import and setup timings for one plugin, in milliseconds."""
+    name: str
+    module: str
+    lazy: bool
+    import_ms: Optional[float] = None
+    setup_ms: Optional[float] = None
+
+    def describe(self) -> str:
+        if self.import_ms is None:
+            return f"{self.name} ({self.module}): deferred"
+        when = "on first use" if self.lazy else "at startup"
+        return f"{self.name} ({self.module}): import {self.import_ms:.1f} ms, setup {self.setup_ms:.1f} ms {when}"
+
+
+def _setup(plugin: AssistantPlugin, assistant: Any) -> None:
+    if hasattr(plugin, "setup"):
+        try:
+            plugin.setup(assistant)
+        except TypeError:
+            pass
+
+
+class PluginHandle:
+    """
+    A plugin as seen by the assistant: either loaded, or a manifest entry
+    standing in for it until first use.
+    """
+
+    def __init__(self, assistant: Any, entry: Optional[Dict[str, Any]] = None,
+                 plugin: Optional[AssistantPlugin] = None, stats: Optional[PluginLoad] = None) -> None:
+        """
+        Wrap a manifest entry (lazy) or an already loaded plugin (eager).
+        Args:
+            assistant (Any): Passed to the plugin's ``setup()`` on load.
+            entry (Optional[Dict[str, Any]]): Manifest entry: module, class, name, commands, tools, intents.
+            plugin (Optional[AssistantPlugin]): The loaded plugin, for eager handles.
+            stats (Optional[PluginLoad]): Load timings of an eager plugin.
+        """
+        self.assistant = assistant
+        self.entry = entry or {}
+        self.plugin = plugin
+        self.name = plugin.name if plugin is not None else self.entry.get("name") or self.entry["class"]
+        self.stats = stats or PluginLoad(self.name, self.entry.get("module", ""), lazy=True)
+        self.logger = get_logger(__name__)
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.plugin is not None
+
+    @property
+    def timeout(self) -> Optional[float]:
+        """Command handler timeout, from the plugin or its manifest entry."""
+        if self.plugin is not None:
+            return self.plugin.timeout
+        return self.entry.get("timeout")
+
+    @property
+    def max_concurrency(self) -> int:
+        """Concurrent command handler limit, from the plugin or its manifest entry."""
+        if self.plugin is not None:
+            return self.plugin.max_concurrency
+        return int(self.entry.get("max_concurrency", 1))
+
+    def load(self) -> AssistantPlugin:
+        """Import, instantiate and set up the plugin, once."""
+        with self._lock:
+            if self.plugin is None:
+                started = time.perf_counter()
+                module = importlib.import_module(f"{PLUGIN_PACKAGE}.{self.entry['module']}")
+                imported = time.perf_counter()
+                plugin = getattr(module, self.entry["class"])()
+                _setup(plugin, self.assistant)
+                self.stats.import_ms = (imported - started) * 1000
+                self.stats.setup_ms = (time.perf_counter() - imported) * 1000
+                self.logger.info(f"Loaded plugin {self.stats.describe()}.")
+                self._check(plugin)
+                self.plugin = plugin
+            return self.plugin
+
+    def _check(self, plugin: AssistantPlugin) -> None:
+        """Warn when the manifest and the plugin disagree."""
+        declared = {k.lower() for k in self.entry.get("commands", [])}
+        actual = {k.lower() for k in plugin.register()}
+        if declared != actual:
+            self.logger.warning(
+                f"Manifest commands for {self.name} {sorted(declared)} differ from the plugin's {sorted(actual)}."
+            )
+        missing = {t["name"] for t in self.entry.get("tools", [])} - {t.name for t in plugin.tools()}
+        if missing:
+            self.logger.warning(f"Manifest tools {sorted(missing)} are not provided by {self.name}.")
+        declared_intents = {name: sorted(examples) for name, examples in (self.entry.get("intents") or {}).items()}
+        actual_intents = {i.name: sorted(i.examples) for i in plugin.intents()}
+        drifted = sorted(
+            name for name in declared_intents.keys() | actual_intents.keys()
+            if declared_intents.get(name) != actual_intents.get(name)
+        )
+        if drifted:
+            self.logger.warning(
+                f"Manifest intents {drifted} for {self.name} differ from the plugin's names or exemplars."
+            )
+
+    def commands(self) -> Dict[str, Callable[..., Any]]:
+        """Command keyword to handler; lazy handlers load the plugin on first call."""
+        if self.plugin is not None:
+            return self.plugin.register()
+
+        def handler(keyword: str) -> Callable[..., Any]:
+            def handle(command: str, *args: Any, **kwargs: Any) -> Any:
+                handlers = {k.lower(): h for k, h in self.load().register().items()}
+                return handlers[keyword.lower()](command, *args, **kwargs)
+            return handle
+
+        return {keyword: handler(keyword) for keyword in self.entry.get("commands", [])}
+
+    def tools(self) -> List[Tool]:
+        """LLM tools; lazy handlers load the plugin on first call."""
+        if self.plugin is not None:
+            return self.plugin.tools()
+
+        def handler(name: str) -> Callable[..., Any]:
+            def call(**kwargs: Any) -> Any:
+                tool = next((t for t in self.load().tools() if t.name == name), None)
+                if tool is None:
+                    raise LookupError(f"Plugin {self.name} does not provide tool '{name}'.")
+                return tool.handler(**kwargs)
+            return call
+
+        return [
+            Tool(
+                spec["name"],
+                spec["description"],
+                handler(spec["name"]),
+                spec.get("parameters"),
+                spec.get("timeout"),
+                spec.get("cacheable", False),
+                spec.get("idempotent", False),
+                int(spec.get("max_concurrency", 1)),
+            )
+            for spec in self.entry.get("tools", [])
+        ]
+
+    def intents(self) -> List[Intent]:
+        """Intent exemplars; lazy handlers load the plugin on first call."""
+        if self.plugin is not None:
+            return self.plugin.intents()
+
+        def handler(name: str) -> Callable[[str], str]:
+            def call(text: str) -> str:
+                intent = next((i for i in self.load().intents() if i.name == name), None)
+                if intent is None or intent.handler is None:
+                    raise LookupError(f"Plugin {self.name} does not provide intent '{name}'.")
+                return intent.handler(text)
+            return call
+
+        return [Intent(name, list(examples), handler(name)) for name, examples in (self.entry.get("intents") or {}).items()]
+
+
+def load_manifest(path: Path = MANIFEST_PATH) -> List[Dict[str, Any]]:
+    """
+    Read the plugin manifest.
+    Args:
+        path (Path): The manifest file.
+    Returns:
+        List[Dict[str, Any]]: Plugin entries; empty if the file is missing or invalid.
+    """
+    if not path.exists():
+        return []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = (yaml.safe_load(f) or {}).get("plugins") or []
+    except (OSError, yaml.YAMLError) as exc:
+        get_logger(__name__).warning(f"Plugin manifest unreadable ({exc}); loading plugins eagerly.")
+        return []
+    return [e for e in entries if isinstance(e, dict) and e.get("module") and e.get("class")]
+
+
+def discover_plugins(assistant: Any, lazy: bool = True) -> List[PluginHandle]:
+    """
+    Load unlisted plugins and create lazy handles for manifest entries.
+    Args:
+        assistant (Any): Passed to each plugin's ``setup()``.
+        lazy (bool): Honour the manifest; False imports every plugin module now.
+    Returns:
+        List[PluginHandle]: Manifest plugins (deferred) followed by eagerly loaded ones.
+    """
+    logger = get_logger(__name__)
+    manifest = load_manifest() if lazy else []
+    handles = [PluginHandle(assistant, entry=entry) for entry in manifest]
+    listed = {entry["module"] for entry in manifest}
+    for _, modname, ispkg in pkgutil.iter_modules([str(PLUGIN_DIR)]):
+        if ispkg or modname == "base" or modname in listed:
+            continue
+        started = time.perf_counter()
+        module = importlib.import_module(f"{PLUGIN_PACKAGE}.{modname}")
+        import_ms = (time.perf_counter() - started) * 1000
+        for attr in dir(module):
+            obj = getattr(module, attr)
+            if isinstance(obj, type) and issubclass(obj, AssistantPlugin) and obj is not AssistantPlugin:
+                setup_started = time.perf_counter()
+                plugin = obj()
+                _setup(plugin, assistant)
+                stats = PluginLoad(plugin.name, modname, lazy=False, import_ms=import_ms,
+                                   setup_ms=(time.perf_counter() - setup_started) * 1000)
+                handles.append(PluginHandle(assistant, plugin=plugin, stats=stats))
+    eager_ms = sum(h.stats.import_ms + h.stats.setup_ms for h in handles if not h.stats.lazy)
+    logger.info(f"Plugins: {len(handles)} found, {len(manifest)} deferred, {eager_ms:.1f} ms loading at startup.")
+    for handle in handles:
+        logger.info(f"  {handle.stats.describe()}")
+    return handles
+
+
+def measure_import_cost(module: str) -> float:
+    """
+    Time a cold import of a plugin module in a fresh interpreter.
+    Args:
+        module (str): Module name inside ``src/plugins``.
+    Returns:
+        float: Milliseconds spent importing it, after the plugin base is loaded.
+    """
+    code = (
+        "import time, src.plugins.base\n"
+        "t = time.perf_counter()\n"
+        f"import {PLUGIN_PACKAGE}.{module}\n"
+        "print((time.perf_counter() - t) * 1000)\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(PLUGIN_DIR.parent.parent),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    lazy = {entry["module"] for entry in load_manifest()}
+    rows = []
+    for _, modname, ispkg in pkgutil.iter_modules([str(PLUGIN_DIR)]):
+        if ispkg or modname == "base":
+            continue
+        try:
+            cost = f"{measure_import_cost(modname):8.1f} ms"
+        except (subprocess.CalledProcessError, ValueError) as exc:
+            cost = f"failed ({str(getattr(exc, 'stderr', '') or exc).strip().splitlines()[-1]})"
+        rows.append((modname, "lazy" if modname in lazy else "eager", cost))
+    print(f"{'plugin':<12} {'loading':<8} cold import")
+    for modname, mode, cost in rows:
+        print(f"{modname:<12} {mode:<8} {cost}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,14 @@
-from typing import Any, Dict, Callable
+from typing import Any, Dict, Callable, List, Optional
+from src.tools import Tool
+from src.intents import Intent
+
+
+class PluginError(Exception):
+    """
+    Raised by a command handler when the call failed.  The message is spoken
+    as the reply, and the failure counts toward the plugin's circuit breaker.
+    """
+
 
 class AssistantPlugin:
     """
@@ -7,11 +17,27 @@ class AssistantPlugin:
     """
     name: str = "BasePlugin"
     description: str = "Base plugin class."
+    # Seconds before a command handler is abandoned; None uses plugin_timeout_sec.
+    timeout: Optional[float] = None
+    # Command handlers of this plugin allowed to run at the same time.
+    max_concurrency: int = 1
 
     def setup(self, assistant: Any) -> None:  # type: ignore[empty-body]
         """Optional initialization with the assistant instance."""
         return None
 
+    def request_timeout(self, assistant: Any) -> float:
+        """
+        Seconds allowed for one network request made by a handler.
+        Args:
+            assistant (Any): The assistant instance, for its settings.
+        Returns:
+            float: Three quarters of the handler timeout, so a slow service fails
+            the call with :class:`PluginError` before the handler itself times out.
+        """
+        limit = self.timeout if self.timeout is not None else getattr(assistant.cfg, "plugin_timeout_sec", 8.0)
+        return max(0.5, 0.75 * limit)
+
     def register(self) -> Dict[str, Callable[[str, Any], Any]]:
         """
         Return a dict mapping command names to handler functions.
@@ -21,6 +47,25 @@ class AssistantPlugin:
         """
         return {}
 
+    def tools(self) -> List[Tool]:
+        """
+        Return functions this plugin exposes to the LLM.
+        Returns:
+            List[Tool]: Tools to add to the assistant's tool registry.
+        Example: [Tool("get_weather", "Current weather for a city.", self.weather_for,
+                       parameters(required=["city"], city="City name."), idempotent=True)]
+        """
+        return []
+
+    def intents(self) -> List[Intent]:
+        """
+        Return exemplar phrasings the assistant may route here without the LLM.
+        Returns:
+            List[Intent]: Intents whose handlers receive the utterance and return the reply.
+        Example: [Intent("weather", ["is it raining", "how cold is it outside"], self.handle_weather)]
+        """
+        return []
+
     def handle(self, command: str, *args: Any, **kwargs: Any) -> Any:
         """
         Handle a command. Should be overridden by plugin implementations.
@@ -31,6 +76,7 @@ class AssistantPlugin:
         Returns:
             Any: The result of the command handling.
         Raises:
+            PluginError: If the command failed; the message is spoken to the user.
             NotImplementedError: If not implemented in subclass.
         """
         raise NotImplementedError 
\ No newline at end of file
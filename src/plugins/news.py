@@ -1,5 +1,6 @@
 import requests
-from src.plugins.base import AssistantPlugin
+from src.plugins.base import AssistantPlugin, PluginError
+from src.intents import Intent
 
 
 class NewsPlugin(AssistantPlugin):
@@ -10,11 +11,21 @@ class NewsPlugin(AssistantPlugin):
 
     def setup(self, assistant) -> None:
         self.api_key = getattr(assistant.cfg, "news_api_key", "")
+        self.http_timeout = self.request_timeout(assistant)
         self.session = requests.Session()
 
     def register(self):
         return {"news": self.handle_news}
 
+    def intents(self):
+        return [
+            Intent(
+                "news",
+                ["what's happening in the world", "what are today's headlines", "any headlines today"],
+                self.handle_news,
+            )
+        ]
+
     def handle_news(self, command: str, *args, **kwargs):
         if not self.api_key:
             return "News API key is not configured."
@@ -22,14 +33,14 @@ class NewsPlugin(AssistantPlugin):
             resp = self.session.get(
                 "https://newsapi.org/v2/top-headlines",
                 params={"country": "us", "pageSize": 3, "apiKey": self.api_key},
-                timeout=10,
+                timeout=self.http_timeout,
             )
             resp.raise_for_status()
             data = resp.json()
-            articles = data.get("articles") or []
-            if not articles:
-                return "I couldn't find any news right now."
-            headlines = [a.get("title", "") for a in articles if a.get("title")]
-            return "Here are the latest headlines: " + "; ".join(headlines)
         except Exception as exc:
-            return f"Failed to fetch news: {exc}"
+            raise PluginError(f"Failed to fetch news: {exc}") from exc
+        articles = data.get("articles") or []
+        if not articles:
+            return "I couldn't find any news right now."
+        headlines = [a.get("title", "") for a in articles if a.get("title")]
+        return "Here are the latest headlines: " + "; ".join(headlines)
@@ -9,6 +9,7 @@ class ReminderPlugin(AssistantPlugin):
 
     def setup(self, assistant) -> None:
         self.memory = assistant.memory
+        self.scheduler = getattr(assistant, "scheduler", None)
 
     def register(self):
         return {"remind": self.handle_reminder}
@@ -21,5 +22,9 @@ class ReminderPlugin(AssistantPlugin):
         when = dateparser.parse(time_str)
         if not when:
             return f"I couldn't understand the time '{time_str}'."
-        self.memory.add_reminder(task.strip(), when)
+        if self.scheduler is not None:
+            self.scheduler.schedule(task.strip(), when)
+        else:
+            with self.memory.durable():
+                self.memory.add_reminder(task.strip(), when)
         return f"Okay, I'll remind you to {task.strip()} at {when.strftime('%I:%M %p on %B %d')}"
@@ -20,7 +20,8 @@ class TodoPlugin(AssistantPlugin):
         add_match = re.search(r"add (.+?) to(?: my)? todo list", cmd)
         if add_match:
             task = add_match.group(1).strip()
-            self.memory.add_todo(task)
+            with self.memory.durable():
+                self.memory.add_todo(task)
             return f"Added '{task}' to your todo list."
 
         if any(word in cmd for word in ("list", "show", "what")):
@@ -35,7 +36,9 @@ class TodoPlugin(AssistantPlugin):
         )
         if done_match:
             task = done_match.group(1).strip()
-            if self.memory.complete_todo(task):
+            with self.memory.durable():
+                completed = self.memory.complete_todo(task)
+            if completed:
                 return f"Marked '{task}' as done."
             return f"I couldn't find '{task}' on your todo list."
 
@@ -1,7 +1,8 @@
 from __future__ import annotations
 import re
 import requests
-from src.plugins.base import AssistantPlugin
+from src.plugins.base import AssistantPlugin, PluginError
+from src.intents import Intent
 
 class WeatherPlugin(AssistantPlugin):
     """Fetch current weather information using OpenWeatherMap."""
@@ -12,11 +13,22 @@ class WeatherPlugin(AssistantPlugin):
     def setup(self, assistant) -> None:
         self.api_key = getattr(assistant.cfg, "weather_api_key", "")
         self.default_location = getattr(assistant.cfg, "default_location", "New York")
+        self.http_timeout = self.request_timeout(assistant)
         self.session = requests.Session()
 
     def register(self):
         return {"weather": self.handle_weather}
 
+    def intents(self):
+        return [
+            Intent(
+                "weather",
+                ["is it going to rain", "is it raining outside", "how hot is it outside",
+                 "how cold is it outside", "what's the temperature outside", "do i need an umbrella"],
+                self.handle_weather,
+            )
+        ]
+
     def _extract_location(self, command: str) -> str:
         match = re.search(r"weather(?: in| for| at)? ([\w\s]+)", command, re.IGNORECASE)
         if match:
@@ -32,7 +44,7 @@ class WeatherPlugin(AssistantPlugin):
             resp = self.session.get(
                 "https://api.openweathermap.org/data/2.5/weather",
                 params={"q": location, "appid": self.api_key, "units": "metric"},
-                timeout=10,
+                timeout=self.http_timeout,
             )
             resp.raise_for_status()
             data = resp.json()
@@ -40,7 +52,7 @@ class WeatherPlugin(AssistantPlugin):
             desc = data["weather"][0]["description"]
             city = data.get("name", location)
             return f"The weather in {city} is {desc} with a temperature of {temp}\u00b0C."
-        except requests.HTTPError:
-            return f"I couldn't get the weather for {location}."
+        except requests.HTTPError as exc:
+            raise PluginError(f"I couldn't get the weather for {location}.") from exc
         except Exception as exc:
-            return f"An error occurred fetching the weather: {exc}"
+            raise PluginError(f"An error occurred fetching the weather: {exc}") from exc
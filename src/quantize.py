@@ -0,0 +1,88 @@
+from typing import Tuple, Union
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+# Rows converted back to float32 per block while scoring a compact matrix.
+SCORE_BLOCK = 4096
+
+Index = Union[int, slice, np.ndarray]
+
+
+class QuantizedMatrix:
+    """
+    Fixed-capacity matrix of unit vectors held at reduced precision.
+
+    ``float32`` stores rows as-is, ``float16`` halves them, and ``int8`` keeps
+    a per-row scale (``max|v| / 127``) next to the rounded values.  Indexing
+    returns dequantized float32 rows, so callers can treat it like an ndarray;
+    :meth:`scores` computes a whole matrix-vector product block by block
+    without materializing a float32 copy.
+    """
+
+    def __init__(self, dim: int, precision: str = "float32", capacity: int = 64) -> None:
+        """
+        Allocate an all-zero matrix.
+        Args:
+            dim (int): Vector dimensionality.
+            precision (str): One of ``PRECISIONS``.
+            capacity (int): Number of rows.
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown embedding precision '{precision}'; expected one of {PRECISIONS}.")
+        self.precision = precision
+        self.dim = dim
+        self._data = np.zeros((capacity, dim), dtype=np.int8 if precision == "int8" else precision)
+        self._scale = np.zeros(capacity, dtype=np.float32) if precision == "int8" else None
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self._data.shape
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the matrix, including int8 scales."""
+        return self._data.nbytes + (self._scale.nbytes if self._scale is not None else 0)
+
+    def grown(self, capacity: int) -> "QuantizedMatrix":
+        """Return a copy with room for ``capacity`` rows."""
+        out = QuantizedMatrix(self.dim, self.precision, capacity)
+        n = min(capacity, len(self._data))
+        out._data[:n] = self._data[:n]
+        if self._scale is not None:
+            out._scale[:n] = self._scale[:n]
+        return out
+
+    def __setitem__(self, index: Index, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if self._scale is None:
+            self._data[index] = vectors
+            return
+        scale = np.abs(vectors).max(axis=-1) / 127.0
+        safe = np.where(scale == 0, 1.0, scale)
+        self._data[index] = np.rint(vectors / np.expand_dims(safe, -1)).astype(np.int8)
+        self._scale[index] = scale
+
+    def __getitem__(self, index: Index) -> np.ndarray:
+        rows = self._data[index].astype(np.float32)
+        if self._scale is not None:
+            rows *= np.expand_dims(self._scale[index], -1)
+        return rows
+
+    def scores(self, query: np.ndarray, n: int) -> np.ndarray:
+        """
+        Dot products of the first ``n`` rows with ``query``.
+        Args:
+            query (np.ndarray): A float32 vector.
+            n (int): Number of leading rows to score.
+        Returns:
+            np.ndarray: ``n`` float32 scores.
+        """
+        if self.precision == "float32":
+            return self._data[:n] @ query
+        out = np.empty(n, dtype=np.float32)
+        for start in range(0, n, SCORE_BLOCK):
+            stop = min(n, start + SCORE_BLOCK)
+            out[start:stop] = self._data[start:stop].astype(np.float32) @ query
+        if self._scale is not None:
+            out *= self._scale[:n]
+        return out
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional
+import numpy as np
+from src.logging import get_logger
+
+# Cosine similarity at which two utterances are treated as the same question.
+RESPONSE_CACHE_THRESHOLD = 0.95
+
+
+@dataclass
+class _Entry:
+    context: Hashable
+    vector: np.ndarray
+    reply: str
+    stored_at: float
+
+
+class ResponseCache:
+    """
+    Semantic cache of LLM replies, keyed by utterance embedding and context.
+
+    A lookup hits when a live entry with an equal context key (user name,
+    memory state) has a cosine similarity of at least ``threshold`` with the
+    utterance.  Entries expire after ``ttl_sec`` and the least recently used
+    entry is evicted beyond ``capacity``.  Only replies from turns whose tools
+    are all cacheable are stored; the caller decides that.
+    """
+
+    def __init__(
+        self,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+        ttl_sec: float = 3600.0,
+        capacity: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize an empty cache.
+        Args:
+            threshold (float): Minimum cosine similarity for a hit.
+            ttl_sec (float): Seconds an entry stays valid.
+            capacity (int): Maximum number of entries.
+            clock (Callable[[], float]): Time source for TTL checks.
+        """
+        self.threshold = threshold
+        self.ttl_sec = ttl_sec
+        self.capacity = capacity
+        self.clock = clock
+        self.logger = get_logger(__name__)
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _nearest(self, vector: np.ndarray, context: Hashable) -> Optional[tuple]:
+        """Return (key, similarity) of the closest live entry with the same context."""
+        now = self.clock()
+        expired = [k for k, e in self._entries.items() if now - e.stored_at > self.ttl_sec]
+        for key in expired:
+            del self._entries[key]
+        keys = [k for k, e in self._entries.items() if e.context == context]
+        if not keys:
+            return None
+        scores = np.stack([self._entries[k].vector for k in keys]) @ vector
+        best = int(np.argmax(scores))
+        return keys[best], float(scores[best])
+
+    def get(self, vector: np.ndarray, context: Hashable) -> Optional[str]:
+        """
+        Look up a reply for an utterance.
+        Args:
+            vector (np.ndarray): L2-normalized utterance embedding.
+            context (Hashable): Context key the reply must have been produced under.
+        Returns:
+            Optional[str]: The cached reply, or None on a miss.
+        """
+        with self._lock:
+            nearest = self._nearest(vector, context)
+            if nearest is None or nearest[1] < self.threshold:
+                self.misses += 1
+                return None
+            key, score = nearest
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.logger.info(f"Response cache hit ({score:.2f}); {self.hits} hits, {self.misses} misses.")
+            return self._entries[key].reply
+
+    def put(self, vector: np.ndarray, context: Hashable, reply: str) -> None:
+        """
+        Store a reply, replacing a near-identical entry under the same context.
+        Args:
+            vector (np.ndarray): L2-normalized utterance embedding.
+            context (Hashable): Context key the reply was produced under.
+            reply (str): The reply text.
+        """
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            nearest = self._nearest(vector, context)
+            if nearest is not None and nearest[1] >= self.threshold:
+                del self._entries[nearest[0]]
+            self._entries[self._next_key] = _Entry(
+                context, np.asarray(vector, dtype=np.float32), reply, self.clock()
+            )
+            self._next_key += 1
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,160 @@
+import heapq
+import itertools
+import threading
+import time
+import datetime as dt
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.logging import get_logger
+
+# Upper bound on a single wait so wall-clock adjustments are picked up.
+MAX_WAIT_SEC = 60.0
+# A reminder whose announcement failed is retried this much later...
+RETRY_SEC = 30.0
+# ...this many times; after that it stays stored and fires again on the next start.
+MAX_ATTEMPTS = 3
+
+
+class ReminderScheduler:
+    """
+    Fires stored reminders on time from a dedicated timer thread.
+
+    Pending reminders live in a min-heap keyed on due time, so each wakeup only
+    pops the head (O(log n)) instead of re-parsing every reminder.  A reminder
+    is deleted from memory only once it has been announced.
+    """
+
+    def __init__(self, memory: Any, on_fire: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Initialize the scheduler from the reminders already in memory.
+        Args:
+            memory: The memory store holding reminders.
+            on_fire (Callable): Called with the reminder dict when it becomes due.
+        """
+        self.memory = memory
+        self.on_fire = on_fire
+        self.logger = get_logger(__name__)
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._counter = itertools.count()
+        self._attempts: Dict[Any, int] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        for rem in memory.pending_reminders():
+            self._push(rem)
+
+    def _push(self, reminder: Dict[str, Any], due: Optional[float] = None) -> None:
+        if due is None:
+            try:
+                due = dt.datetime.fromisoformat(reminder.get("time")).timestamp()
+            except Exception:
+                due = time.time()
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._counter), reminder))
+            if self._heap[0][2] is reminder:
+                self._cond.notify()
+
+    def schedule(self, text: str, when: dt.datetime) -> Dict[str, Any]:
+        """
+        Persist a new reminder and queue it for firing.
+        Args:
+            text (str): What to remind the user about.
+            when (datetime): When the reminder is due.
+        Returns:
+            Dict[str, Any]: The stored reminder.
+        """
+        with self.memory.durable():
+            reminder = self.memory.add_reminder(text, when)
+        self._push(reminder)
+        return reminder
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def next_due(self) -> Optional[float]:
+        """Epoch time of the earliest pending reminder, or None."""
+        with self._cond:
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Take the reminders that are due off the queue, for callers that run
+        their own timer instead of :meth:`start`.  They stay in memory until
+        passed to :meth:`complete`; pass a failed one to :meth:`retry`.
+        Args:
+            now (Optional[float]): Epoch time to compare against; defaults to the current time.
+        Returns:
+            List[Dict[str, Any]]: Due reminders, earliest first.
+        """
+        now = time.time() if now is None else now
+        due = []
+        with self._cond:
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def complete(self, reminder: Dict[str, Any]) -> None:
+        """Delete an announced reminder from memory."""
+        with self._cond:
+            self._attempts.pop(reminder.get("id"), None)
+        with self.memory.durable():
+            self.memory.remove_reminder(reminder.get("id"))
+
+    def retry(self, reminder: Dict[str, Any]) -> None:
+        """
+        Requeue a reminder whose announcement failed, ``RETRY_SEC`` from now.
+        After ``MAX_ATTEMPTS`` it is left in memory for the next start instead.
+        Args:
+            reminder (Dict[str, Any]): The reminder returned by :meth:`pop_due`.
+        """
+        with self._cond:
+            attempts = self._attempts.get(reminder.get("id"), 0) + 1
+            self._attempts[reminder.get("id")] = attempts
+        if attempts >= MAX_ATTEMPTS:
+            self.logger.error(
+                f"Giving up on reminder '{reminder.get('text')}' after {attempts} attempts; kept for the next start."
+            )
+            return
+        self._push(reminder, time.time() + RETRY_SEC)
+
+    def start(self) -> None:
+        """Start the timer thread."""
+        if self._thread is not None:
+            return
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the timer thread; unfired reminders stay in memory."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        break
+                    self._cond.wait(min(delay, MAX_WAIT_SEC))
+                if self._stopped:
+                    return
+                _, _, reminder = heapq.heappop(self._heap)
+            try:
+                self.on_fire(reminder)
+            except Exception as exc:
+                self.logger.error(f"Error firing reminder '{reminder.get('text')}': {exc}")
+                self.retry(reminder)
+                continue
+            try:
+                self.complete(reminder)
+            except Exception as exc:
+                self.logger.error(f"Error removing fired reminder '{reminder.get('text')}': {exc}")
@@ -1,17 +1,84 @@
+import itertools
+import json
+import threading
+import time
+import datetime as dt
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from src.logging import get_logger
-from typing import List, Optional, Any
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Set, Tuple
+import numpy as np
+from src.embeddings import EmbeddingStore
+from src.ann import IVFIndex
+from src.embedding_cache import EmbeddingCache, normalize_text
+from src.quantize import PRECISIONS, QuantizedMatrix
+from src.bm25 import BM25Index
 
 try:
     from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
 except ImportError:
     SentenceTransformer = None
-    cosine_similarity = None
+
+# Facts scoring at or below this cosine similarity are not considered related.
+SIMILARITY_THRESHOLD = 0.5
+TOP_K = 3
+# With a reduced-precision index, this many candidates per requested result are
+# rescored against the exact float32 sidecar rows.
+RESCORE_FACTOR = 8
+# Reciprocal-rank-fusion damping for hybrid (vector + BM25) recall.
+RRF_K = 60
+# Facts at or above this cosine similarity are treated as the same fact.
+DEDUP_THRESHOLD = 0.92
+# Rows compared per block during offline compaction.
+COMPACT_BLOCK = 1024
+
+ProgressCallback = Callable[[int, float], None]
+
+_worker_model = None
+
+
+def _init_encode_worker(model_name: str) -> None:
+    """Process-pool initializer: load one model copy per worker."""
+    global _worker_model
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _encode_in_worker(texts: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(texts, batch_size=64), dtype=np.float32)
+
+
+def fact_key(text: str) -> str:
+    """Text identity used for exact-duplicate facts: case-folded, whitespace collapsed."""
+    return normalize_text(text).casefold()
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
 
 
 class SemanticMemory:
     """
     Handles semantic embedding and recall of facts using sentence transformers.
+    Embeddings live in a memory-mapped ``.npy`` sidecar next to the memory file;
+    learned facts only keep an ``embedding_row`` index into it.  For search, an
+    L2-normalized float32 copy is kept in a preallocated matrix with a parallel
+    array of fact ids, so a query is one matrix-vector product.  The matrix can
+    be held as float16 or int8 (``embedding_precision``) with an exact float32
+    rescoring pass over the shortlist.  Large stores can opt into an IVF
+    approximate index; below ``ann_min_facts`` search stays exact.
+
+    Fact text is also kept in a BM25 inverted index, used for keyword recall
+    without a model and, with ``hybrid_recall``, fused with vector scores.
+
+    The model loads on a background thread (or attaches to a shared model
+    server); until :attr:`ready` resolves, recall falls back to keyword matching
+    and new facts are queued for embedding.
     """
     def __init__(self, memory: Any, settings: Any) -> None:
         """
@@ -24,9 +91,83 @@ class SemanticMemory:
         self.cfg = settings
         self.semantic_model = None
         self.logger = get_logger(__name__)
-        if SentenceTransformer:
+        sidecar = Path(settings.memory_path).with_suffix(".embeddings.npy")
+        if self._finish_compaction(sidecar):
+            self.logger.info("Finished a compaction that was interrupted on the last run.")
+        self.store = EmbeddingStore(sidecar)
+        self._index_lock = threading.RLock()
+        self.precision = getattr(settings, "embedding_precision", "float32")
+        if self.precision not in PRECISIONS:
+            self.logger.warning(f"Unknown embedding precision '{self.precision}'; using float32.")
+            self.precision = "float32"
+        self.rescore = getattr(settings, "embedding_rescore", True) and self.precision != "float32"
+        self._matrix = QuantizedMatrix(0, self.precision, 0)
+        self._ids: List[str] = []
+        self._rows: List[int] = []
+        self._positions: Dict[str, int] = {}
+        self.ann: Optional[IVFIndex] = None
+        self._ann_thread: Optional[threading.Thread] = None
+        # Positions indexed while a background rebuild runs; replayed into the new index.
+        self._ann_dirty: Set[int] = set()
+        # Bumped by _build_index; a background rebuild started before it is discarded.
+        self._index_generation = 0
+        # Bumped on every change to what search and recall can return.
+        self.version = 0
+        self.ann_min_facts = getattr(settings, "ann_min_facts", 20000)
+        if getattr(settings, "ann_index", False):
+            self.ann = IVFIndex(
+                Path(settings.memory_path).with_suffix(".ivf.npz"),
+                nprobe=getattr(settings, "ann_nprobe", 8),
+            )
+        self.model_name = getattr(settings, "embedding_model", "all-MiniLM-L6-v2")
+        self.ready: "Future[Any]" = Future()
+        self._pending: List[Tuple[str, str]] = []
+        self._pending_lock = threading.Lock()
+        self.cache: Optional[EmbeddingCache] = None
+        cache_size = getattr(settings, "embedding_cache_size", 1024)
+        if cache_size > 0:
+            self.cache = EmbeddingCache(
+                Path(settings.memory_path).with_suffix(".embcache.db")
+                if getattr(settings, "embedding_cache_persist", True) else None,
+                self.model_name,
+                cache_size,
+            )
+        self.hybrid = getattr(settings, "hybrid_recall", False)
+        self.dedup_threshold = getattr(settings, "fact_dedup_threshold", DEDUP_THRESHOLD)
+        self.keywords = BM25Index()
+        # Exact-duplicate lookup: fact_key(text) -> first fact id with that text, and back.
+        self._by_text: Dict[str, str] = {}
+        self._fact_keys: Dict[str, str] = {}
+        for fact_id, fact in self.memory.facts().items():
+            if fact.get("text"):
+                self._index_text(fact_id, fact["text"])
+        self._detach_lost_rows()
+        self._migrate_inline_embeddings()
+        self._build_index()
+        self._prepare_ann()
+        # Facts stored while no model was available get embedded on this start.
+        self._pending = [
+            (fact_id, fact["text"])
+            for fact_id, fact in self.memory.facts().items()
+            if fact.get("text") and fact.get("embedding_row") is None
+        ]
+        threading.Thread(target=self._load_model, name="semantic-warmup", daemon=True).start()
+
+    def _load_model(self) -> None:
+        """Load (or connect to) the embedding model, then embed queued facts."""
+        model = None
+        server = getattr(self.cfg, "embedding_server", "")
+        if server:
+            try:
+                from src.model_server import RemoteModel
+
+                model = RemoteModel(server, getattr(self.cfg, "embedding_server_authkey", ""), self.model_name)
+                self.logger.info(f"Using shared embedding model server at {server}.")
+            except Exception as e:
+                self.logger.warning(f"Embedding model server unavailable ({e}); loading locally.")
+        if model is None and SentenceTransformer:
             try:
-                self.semantic_model = SentenceTransformer('all-MiniLM-L6-v2')
+                model = SentenceTransformer(self.model_name)
                 self.logger.info(
                     "SentenceTransformer model loaded for semantic search."
                 )
@@ -35,20 +176,641 @@ class SemanticMemory:
                     f"Failed to load SentenceTransformer model: {e}. "
                     "Semantic fact recall will be degraded."
                 )
-                self.semantic_model = None
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+            self.semantic_model = model
+        if model is not None and pending:
+            try:
+                self._embed_batch(pending)
+            except Exception as e:
+                self.logger.error(f"Failed to embed {len(pending)} queued facts: {e}")
+        self.ready.set_result(model)
+
+    def _model_encode(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.semantic_model.encode(texts), dtype=np.float32)
+
+    def _encode_many(self, texts: List[str]) -> np.ndarray:
+        """Embed texts through the embedding cache, if enabled."""
+        if self.cache is not None:
+            return self.cache.encode_many(texts, self._model_encode)
+        return self._model_encode(texts)
+
+    def _encode(self, text: str) -> np.ndarray:
+        return self._encode_many([text])[0]
+
+    def encode(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Embed arbitrary texts with the loaded model (through the embedding cache).
+        Args:
+            texts (List[str]): Texts to embed.
+        Returns:
+            Optional[np.ndarray]: L2-normalized float32 rows, or None while no model is loaded.
+        """
+        if not self.semantic_model:
+            return None
+        return self._normalize(self._encode_many(texts))
+
+    def _attach_row(self, fact_id: str, row: int) -> None:
+        """Point a stored fact at its sidecar row."""
+        fact = self.memory.get_fact(fact_id)
+        if fact is not None and fact.get("embedding_row") != row:
+            self.memory.add_fact(fact_id, {**fact, "embedding_row": row})
 
-    def embed_fact(self, fact_text: str) -> Optional[List[float]]:
+    def _embed_batch(self, items: List[Tuple[str, str]]) -> None:
+        """Embed (fact_id, text) pairs with one encode call and one sidecar write."""
+        vectors = self._encode_many([text for _, text in items])
+        first = self.store.append_many(vectors)
+        for offset, (fact_id, _) in enumerate(items):
+            self.index_fact(fact_id, vectors[offset], first + offset)
+            self._attach_row(fact_id, first + offset)
+        self.logger.info(f"Embedded {len(items)} facts queued during model warm-up.")
+
+    def _detach_lost_rows(self) -> None:
+        """
+        Clear ``embedding_row`` on facts whose rows are not in the sidecar (all of
+        them if it was unreadable), before any new row can reuse those ids.  The
+        facts are then queued for re-embedding like any other unembedded fact.
+        """
+        n_rows = len(self.store)
+        lost = {
+            fact_id: {**fact, "embedding_row": None}
+            for fact_id, fact in self.memory.facts().items()
+            if fact.get("embedding_row") is not None and fact["embedding_row"] >= n_rows
+        }
+        if lost:
+            self.memory.add_facts(lost)
+            self.memory.flush()
+            self.logger.warning(f"{len(lost)} facts lost their embedding rows and will be re-embedded.")
+
+    def _migrate_inline_embeddings(self) -> None:
+        """Move embeddings stored as JSON float lists into the sidecar."""
+        legacy = [(fid, f) for fid, f in self.memory.facts().items() if f.get("embedding")]
+        if not legacy:
+            return
+        try:
+            first = self.store.append_many(
+                np.asarray([f["embedding"] for _, f in legacy], dtype=np.float32)
+            )
+        except ValueError as e:
+            self.logger.warning(f"Could not migrate inline fact embeddings: {e}")
+            return
+        for offset, (fact_id, fact) in enumerate(legacy):
+            updated = {k: v for k, v in fact.items() if k != "embedding"}
+            updated["embedding_row"] = first + offset
+            self.memory.add_fact(fact_id, updated)
+        self.logger.info(f"Moved {len(legacy)} fact embeddings into {self.store.path.name}.")
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _build_index(self) -> None:
+        """Load every stored fact embedding into the normalized search matrix."""
+        n_rows = len(self.store)
+        pairs = [
+            (fact_id, fact["embedding_row"])
+            for fact_id, fact in self.memory.facts().items()
+            if fact.get("embedding_row") is not None and fact["embedding_row"] < n_rows
+        ]
+        with self._index_lock:
+            self._index_generation += 1
+            self.version += 1
+            if not pairs:
+                self._matrix = QuantizedMatrix(self.store.dim or 0, self.precision, 0)
+                self._ids, self._rows, self._positions = [], [], {}
+                return
+            rows = np.fromiter((row for _, row in pairs), dtype=np.int64, count=len(pairs))
+            vectors = self._normalize(self.store.matrix[rows])
+            capacity = max(64, 1 << (len(pairs) - 1).bit_length())
+            self._matrix = QuantizedMatrix(vectors.shape[1], self.precision, capacity)
+            self._matrix[: len(pairs)] = vectors
+            self._ids = [fact_id for fact_id, _ in pairs]
+            self._rows = rows.tolist()
+            self._positions = {fact_id: i for i, fact_id in enumerate(self._ids)}
+        if self.precision != "float32":
+            self.logger.info(
+                f"Fact index holds {len(pairs)} {self.precision} vectors in "
+                f"{self._matrix.nbytes / 1e6:.1f} MB."
+            )
+
+    def _prepare_ann(self) -> None:
+        """Load the persisted ANN index, catching up on facts added since, or train it."""
+        if self.ann is None or len(self._ids) < self.ann_min_facts:
+            return
+        with self._index_lock:
+            if self.ann.load(self._ids):
+                for pos in range(len(self.ann), len(self._ids)):
+                    self.ann.add(pos, self._ids[pos], self._matrix[pos])
+            else:
+                self.ann.train(self._ids, self._matrix[: len(self._ids)])
+                self.ann.save()
+
+    def _update_ann(self, pos: int, fact_id: str, vector: np.ndarray) -> None:
+        """Add one position to the ANN index (under the index lock); start a rebuild when due."""
+        if self.ann is None:
+            return
+        if self._ann_thread is not None:
+            self._ann_dirty.add(pos)
+        if self.ann.trained:
+            self.ann.add(pos, fact_id, vector)
+        n = len(self._ids)
+        due = self.ann.needs_retrain() if self.ann.trained else n >= self.ann_min_facts
+        if due and self._ann_thread is None:
+            # Training takes seconds on large stores; the current index (or exact
+            # search) keeps serving until the new one is swapped in.
+            self._ann_thread = threading.Thread(
+                target=self._rebuild_ann,
+                args=(self._index_generation, list(self._ids), self._matrix[:n]),
+                name="ann-train",
+                daemon=True,
+            )
+            self._ann_thread.start()
+
+    def _rebuild_ann(self, generation: int, ids: List[str], vectors: np.ndarray) -> None:
         """
-        Embed a fact string into a vector using the semantic model.
+        Train a fresh ANN index off the index lock, catch it up and swap it in,
+        unless the search index was rebuilt meanwhile and the positions moved.
+        """
+        try:
+            fresh = IVFIndex(self.ann.path, nprobe=self.ann.nprobe)
+            fresh.train(ids, vectors)
+            with self._index_lock:
+                if generation != self._index_generation:
+                    return
+                for pos in sorted(self._ann_dirty | set(range(len(ids), len(self._ids)))):
+                    fresh.add(pos, self._ids[pos], self._matrix[pos])
+                self.ann = fresh
+            fresh.save()
+        except Exception as e:
+            self.logger.error(f"ANN index rebuild failed: {e}")
+        finally:
+            with self._index_lock:
+                self._ann_dirty.clear()
+                self._ann_thread = None
+
+    def _join_ann(self) -> None:
+        """Wait for a background ANN rebuild, if one is running."""
+        with self._index_lock:
+            pending = self._ann_thread
+        if pending is not None:
+            pending.join()
+
+    def _retrain_ann(self) -> None:
+        """Retrain the ANN index now, after any background rebuild has finished."""
+        if self.ann is None:
+            return
+        self._join_ann()
+        with self._index_lock:
+            if len(self._ids) >= self.ann_min_facts:
+                self.ann.train(self._ids, self._matrix[: len(self._ids)])
+                self.ann.save()
+
+    def close(self) -> None:
+        """Persist the ANN index and close the embedding cache."""
+        if self.ann is not None:
+            self._join_ann()
+            self.ann.save()
+        if self.cache is not None:
+            stats = self.cache.stats()
+            self.logger.info(
+                f"Embedding cache: {stats['hits']} hits, {stats['disk_hits']} disk hits, "
+                f"{stats['misses']} misses, ~{stats['saved_ms']:.0f} ms saved."
+            )
+            self.cache.close()
+
+    def index_fact(self, fact_id: str, vector: np.ndarray, row: Optional[int] = None) -> None:
+        """
+        Insert or replace a fact in the search matrix, doubling capacity as needed.
+        Args:
+            fact_id (str): The learned fact id.
+            vector (np.ndarray): The raw (unnormalized) embedding.
+            row (Optional[int]): The vector's sidecar row, used for exact rescoring.
+        """
+        vector = self._normalize(vector)
+        row = -1 if row is None else row
+        with self._index_lock:
+            pos = self._positions.get(fact_id)
+            if pos is None:
+                pos = len(self._ids)
+                if pos == 0:
+                    self._matrix = QuantizedMatrix(vector.shape[0], self.precision)
+                elif self._matrix.dim != vector.shape[0]:
+                    raise ValueError(
+                        f"Embedding dimension {vector.shape[0]} does not match index dimension {self._matrix.dim}."
+                    )
+                elif pos >= self._matrix.shape[0]:
+                    self._matrix = self._matrix.grown(self._matrix.shape[0] * 2)
+                self._ids.append(fact_id)
+                self._rows.append(row)
+                self._positions[fact_id] = pos
+            else:
+                self._rows[pos] = row
+            self._matrix[pos] = vector
+            self.version += 1
+            self._update_ann(pos, fact_id, vector)
+
+    def embed_fact(self, fact_text: str, fact_id: Optional[str] = None) -> Optional[int]:
+        """
+        Embed a fact string and append the vector to the embedding sidecar.
         Args:
             fact_text (str): The fact to embed.
+            fact_id (Optional[str]): When given, the fact is added to the search matrix and
+                the stored fact's ``embedding_row`` is updated.  If the model is still
+                loading, the fact is queued and embedded once it is ready.
         Returns:
-            Optional[List[float]]: The embedding vector, or None if unavailable.
+            Optional[int]: The sidecar row id, or None if the model is not available yet.
+        """
+        if fact_id is not None:
+            self._index_text(fact_id, fact_text)
+        with self._pending_lock:
+            if not self.semantic_model:
+                if fact_id is not None and not self.ready.done():
+                    self._pending.append((fact_id, fact_text))
+                return None
+        vector = self._encode(fact_text)
+        row = self.store.append(vector)
+        if fact_id is not None:
+            self.index_fact(fact_id, vector, row)
+            self._attach_row(fact_id, row)
+        return row
+
+    def _encode_stream(
+        self, texts: Iterable[str], batch_size: int, workers: int
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
         """
-        if self.semantic_model:
-            return self.semantic_model.encode(fact_text).tolist()
+        Encode a stream of texts in large batches, in order.  With more than one
+        worker, batches are fanned out over a process pool that loads its own
+        model copies; at most two batches per worker are in flight.
+        """
+        batches = _batched(texts, batch_size)
+        if workers <= 1 or SentenceTransformer is None:
+            for batch in batches:
+                yield batch, self._model_encode(batch)
+            return
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_encode_worker, initargs=(self.model_name,)
+        ) as pool:
+            inflight: deque = deque()
+            for batch in batches:
+                inflight.append((batch, pool.submit(_encode_in_worker, batch)))
+                if len(inflight) >= workers * 2:
+                    done_batch, future = inflight.popleft()
+                    yield done_batch, future.result()
+            while inflight:
+                done_batch, future = inflight.popleft()
+                yield done_batch, future.result()
+
+    def _require_model(self) -> None:
+        if self.ready.result() is None:
+            raise RuntimeError("No embedding model is available for bulk embedding.")
+
+    def _report(self, done: int, started: float, progress: Optional[ProgressCallback]) -> None:
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        self.logger.info(f"Embedded {done} facts ({rate:.0f} facts/s).")
+        if progress is not None:
+            progress(done, rate)
+
+    def bulk_import(
+        self,
+        facts: Iterable[str],
+        batch_size: int = 256,
+        workers: int = 1,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, float]:
+        """
+        Embed and store a stream of fact texts.  Vectors are appended to the
+        sidecar batch by batch; the facts themselves are committed to memory in
+        a single transaction at the end.
+        Args:
+            facts (Iterable[str]): Fact texts; blank entries are skipped.
+            batch_size (int): Texts per encode call.
+            workers (int): Encoder processes; 1 encodes in-process with the loaded model.
+            progress (Optional[ProgressCallback]): Called with (facts done, facts/sec) per batch.
+        Returns:
+            Dict[str, float]: Number of facts, elapsed seconds and throughput.
+        """
+        self._require_model()
+        started = time.perf_counter()
+        prefix = dt.datetime.now().isoformat()
+        texts = (t.strip() for t in facts if t and t.strip())
+        pending: Dict[str, Dict[str, Any]] = {}
+        for batch, vectors in self._encode_stream(texts, batch_size, workers):
+            first = self.store.append_many(vectors)
+            for offset, text in enumerate(batch):
+                fact_id = f"{prefix}-{len(pending):06d}"
+                pending[fact_id] = {"text": text, "timestamp": prefix, "embedding_row": first + offset}
+                self._index_text(fact_id, text)
+                self.index_fact(fact_id, vectors[offset], first + offset)
+            self._report(len(pending), started, progress)
+        self.memory.add_facts(pending)
+        self.memory.flush()
+        elapsed = time.perf_counter() - started
+        return {"facts": len(pending), "seconds": elapsed, "facts_per_sec": len(pending) / max(elapsed, 1e-9)}
+
+    def reindex(
+        self,
+        batch_size: int = 256,
+        workers: int = 1,
+        progress: Optional[ProgressCallback] = None,
+    ) -> Dict[str, float]:
+        """
+        Re-embed every stored fact with the current model into a fresh sidecar,
+        then repoint all facts at their new rows in one transaction.  Facts
+        without text lose their row.
+        Args:
+            batch_size (int): Texts per encode call.
+            workers (int): Encoder processes; 1 encodes in-process with the loaded model.
+            progress (Optional[ProgressCallback]): Called with (facts done, facts/sec) per batch.
+        Returns:
+            Dict[str, float]: Number of facts, elapsed seconds and throughput.
+        """
+        self._require_model()
+        started = time.perf_counter()
+        stored = self.memory.facts()
+        facts = {fid: f for fid, f in stored.items() if f.get("text")}
+        fresh_path = self.store.path.with_name(self.store.path.stem + ".reindex.npy")
+        if fresh_path.exists():
+            fresh_path.unlink()
+        fresh = EmbeddingStore(fresh_path)
+        done = 0
+        for batch, vectors in self._encode_stream((f["text"] for f in facts.values()), batch_size, workers):
+            fresh.append_many(vectors)
+            done += len(batch)
+            self._report(done, started, progress)
+        updated = {
+            fid: {**fact, "embedding_row": row}
+            for row, (fid, fact) in enumerate(facts.items())
+        }
+        # Facts without text get no new row; their old one means nothing in the new sidecar.
+        updated.update({
+            fid: {**fact, "embedding_row": None}
+            for fid, fact in stored.items()
+            if fid not in facts and fact.get("embedding_row") is not None
+        })
+        fresh_path.replace(self.store.path)
+        self.store = EmbeddingStore(self.store.path)
+        self.memory.add_facts(updated)
+        self.memory.flush()
+        self._join_ann()
+        self._build_index()
+        self._retrain_ann()
+        elapsed = time.perf_counter() - started
+        return {"facts": done, "seconds": elapsed, "facts_per_sec": done / max(elapsed, 1e-9)}
+
+    def search(self, query_vector: np.ndarray, k: int = TOP_K) -> List[tuple]:
+        """
+        Return the ``k`` most similar facts as (fact_id, cosine score) pairs.
+        Args:
+            query_vector (np.ndarray): The raw query embedding.
+            k (int): Number of results.
+        Returns:
+            List[tuple]: Best matches first.
+        """
+        query = self._normalize(query_vector)
+        with self._index_lock:
+            n = len(self._ids)
+            if n == 0:
+                return []
+            # index_fact may grow or append to these once the lock is released.
+            matrix = self._matrix
+            ids = self._ids[:n]
+            rows = self._rows[:n]
+            ann = self.ann
+        shortlist = k * RESCORE_FACTOR if self.rescore else k
+        if ann is not None and ann.trained and n >= self.ann_min_facts:
+            hits = ann.search(query, matrix, shortlist, limit=n)
+        else:
+            scores = matrix.scores(query, n)
+            shortlist = min(shortlist, n)
+            top = np.argpartition(-scores, shortlist - 1)[:shortlist]
+            hits = [(int(i), float(scores[i])) for i in top]
+        if self.rescore:
+            hits = self._rescore(query, hits, rows)
+        hits.sort(key=lambda hit: -hit[1])
+        return [(ids[pos], score) for pos, score in hits[:k]]
+
+    def _rescore(self, query: np.ndarray, hits: List[Tuple[int, float]], rows: List[int]) -> List[Tuple[int, float]]:
+        """Replace approximate scores with exact float32 ones from the sidecar."""
+        n_rows = len(self.store)
+        exact = [(pos, rows[pos]) for pos, _ in hits if 0 <= rows[pos] < n_rows]
+        if not exact:
+            return hits
+        vectors = self._normalize(self.store.matrix[np.asarray([r for _, r in exact], dtype=np.int64)])
+        scores = dict(zip((pos for pos, _ in exact), (vectors @ query).tolist()))
+        return [(pos, scores.get(pos, score)) for pos, score in hits]
+
+    def _index_text(self, fact_id: str, text: str) -> None:
+        """Add or update a fact's text in the keyword index and the exact-text map."""
+        self.keywords.add(fact_id, text)
+        key = fact_key(text)
+        with self._index_lock:
+            old = self._fact_keys.get(fact_id)
+            if old is not None and old != key and self._by_text.get(old) == fact_id:
+                del self._by_text[old]
+            self._fact_keys[fact_id] = key
+            self._by_text.setdefault(key, fact_id)
+            self.version += 1
+
+    def _unindex_text(self, fact_id: str) -> None:
+        """Drop a deleted fact from the keyword index and the exact-text map."""
+        self.keywords.remove(fact_id)
+        with self._index_lock:
+            key = self._fact_keys.pop(fact_id, None)
+            if key is not None and self._by_text.get(key) == fact_id:
+                del self._by_text[key]
+            self.version += 1
+
+    def find_duplicate(self, fact_text: str, threshold: Optional[float] = None) -> Optional[str]:
+        """
+        Look for a stored fact that says the same thing.  Identical text (up to
+        case and whitespace) always matches; otherwise the nearest indexed fact
+        matches if its cosine similarity reaches the threshold.
+        Args:
+            fact_text (str): The candidate fact.
+            threshold (Optional[float]): Similarity cut-off; defaults to ``fact_dedup_threshold``.
+                A value <= 0 disables the vector check.
+        Returns:
+            Optional[str]: The id of the duplicate, or None.
+        """
+        threshold = self.dedup_threshold if threshold is None else threshold
+        with self._index_lock:
+            fact_id = self._by_text.get(fact_key(fact_text))
+        if fact_id is not None:
+            return fact_id
+        if threshold <= 0 or not self.semantic_model:
+            return None
+        hits = self.search(self._encode(fact_text), 1)
+        if hits and hits[0][1] >= threshold:
+            return hits[0][0]
         return None
 
+    def _cluster(self, threshold: float) -> Dict[str, str]:
+        """
+        Map every indexed fact to the earliest-indexed fact it duplicates.
+        Facts are visited in index order; each joins the most similar earlier
+        cluster leader at or above the threshold, or becomes a leader itself.
+        """
+        with self._index_lock:
+            n = len(self._ids)
+            ids = list(self._ids)
+            vectors = self._matrix[:n] if n else None
+        leader = np.arange(n)
+        is_leader = np.zeros(n, dtype=bool)
+        for start in range(0, n, COMPACT_BLOCK):
+            stop = min(n, start + COMPACT_BLOCK)
+            sims = vectors[start:stop] @ vectors[:stop].T
+            for j in range(start, stop):
+                row = sims[j - start, :j]
+                mask = is_leader[:j] & (row >= threshold)
+                if mask.any():
+                    leader[j] = int(np.argmax(np.where(mask, row, -np.inf)))
+                else:
+                    is_leader[j] = True
+        return {ids[j]: ids[leader[j]] for j in range(n)}
+
+    @staticmethod
+    def _compaction_paths(sidecar: Path) -> Tuple[Path, Path]:
+        """The rewritten sidecar and the journal of a compaction in progress."""
+        return (
+            sidecar.with_name(sidecar.stem + ".compact.npy"),
+            sidecar.with_name(sidecar.stem + ".compact.json"),
+        )
+
+    def _finish_compaction(self, sidecar: Path) -> bool:
+        """
+        Complete a compaction whose journal was written, or discard one that
+        never reached it.  Applying the journal is idempotent, so it is safe
+        to repeat after a crash at any step.
+        Args:
+            sidecar (Path): The live embedding sidecar.
+        Returns:
+            bool: True if a journal was applied.
+        """
+        fresh_path, journal_path = self._compaction_paths(sidecar)
+        if not journal_path.exists():
+            if fresh_path.exists():
+                fresh_path.unlink()
+            return False
+        try:
+            journal = json.loads(journal_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            # Written atomically, so this is not a torn write; leave it for inspection.
+            self.logger.error(f"Compaction journal {journal_path.name} unreadable ({exc}); not applied.")
+            return False
+        if journal["sidecar"]:
+            if fresh_path.exists():
+                fresh_path.replace(sidecar)
+        elif sidecar.exists():
+            sidecar.unlink()
+        self.memory.remove_facts(journal["removed"])
+        self.memory.add_facts(journal["merged"])
+        self.memory.flush()
+        journal_path.unlink()
+        return True
+
+    def compact(self, threshold: Optional[float] = None) -> Dict[str, int]:
+        """
+        Merge duplicate facts and rewrite the embedding sidecar without the rows
+        that no fact points at any more.  Each cluster keeps its oldest id with
+        the newest text and a ``mentions`` count; the rest are deleted.
+        Args:
+            threshold (Optional[float]): Similarity cut-off; defaults to ``fact_dedup_threshold``.
+        Returns:
+            Dict[str, int]: Fact counts and sidecar bytes before and after.
+        """
+        threshold = self.dedup_threshold if threshold is None else threshold
+        facts = dict(self.memory.facts())
+        sidecar_before = self.store.path.stat().st_size if self.store.path.exists() else 0
+        order = {fact_id: i for i, fact_id in enumerate(facts)}
+        parent = {fact_id: fact_id for fact_id in facts}
+
+        def find(fact_id: str) -> str:
+            while parent[fact_id] != fact_id:
+                parent[fact_id] = parent[parent[fact_id]]
+                fact_id = parent[fact_id]
+            return fact_id
+
+        def union(a: str, b: str) -> None:
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                ra, rb = sorted((ra, rb), key=order.get)
+                parent[rb] = ra
+
+        if threshold > 0:
+            for fact_id, leader in self._cluster(threshold).items():
+                if fact_id in parent and leader in parent:
+                    union(fact_id, leader)
+        first_by_text: Dict[str, str] = {}
+        for fact_id, fact in facts.items():
+            key = fact_key(fact.get("text", ""))
+            if key:
+                union(first_by_text.setdefault(key, fact_id), fact_id)
+        groups: Dict[str, List[str]] = {}
+        for fact_id in facts:
+            groups.setdefault(find(fact_id), []).append(fact_id)
+
+        n_rows = len(self.store)
+        merged: Dict[str, Dict[str, Any]] = {}
+        removed: List[str] = []
+        for root, members in groups.items():
+            newest = max(members, key=lambda fid: facts[fid].get("timestamp") or "")
+            fact = dict(facts[newest])
+            fact["mentions"] = sum(facts[fid].get("mentions", 1) for fid in members)
+            merged[root] = fact
+            removed.extend(fid for fid in members if fid != root)
+        live = {
+            fid: fact["embedding_row"] for fid, fact in merged.items()
+            if fact.get("embedding_row") is not None and 0 <= fact["embedding_row"] < n_rows
+        }
+        fresh_path, journal_path = self._compaction_paths(self.store.path)
+        if fresh_path.exists():
+            fresh_path.unlink()
+        if live:
+            fresh = EmbeddingStore(fresh_path)
+            rows = np.asarray(list(live.values()), dtype=np.int64)
+            for start in range(0, len(rows), COMPACT_BLOCK * 16):
+                fresh.append_many(self.store.matrix[rows[start:start + COMPACT_BLOCK * 16]])
+        for fact in merged.values():
+            fact["embedding_row"] = None
+        for new_row, fid in enumerate(live):
+            merged[fid]["embedding_row"] = new_row
+
+        # The journal is the commit point: once it exists, a crash anywhere
+        # below is rolled forward on the next start by _finish_compaction.
+        tmp = journal_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"removed": removed, "merged": merged, "sidecar": bool(live)}), encoding="utf-8")
+        tmp.replace(journal_path)
+        self._finish_compaction(self.store.path)
+        self.store = EmbeddingStore(self.store.path)
+        for fid in removed:
+            self._unindex_text(fid)
+        for fid, fact in merged.items():
+            if fact.get("text"):
+                self._index_text(fid, fact["text"])
+        self._join_ann()
+        self._build_index()
+        self._retrain_ann()
+        sidecar_after = self.store.path.stat().st_size if self.store.path.exists() else 0
+        self.logger.info(f"Compacted {len(facts)} facts into {len(merged)}.")
+        return {
+            "facts_before": len(facts),
+            "facts_after": len(merged),
+            "sidecar_bytes_before": sidecar_before,
+            "sidecar_bytes_after": sidecar_after,
+        }
+
+    @staticmethod
+    def _fuse(*rankings: List[str]) -> List[str]:
+        """Merge ranked id lists by reciprocal rank fusion."""
+        fused: Dict[str, float] = {}
+        for ranking in rankings:
+            for rank, fact_id in enumerate(ranking):
+                fused[fact_id] = fused.get(fact_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+        return sorted(fused, key=fused.get, reverse=True)
+
     def recall_facts(self, topic: Optional[str] = None) -> str:
         """
         Recall facts from memory, optionally filtered by semantic similarity to a topic.
@@ -57,58 +819,43 @@ class SemanticMemory:
         Returns:
             str: Recalled facts or a message if none found.
         """
-        facts_dict = self.memory.data.get("learned_facts", {})
-        if not facts_dict:
-            return "I haven't learned any specific facts yet."
-        all_fact_texts = [
-            fact_data["text"]
-            for fact_data in facts_dict.values()
-            if fact_data.get("text")
-        ]
-        if not all_fact_texts:
-            return "I haven't learned any specific facts yet."
         if topic and isinstance(topic, str) and topic.strip():
             topic_lower = topic.lower()
-            relevant_facts = []
-            if self.semantic_model and cosine_similarity:
-                topic_embedding = self.semantic_model.encode(topic_lower)
-                facts_with_embeddings = {
-                    k: v for k, v in facts_dict.items() if v.get("embedding")
-                }
-                if facts_with_embeddings:
-                    fact_embeddings = [
-                        fact_data["embedding"]
-                        for fact_data in facts_with_embeddings.values()
-                    ]
-                    fact_texts_with_embeddings = [
-                        fact_data["text"]
-                        for fact_data in facts_with_embeddings.values()
-                    ]
-                    similarities = cosine_similarity(
-                        topic_embedding.reshape(1, -1), fact_embeddings
-                    )[0]
-                    sorted_indices = similarities.argsort()[::-1]
-                    for i in sorted_indices:
-                        if similarities[i] > 0.5:
-                            relevant_facts.append(fact_texts_with_embeddings[i])
-                        if len(relevant_facts) >= 3:
-                            break
-            else:
-                relevant_facts = [
-                    text for text in all_fact_texts if topic_lower in text.lower()
+            if self.semantic_model:
+                ranked = [
+                    fact_id for fact_id, score in self.search(self._encode(topic_lower))
+                    if score > SIMILARITY_THRESHOLD
                 ]
+                if self.hybrid:
+                    ranked = self._fuse(ranked, [fact_id for fact_id, _ in self.keywords.search(topic, TOP_K)])
+            else:
+                ranked = [fact_id for fact_id, _ in self.keywords.search(topic, TOP_K)]
+            relevant_facts = []
+            for fact_id in ranked[:TOP_K]:
+                fact = self.memory.get_fact(fact_id)
+                if fact and fact.get("text"):
+                    relevant_facts.append(fact["text"])
             if relevant_facts:
                 return (
                     "Here are some facts I remember related to that: \n- "
                     + "\n- ".join(relevant_facts)
                 )
+            if not self.memory.facts():
+                return "I haven't learned any specific facts yet."
             return (
                 "I don't have any specific facts about '"
                 + str(topic)
                 + "'"
             )
+        all_fact_texts = [
+            fact_data["text"]
+            for fact_data in self.memory.facts().values()
+            if fact_data.get("text")
+        ]
+        if not all_fact_texts:
+            return "I haven't learned any specific facts yet."
         return (
             "Here are some facts I remember: \n- "
             + "\n- ".join(all_fact_texts[:1])
             + ("\n- " + "\n- ".join(all_fact_texts[1:]) if len(all_fact_texts) > 1 else "")
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,538 @@
+import json
+import sqlite3
+import threading
+import atexit
+import datetime as dt
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, List
+from src.logging import get_logger
+from src.memory import WriteBehind
+from src.archive import InteractionArchive
+from src.tracing import traced
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS user_preferences (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS interactions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    type TEXT NOT NULL,
+    content TEXT,
+    user_input TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_interactions_type_ts ON interactions(type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_interactions_ts ON interactions(timestamp);
+CREATE TABLE IF NOT EXISTS learned_facts (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    timestamp TEXT,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS reminders (
+    id TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    time TEXT NOT NULL,
+    due REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders(due);
+CREATE TABLE IF NOT EXISTS todo_tasks (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    text_key TEXT NOT NULL DEFAULT ''
+);
+"""
+
+
+def _iso(timestamp: str) -> str:
+    # Older JSON stores used a space separator; normalise so text ranges compare correctly.
+    if len(timestamp) > 10 and timestamp[10] == " ":
+        return timestamp[:10] + "T" + timestamp[11:]
+    return timestamp
+
+
+def _todo_key(text: str) -> str:
+    # Case-folded in Python: SQLite's NOCASE only folds ASCII.
+    return text.casefold()
+
+
+def _due_epoch(time_str: Optional[str], fallback: dt.datetime) -> float:
+    try:
+        return dt.datetime.fromisoformat(time_str).timestamp()
+    except Exception:
+        return fallback.timestamp()
+
+
+class SQLiteMemory:
+    """
+    SQLite-backed persistent store with the same interface as :class:`Memory`.
+    Reminders, todo tasks and history are served by indexed queries instead of
+    scans over the whole document.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_interactions: int = 100,
+        import_from: Optional[Path] = None,
+        flush_interval_ms: int = 0,
+        archive: bool = True,
+    ) -> None:
+        """
+        Initialize the SQLite memory store.
+        Args:
+            path (Path): Path to the SQLite database file.
+            max_interactions (int): Maximum number of interactions to keep.
+            import_from (Optional[Path]): A JSON memory file to migrate from when the
+                database is created.
+            flush_interval_ms (int): When positive, transactions are committed by a
+                background flusher at most this often instead of per mutation.
+            archive (bool): Spill interactions trimmed from the table into compressed
+                day segments instead of discarding them.
+        """
+        self.path = Path(path)
+        self.max_interactions = max_interactions
+        self.logger = get_logger(__name__)
+        self._lock = threading.RLock()
+        self.archive: Optional[InteractionArchive] = (
+            InteractionArchive(self.path.with_name(self.path.stem + "_archive")) if archive else None
+        )
+        is_new = not self.path.exists()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+            self._migrate()
+            if self.archive is not None and self.archive.last_seq > self._last_interaction_id():
+                # The archive is shared with the JSON backend: continue its numbering so
+                # new rows are never mistaken for interactions it already holds.
+                self._reserve_interaction_ids(self.archive.last_seq)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO meta(key, value) VALUES ('first_meeting', ?)",
+                (dt.datetime.now().isoformat(),),
+            )
+        if is_new and import_from is not None and Path(import_from).exists():
+            self.import_json(Path(import_from))
+        self._flusher: Optional[WriteBehind] = None
+        if flush_interval_ms > 0:
+            self._flusher = WriteBehind(self.save, flush_interval_ms)
+            atexit.register(self.close)
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """
+        Run statements under the store lock.  Without a flusher the transaction
+        commits on exit; otherwise it stays open until the next group commit.
+        A mutation that raises is rolled back either way (with a flusher, only
+        its own statements: earlier writes in the open transaction are kept).
+        """
+        with self._lock:
+            if self._flusher is None:
+                with self.conn:
+                    yield self.conn
+                return
+            if not self.conn.in_transaction:
+                self.conn.execute("BEGIN")
+            self.conn.execute("SAVEPOINT write")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK TO write")
+                self.conn.execute("RELEASE write")
+                raise
+            self.conn.execute("RELEASE write")
+        self._flusher.mark_dirty()
+
+    def _migrate(self) -> None:
+        """Bring databases created by older versions up to the current schema."""
+        columns = {r["name"] for r in self.conn.execute("PRAGMA table_info(todo_tasks)")}
+        if "text_key" not in columns:
+            self.conn.execute("ALTER TABLE todo_tasks ADD COLUMN text_key TEXT NOT NULL DEFAULT ''")
+        self.conn.execute("DROP INDEX IF EXISTS idx_todo_done_text")
+        self.conn.executemany(
+            "UPDATE todo_tasks SET text_key = ? WHERE seq = ?",
+            [
+                (_todo_key(r["text"]), r["seq"])
+                for r in self.conn.execute("SELECT seq, text FROM todo_tasks WHERE text_key = ''").fetchall()
+                if r["text"]
+            ],
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_todo_done_key ON todo_tasks(done, text_key)")
+
+    def import_json(self, json_path: Path) -> None:
+        """
+        Migrate an existing JSON memory file into the database in one transaction.
+        Interactions older than the ``max_interactions`` kept in the table go to
+        the archive, as if they had been trimmed here.
+        Args:
+            json_path (Path): Path to the ``ai_memory.json`` file.
+        """
+        try:
+            with json_path.open("r", encoding="utf-8") as fh:
+                doc = json.load(fh)
+        except (OSError, json.JSONDecodeError) as exc:
+            self.logger.warning(f"Could not import {json_path}: {exc}")
+            return
+        now = dt.datetime.now()
+        with self._lock, self.conn:
+            if doc.get("first_meeting"):
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO meta(key, value) VALUES ('first_meeting', ?)",
+                    (doc["first_meeting"],),
+                )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO user_preferences(key, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in doc.get("user_preferences", {}).items()],
+            )
+            first_id = self._last_interaction_id() + 1
+            interactions = [
+                (
+                    first_id + n, _iso(i.get("timestamp", "")), i.get("type", ""),
+                    i.get("content"), i.get("user_input"),
+                )
+                for n, i in enumerate(doc.get("interactions", []))
+            ]
+            kept = max(0, len(interactions) - self.max_interactions)
+            if self.archive is not None:
+                for row_id, timestamp, kind, content, user_input in interactions[:kept]:
+                    self.archive.add(
+                        {"timestamp": timestamp, "type": kind, "content": content, "user_input": user_input},
+                        row_id,
+                    )
+            self.conn.executemany(
+                "INSERT INTO interactions(id, timestamp, type, content, user_input) VALUES (?, ?, ?, ?, ?)",
+                interactions[kept:],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO learned_facts(id, text, timestamp, extra) VALUES (?, ?, ?, ?)",
+                [
+                    (fid, f.get("text", ""), f.get("timestamp"), json.dumps(self._fact_extra(f)))
+                    for fid, f in doc.get("learned_facts", {}).items()
+                ],
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO reminders(id, text, time, due) VALUES (?, ?, ?, ?)",
+                [
+                    (r.get("id"), r.get("text", ""), r.get("time", ""), _due_epoch(r.get("time"), now))
+                    for r in doc.get("reminders", [])
+                ],
+            )
+            self.conn.executemany(
+                "INSERT INTO todo_tasks(id, text, done, text_key) VALUES (?, ?, ?, ?)",
+                [
+                    (t.get("id", ""), t.get("text", ""), int(bool(t.get("done"))), _todo_key(t.get("text", "")))
+                    for t in doc.get("todo_tasks", [])
+                ],
+            )
+            if self.archive is not None:
+                self.archive.flush()
+        self.logger.info(f"Imported JSON memory from {json_path}.")
+
+    @staticmethod
+    def _fact_extra(fact: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in fact.items() if k not in ("text", "timestamp")}
+
+    def _last_interaction_id(self) -> int:
+        """Return the highest interaction id ever assigned, including deleted rows."""
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'interactions'").fetchone()
+        return row["seq"] if row else 0
+
+    def _reserve_interaction_ids(self, last_id: int) -> None:
+        """Make the next interaction id ``last_id + 1``."""
+        if self.conn.execute(
+            "UPDATE sqlite_sequence SET seq = ? WHERE name = 'interactions'", (last_id,)
+        ).rowcount == 0:
+            self.conn.execute("INSERT INTO sqlite_sequence(name, seq) VALUES ('interactions', ?)", (last_id,))
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """
+        Materialize the store as the JSON document layout used by :class:`Memory`.
+        Intended for export and debugging; callers should prefer the query methods.
+        """
+        with self._lock:
+            meta = dict(self.conn.execute("SELECT key, value FROM meta").fetchall())
+            return {
+                "user_preferences": {
+                    r["key"]: json.loads(r["value"])
+                    for r in self.conn.execute("SELECT key, value FROM user_preferences")
+                },
+                "interactions": [
+                    dict(r) for r in self.conn.execute(
+                        "SELECT timestamp, type, content, user_input FROM interactions ORDER BY id"
+                    )
+                ],
+                "learned_facts": self.facts(),
+                "reminders": [
+                    dict(r) for r in self.conn.execute(
+                        "SELECT id, text, time FROM reminders ORDER BY due"
+                    )
+                ],
+                "todo_tasks": [
+                    {"id": r["id"], "text": r["text"], "done": bool(r["done"])}
+                    for r in self.conn.execute("SELECT id, text, done FROM todo_tasks ORDER BY seq")
+                ],
+                "first_meeting": meta.get("first_meeting"),
+            }
+
+    @traced("memory.save")
+    def save(self) -> None:
+        """Commit any pending transaction."""
+        with self._lock:
+            if self.archive is not None:
+                self.archive.flush()
+            self.conn.commit()
+
+    def flush(self) -> None:
+        """Block until every mutation made so far is committed."""
+        if self._flusher is not None:
+            self._flusher.flush()
+
+    @contextmanager
+    def durable(self) -> Iterator["SQLiteMemory"]:
+        """
+        Context manager for durability-critical writes: mutations made inside
+        the block are committed before it exits.
+        """
+        try:
+            yield self
+        finally:
+            self.flush()
+
+    def compact(self) -> None:
+        """Commit pending writes and VACUUM the database to reclaim freed pages."""
+        self.flush()
+        with self._lock:
+            self.conn.commit()
+            self.conn.execute("VACUUM")
+
+    def close(self) -> None:
+        """Flush pending writes, stop the flusher and close the database connection."""
+        if self._flusher is not None:
+            flusher, self._flusher = self._flusher, None
+            flusher.close()
+        with self._lock:
+            if self.conn is not None:
+                if self.archive is not None:
+                    self.archive.flush()
+                self.conn.commit()
+                self.conn.close()
+                self.conn = None
+
+    def append(
+        self,
+        interaction_type: str,
+        content: str,
+        user_input: Optional[str] = None,
+    ) -> None:
+        """
+        Append an interaction and trim history to ``max_interactions`` rows.
+        Args:
+            interaction_type (str): The type of interaction (e.g., 'user_command', 'ai_response').
+            content (str): The content of the interaction.
+            user_input (Optional[str]): The original user input, if any.
+        """
+        with self._write():
+            cur = self.conn.execute(
+                "INSERT INTO interactions(timestamp, type, content, user_input) VALUES (?, ?, ?, ?)",
+                (dt.datetime.now().isoformat(), interaction_type, content, user_input),
+            )
+            cutoff = cur.lastrowid - self.max_interactions
+            if self.archive is not None:
+                for row in self.conn.execute(
+                    "SELECT id, timestamp, type, content, user_input FROM interactions "
+                    "WHERE id <= ? ORDER BY id",
+                    (cutoff,),
+                ):
+                    record = dict(row)
+                    self.archive.add(record, record.pop("id"))
+                # On disk before the DELETE commits; ids already archived are skipped if
+                # a crash makes this trim run again.
+                self.archive.flush()
+            self.conn.execute("DELETE FROM interactions WHERE id <= ?", (cutoff,))
+
+    def recent_interactions(self, limit: int) -> List[Dict[str, Any]]:
+        """Return the last ``limit`` interactions, oldest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT timestamp, type, content, user_input FROM interactions "
+                "ORDER BY id DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(r) for r in reversed(rows)]
+
+    def query_interactions(
+        self,
+        start: Optional[dt.datetime] = None,
+        end: Optional[dt.datetime] = None,
+        types: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return interactions in a time range from the archive and the live table.
+        Args:
+            start (Optional[datetime]): Inclusive lower bound on the timestamp.
+            end (Optional[datetime]): Inclusive upper bound on the timestamp.
+            types (Optional[List[str]]): Interaction types to include.
+        Returns:
+            List[Dict[str, Any]]: Matching interactions, oldest first.
+        """
+        archived = list(self.archive.query(start, end, types)) if self.archive else []
+        clauses, params = [], []
+        if types:
+            clauses.append(f"type IN ({', '.join('?' for _ in types)})")
+            params.extend(types)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("timestamp <= ?")
+            params.append(end.isoformat())
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT timestamp, type, content, user_input FROM interactions"
+                f"{where} ORDER BY id",
+                params,
+            ).fetchall()
+        return archived + [dict(r) for r in rows]
+
+    def get_preference(self, key: str, default: Any = None) -> Any:
+        """Return a stored user preference."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT value FROM user_preferences WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def set_preference(self, key: str, value: Any) -> None:
+        """Store a user preference."""
+        with self._write():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO user_preferences(key, value) VALUES (?, ?)",
+                (key, json.dumps(value)),
+            )
+
+    def facts(self) -> Dict[str, Dict[str, Any]]:
+        """Return learned facts keyed by fact id."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, text, timestamp, extra FROM learned_facts ORDER BY rowid"
+            ).fetchall()
+        facts = {}
+        for r in rows:
+            fact = {"text": r["text"], "timestamp": r["timestamp"]}
+            fact.update(json.loads(r["extra"] or "{}"))
+            facts[r["id"]] = fact
+        return facts
+
+    def get_fact(self, fact_id: str) -> Optional[Dict[str, Any]]:
+        """Return a single learned fact, or None if unknown."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT text, timestamp, extra FROM learned_facts WHERE id = ?", (fact_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        fact = {"text": row["text"], "timestamp": row["timestamp"]}
+        fact.update(json.loads(row["extra"] or "{}"))
+        return fact
+
+    def add_fact(self, fact_id: str, fact: Dict[str, Any]) -> None:
+        """Store a learned fact under the given id."""
+        with self._write():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO learned_facts(id, text, timestamp, extra) VALUES (?, ?, ?, ?)",
+                (fact_id, fact.get("text", ""), fact.get("timestamp"), json.dumps(self._fact_extra(fact))),
+            )
+
+    def add_facts(self, facts: Dict[str, Dict[str, Any]]) -> None:
+        """Store many learned facts in one transaction."""
+        with self._write():
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO learned_facts(id, text, timestamp, extra) VALUES (?, ?, ?, ?)",
+                [
+                    (fid, f.get("text", ""), f.get("timestamp"), json.dumps(self._fact_extra(f)))
+                    for fid, f in facts.items()
+                ],
+            )
+
+    def remove_facts(self, fact_ids: List[str]) -> None:
+        """Delete learned facts by id in one transaction."""
+        with self._write():
+            self.conn.executemany("DELETE FROM learned_facts WHERE id = ?", [(fid,) for fid in fact_ids])
+
+    def add_reminder(self, text: str, when: dt.datetime) -> Dict[str, Any]:
+        """Store a reminder in memory and return it."""
+        reminder = {
+            "id": dt.datetime.now().isoformat(),
+            "text": text,
+            "time": when.isoformat(),
+        }
+        with self._write():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO reminders(id, text, time, due) VALUES (?, ?, ?, ?)",
+                (reminder["id"], text, reminder["time"], when.timestamp()),
+            )
+        return reminder
+
+    def pending_reminders(self) -> List[Dict[str, Any]]:
+        """Return all stored reminders ordered by due time."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, text, time FROM reminders ORDER BY due"
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def remove_reminder(self, reminder_id: str) -> None:
+        """Delete a reminder by id."""
+        with self._write():
+            self.conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+
+    def pop_due_reminders(self, now: Optional[dt.datetime] = None) -> List[Dict[str, Any]]:
+        """Return and remove reminders that are due, using the due-time index."""
+        cutoff = (now or dt.datetime.now()).timestamp()
+        with self._write():
+            rows = self.conn.execute(
+                "SELECT id, text, time FROM reminders WHERE due <= ? ORDER BY due",
+                (cutoff,),
+            ).fetchall()
+            if rows:
+                self.conn.execute("DELETE FROM reminders WHERE due <= ?", (cutoff,))
+        return [dict(r) for r in rows]
+
+    def add_todo(self, text: str) -> None:
+        """Add a todo task."""
+        with self._write():
+            self.conn.execute(
+                "INSERT INTO todo_tasks(id, text, done, text_key) VALUES (?, ?, 0, ?)",
+                (dt.datetime.now().isoformat(), text, _todo_key(text)),
+            )
+
+    def list_todo(self) -> List[str]:
+        """Return a list of incomplete todo task texts."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT text FROM todo_tasks WHERE done = 0 ORDER BY seq"
+            ).fetchall()
+        return [r["text"] for r in rows]
+
+    def complete_todo(self, text: str) -> bool:
+        """Mark a todo task as completed."""
+        with self._write():
+            cur = self.conn.execute(
+                "UPDATE todo_tasks SET done = 1 WHERE seq = ("
+                "SELECT seq FROM todo_tasks WHERE done = 0 AND text_key = ? "
+                "ORDER BY seq LIMIT 1)",
+                (_todo_key(text),),
+            )
+        return cur.rowcount > 0
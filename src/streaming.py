@@ -0,0 +1,160 @@
+import queue
+import re
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.logging import get_logger
+from src.tracing import bind_turn
+
+# A sentence ends at terminal punctuation (plus closing quotes/brackets)
+# followed by whitespace, or at a line break.
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+|\n+")
+_ABBREVIATIONS = frozenset({"mr", "mrs", "ms", "dr", "st", "vs", "e.g", "i.e", "approx"})
+
+
+class SentenceChunker:
+    """
+    Splits streamed text into speakable sentences as soon as each one ends.
+    """
+
+    def __init__(self, min_chars: int = 12) -> None:
+        """
+        Initialize an empty buffer.
+        Args:
+            min_chars (int): Shorter sentences are held back and joined with the next one.
+        """
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text and return the sentences it completed.
+        Args:
+            text (str): The next text delta.
+        Returns:
+            List[str]: Complete sentences, in order.
+        """
+        self._buffer += text
+        sentences: List[str] = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            sentence = self._buffer[start:match.end()].strip()
+            last_word = sentence.rstrip(".!?\"')]").rsplit(None, 1)[-1].lower() if sentence else ""
+            if len(sentence) < self.min_chars or last_word in _ABBREVIATIONS:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        """Return whatever text is left once the stream has ended."""
+        rest, self._buffer = self._buffer.strip(), ""
+        return rest
+
+
+def collect_stream(
+    stream: Iterable[Any], on_text: Callable[[str], None]
+) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Consume a streamed chat completion.
+    Args:
+        stream (Iterable[Any]): Chunks from ``chat.completions.create(stream=True)``.
+        on_text (Callable[[str], None]): Called with every content delta as it arrives.
+    Returns:
+        Tuple[str, List[Dict[str, Any]]]: The full content and the assembled tool calls,
+        as ``{"id", "type", "function": {"name", "arguments"}}`` dicts.
+    """
+    content: List[str] = []
+    calls: Dict[int, Dict[str, Any]] = {}
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content.append(delta.content)
+            on_text(delta.content)
+        for part in delta.tool_calls or []:
+            call = calls.setdefault(
+                part.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}}
+            )
+            if part.id:
+                call["id"] = part.id
+            if part.function is not None:
+                call["function"]["name"] += part.function.name or ""
+                call["function"]["arguments"] += part.function.arguments or ""
+    return "".join(content), [calls[i] for i in sorted(calls)]
+
+
+class SpeechPipeline:
+    """
+    Speaks sentences as they are produced.  One thread synthesizes audio while
+    another plays the previous sentence, so speech starts after the first
+    sentence instead of after the whole reply.
+    """
+
+    def __init__(self, voice: Any, on_first_audio: Optional[Callable[[], None]] = None) -> None:
+        """
+        Start the synthesis and playback threads.
+        Args:
+            voice: A VoiceIO; voices without ``synthesize``/``play`` are driven through ``speak``.
+            on_first_audio (Optional[Callable[[], None]]): Called once, when playback first starts.
+        """
+        self.voice = voice
+        self.logger = get_logger(__name__)
+        self._on_first_audio = on_first_audio
+        self._started = False
+        self._staged = hasattr(voice, "synthesize") and hasattr(voice, "play")
+        self._texts: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._audio: "queue.Queue[Optional[Tuple[str, Optional[bytes]]]]" = queue.Queue()
+        self._threads = [
+            threading.Thread(target=bind_turn(self._synthesize_loop), name="tts-synth", daemon=True),
+            threading.Thread(target=bind_turn(self._play_loop), name="tts-play", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _first_audio(self) -> None:
+        if not self._started:
+            self._started = True
+            if self._on_first_audio:
+                self._on_first_audio()
+
+    def _synthesize_loop(self) -> None:
+        while True:
+            text = self._texts.get()
+            if text is None:
+                self._audio.put(None)
+                return
+            audio = None
+            if self._staged:
+                try:
+                    audio = self.voice.synthesize(text)
+                except Exception as e:
+                    self.logger.warning(f"Speech synthesis failed: {e}")
+            self._audio.put((text, audio))
+
+    def _play_loop(self) -> None:
+        while True:
+            item = self._audio.get()
+            if item is None:
+                return
+            text, audio = item
+            try:
+                if self._staged:
+                    self.voice.play(text, audio, on_start=self._first_audio)
+                else:
+                    self._first_audio()
+                    self.voice.speak(text)
+            except Exception as e:
+                self.logger.error(f"Speech playback failed: {e}")
+
+    def say(self, text: str) -> None:
+        """Queue one sentence for speech."""
+        if text:
+            self._texts.put(text)
+
+    def close(self) -> None:
+        """Wait until everything queued has been spoken."""
+        self._texts.put(None)
+        for thread in self._threads:
+            thread.join()
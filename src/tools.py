@@ -0,0 +1,182 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from src.logging import get_logger
+from src.tracing import bind_turn, span
+
+ToolCall = Tuple[str, Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class Tool:
+    """
+    An LLM-callable function.
+    Args:
+        name (str): Function name exposed to the model.
+        description (str): What the tool does, as shown to the model.
+        handler (Callable[..., Any]): Called with the model's arguments as keyword arguments.
+        parameters (Optional[Dict[str, Any]]): JSON schema of the arguments, or None for no arguments.
+        timeout (Optional[float]): Seconds before a call is abandoned; None uses the registry default.
+        cacheable (bool): True only for tools whose result depends on nothing but their
+            arguments and remembered state; replies from turns that call any other tool
+            are never stored in the response cache.
+        idempotent (bool): True for tools that are safe to run concurrently with other calls
+            of the same turn; the rest run one after another, in call order.
+        max_concurrency (int): Calls of this tool allowed in flight at once, across turns.
+    """
+    name: str
+    description: str
+    handler: Callable[..., Any]
+    parameters: Optional[Dict[str, Any]] = None
+    timeout: Optional[float] = None
+    cacheable: bool = False
+    idempotent: bool = False
+    max_concurrency: int = 1
+
+    def schema(self) -> Dict[str, Any]:
+        """Return the OpenAI ``tools`` entry for this function."""
+        function: Dict[str, Any] = {"name": self.name, "description": self.description}
+        if self.parameters is not None:
+            function["parameters"] = self.parameters
+        return {"type": "function", "function": function}
+
+
+def tool_error(tool: str, error: str, message: str) -> str:
+    """Serialize a tool failure as the JSON content of a tool message."""
+    return json.dumps({"tool": tool, "error": error, "message": message})
+
+
+def parameters(required: Iterable[str] = (), **properties: str) -> Dict[str, Any]:
+    """
+    Build an object schema of string arguments.
+    Args:
+        required (Iterable[str]): Names of mandatory arguments.
+        **properties (str): Argument name to description.
+    Returns:
+        Dict[str, Any]: The JSON schema.
+    """
+    schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": {name: {"type": "string", "description": desc} for name, desc in properties.items()},
+    }
+    required = list(required)
+    if required:
+        schema["required"] = required
+    return schema
+
+
+class ToolRegistry:
+    """
+    Registry of LLM-callable tools from the core assistant and plugins.
+
+    The ``tools`` payload sent with each chat completion is built once and
+    cached; registering or removing a tool invalidates it.  Calls from one
+    model turn run on a bounded thread pool, each with its own timeout:
+    idempotent tools concurrently, the others serially in call order.  Each
+    tool also has a cap on calls in flight, like plugin command handlers.
+    """
+
+    def __init__(self, max_workers: int = 4, default_timeout: float = 10.0) -> None:
+        """
+        Initialize an empty registry.
+        Args:
+            max_workers (int): Threads available for concurrent tool calls.
+            default_timeout (float): Timeout in seconds for tools that do not set one.
+        """
+        self.default_timeout = default_timeout
+        self.logger = get_logger(__name__)
+        self._tools: Dict[str, Tool] = {}
+        self._payload: Optional[List[Dict[str, Any]]] = None
+        self._slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="tool")
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def register(self, tool: Tool) -> None:
+        """Add a tool, replacing any tool with the same name."""
+        with self._lock:
+            self._tools[tool.name] = tool
+            self._slots[tool.name] = threading.BoundedSemaphore(max(1, tool.max_concurrency))
+            self._payload = None
+
+    def unregister(self, name: str) -> None:
+        """Remove a tool by name; unknown names are ignored."""
+        with self._lock:
+            if self._tools.pop(name, None) is not None:
+                self._slots.pop(name, None)
+                self._payload = None
+
+    def get(self, name: str) -> Optional[Tool]:
+        """Return the tool registered under ``name``, if any."""
+        return self._tools.get(name)
+
+    @property
+    def payload(self) -> List[Dict[str, Any]]:
+        """The cached ``tools`` list for the chat completions API; treat as read-only."""
+        with self._lock:
+            if self._payload is None:
+                self._payload = [tool.schema() for tool in self._tools.values()]
+            return self._payload
+
+    def run_many(self, calls: List[ToolCall]) -> List[str]:
+        """
+        Run one turn's tool calls and return their results in call order.
+        Failures never raise: an unknown tool, an exception or a timeout
+        produces a JSON error (see :func:`tool_error`) for that call only.
+        A timed-out handler keeps its worker thread (and its tool's slot)
+        until it returns.  Time a non-idempotent call spends waiting for the
+        one before it counts toward its timeout.
+        Args:
+            calls (List[ToolCall]): (tool name, keyword arguments) pairs.
+        Returns:
+            List[str]: One tool message content per call.
+        """
+        started = time.monotonic()
+        pending = []
+        previous: Optional[Future] = None
+        for name, args in calls:
+            with self._lock:
+                tool, slot = self._tools.get(name), self._slots.get(name)
+            if tool is None:
+                pending.append((name, None, None))
+                continue
+            future = self._pool.submit(bind_turn(self._call), tool, slot, args, None if tool.idempotent else previous)
+            if not tool.idempotent:
+                previous = future
+            pending.append((name, tool, future))
+        results = []
+        for name, tool, future in pending:
+            if future is None:
+                results.append(tool_error(name, "unknown_tool", f"No tool named '{name}' is registered."))
+                continue
+            timeout = tool.timeout if tool.timeout is not None else self.default_timeout
+            try:
+                result = future.result(timeout=max(0.0, started + timeout - time.monotonic()))
+                results.append(result if isinstance(result, str) else str(result))
+            except FutureTimeout:
+                self.logger.warning(f"Tool '{name}' timed out after {timeout:.1f}s.")
+                results.append(tool_error(name, "timeout", f"'{name}' did not finish within {timeout:g} seconds."))
+            except Exception as e:
+                self.logger.error(f"Tool '{name}' failed: {e}")
+                results.append(tool_error(name, "exception", str(e)))
+        return results
+
+    @staticmethod
+    def _call(tool: Tool, slot: threading.BoundedSemaphore, args: Dict[str, Any], after: Optional[Future]) -> Any:
+        if after is not None:
+            # Earlier calls were submitted first, so waiting here cannot starve them of a worker.
+            wait([after])
+        with slot, span(f"tool:{tool.name}"):
+            return tool.handler(**args)
+
+    def close(self) -> None:
+        """Stop accepting calls; running handlers are not waited for."""
+        self._pool.shutdown(wait=False)
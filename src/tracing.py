@@ -0,0 +1,259 @@
+"""
+Span-based latency tracing for assistant turns.
+
+Stages report into one process-wide tracer:
+
+    with span("llm"):
+        ...
+
+Each span's duration is added to a rolling window per stage (p50/p95/p99
+on demand) and to the breakdown of the turn it ran in, which is logged when
+the turn ends.  The turn is tracked per context (see :func:`bind_turn` for
+work handed to other threads), so overlapping turns keep separate
+breakdowns and spans of a turn that already ended are left out.  Spans
+recorded outside any turn (listening and speech recognition of the next
+utterance) count toward the next turn.  With ``trace_file`` set,
+spans are also written as Chrome trace events, viewable in chrome://tracing
+or Perfetto.  When tracing is disabled ``span`` returns a shared no-op
+context manager.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Optional, TypeVar
+from src.logging import get_logger
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Durations kept per stage for the rolling percentiles.
+TRACE_WINDOW = 1000
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NOOP = _NoopSpan()
+
+
+class TurnTrace:
+    """Stage totals of one turn."""
+    __slots__ = ("id", "started", "stages", "closed")
+
+    def __init__(self, turn_id: int, started: float, stages: Dict[str, float]) -> None:
+        self.id = turn_id
+        self.started = started
+        self.stages = stages
+        self.closed = False
+
+
+_current_turn: "contextvars.ContextVar[Optional[TurnTrace]]" = contextvars.ContextVar("trace_turn", default=None)
+
+
+class _Span:
+    __slots__ = ("tracer", "stage", "started")
+
+    def __init__(self, tracer: "Tracer", stage: str) -> None:
+        self.tracer = tracer
+        self.stage = stage
+
+    def __enter__(self) -> "_Span":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.tracer.record(self.stage, self.started, time.perf_counter())
+
+
+class Tracer:
+    """
+    Collects stage durations into rolling per-stage windows and per-turn totals.
+    """
+
+    def __init__(self, enabled: bool = False, path: str = "", window: int = TRACE_WINDOW) -> None:
+        """
+        Initialize the tracer.
+        Args:
+            enabled (bool): Record spans; when False every span is a no-op.
+            path (str): Chrome trace event file to append spans to, or "" for none.
+            window (int): Durations kept per stage for percentiles.
+        """
+        self.enabled = enabled
+        self.window = window
+        self.logger = get_logger(__name__)
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        # Spans outside any turn; handed to the next turn that begins.
+        self._between: Dict[str, float] = defaultdict(float)
+        self._turn_id = 0
+        self._lock = threading.Lock()
+        self._epoch = time.perf_counter()
+        self._file = None
+        if enabled and path:
+            try:
+                new = not os.path.exists(path) or os.path.getsize(path) == 0
+                self._file = open(path, "a", encoding="utf-8")
+                if new:
+                    # The trace event format allows the array to be left unterminated.
+                    self._file.write("[\n")
+            except OSError as exc:
+                self.logger.warning(f"Trace file {path} unavailable ({exc}); tracing in memory only.")
+
+    def span(self, stage: str) -> Any:
+        """Context manager timing one stage."""
+        return _Span(self, stage) if self.enabled else _NOOP
+
+    def record(self, stage: str, started: float, ended: float, in_turn: bool = True) -> None:
+        """Add a finished span (``perf_counter`` timestamps)."""
+        ms = (ended - started) * 1000
+        trace = _current_turn.get()
+        with self._lock:
+            self._samples[stage].append(ms)
+            if in_turn:
+                if trace is None:
+                    self._between[stage] += ms
+                elif not trace.closed:
+                    trace.stages[stage] += ms
+            if self._file is not None:
+                self._file.write(json.dumps({
+                    "name": stage,
+                    "ph": "X",
+                    "ts": round((started - self._epoch) * 1e6),
+                    "dur": round(ms * 1000),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": {"turn": trace.id if trace is not None else self._turn_id + 1},
+                }) + ",\n")
+
+    def begin_turn(self) -> Optional[TurnTrace]:
+        """
+        Start timing a new turn in the current context.
+        Returns:
+            Optional[TurnTrace]: The turn, or None when tracing is disabled.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._turn_id += 1
+            trace = TurnTrace(self._turn_id, time.perf_counter(), self._between)
+            self._between = defaultdict(float)
+        _current_turn.set(trace)
+        return trace
+
+    def end_turn(self, trace: Optional[TurnTrace] = None) -> Dict[str, float]:
+        """
+        Close a turn and log where its time went.
+        Args:
+            trace (Optional[TurnTrace]): The turn to close; defaults to the current context's.
+        Returns:
+            Dict[str, float]: Milliseconds per stage, plus ``"turn"`` for the wall time.
+        """
+        trace = trace if trace is not None else _current_turn.get()
+        if not self.enabled or trace is None or trace.closed:
+            return {}
+        ended = time.perf_counter()
+        with self._lock:
+            trace.closed = True
+            breakdown = dict(trace.stages)
+        self.record("turn", trace.started, ended, in_turn=False)
+        if _current_turn.get() is trace:
+            _current_turn.set(None)
+        total = (ended - trace.started) * 1000
+        stages = ", ".join(f"{stage} {ms:.0f}" for stage, ms in sorted(breakdown.items(), key=lambda kv: -kv[1]))
+        self.logger.info(f"Turn {trace.id}: {total:.0f} ms ({stages})")
+        breakdown["turn"] = total
+        return breakdown
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Rolling latency percentiles per stage.
+        Returns:
+            Dict[str, Dict[str, float]]: Stage to ``count``, ``p50``, ``p95`` and ``p99`` in milliseconds.
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items() if values}
+        result = {}
+        for stage, values in samples.items():
+            pick = lambda q: values[min(len(values) - 1, int(q * len(values)))]
+            result[stage] = {"count": len(values), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+        return result
+
+    def report(self) -> str:
+        """Format :meth:`summary` as a table."""
+        lines = [f"{'stage':<24} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+        for stage, s in sorted(self.summary().items()):
+            lines.append(f"{stage:<24} {s['count']:>6} {s['p50']:>9.1f} {s['p95']:>9.1f} {s['p99']:>9.1f}")
+        return "\n".join(lines)
+
+    def close(self) -> None:
+        """Log the percentile report and close the trace file."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        if self._samples:
+            self.logger.info("Latency by stage:\n" + self.report())
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_tracer = Tracer()
+
+
+def configure_tracing(settings: Any) -> Tracer:
+    """
+    Replace the process-wide tracer according to the settings.
+    Args:
+        settings: Reads ``tracing``, ``trace_file`` and ``trace_window``.
+    Returns:
+        Tracer: The new tracer.
+    """
+    global _tracer
+    _tracer.close()
+    _tracer = Tracer(
+        enabled=getattr(settings, "tracing", False),
+        path=getattr(settings, "trace_file", ""),
+        window=getattr(settings, "trace_window", TRACE_WINDOW),
+    )
+    return _tracer
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+def span(stage: str) -> Any:
+    """Time a stage with the process-wide tracer."""
+    return _tracer.span(stage) if _tracer.enabled else _NOOP
+
+
+def bind_turn(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Bind ``fn`` to the caller's context, so spans it records on another
+    thread (a pool worker or a helper thread) count toward the caller's turn.
+    """
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def traced(stage: str) -> Callable[[F], F]:
+    """Decorator form of :func:`span`."""
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _tracer.enabled:
+                return fn(*args, **kwargs)
+            with _tracer.span(stage):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorate
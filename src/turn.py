@@ -0,0 +1,41 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+class TurnCancelled(BaseException):
+    """Raised in a turn's worker thread once the user has barged in."""
+
+
+@dataclass
+class Turn:
+    """
+    State of one command being answered.  Created per call to
+    ``PersonalAI.respond`` so overlapping turns (barge-in) never share it.
+    """
+    started: float = field(default_factory=time.perf_counter)
+    cancelled: threading.Event = field(default_factory=threading.Event)
+    # Cleared when the reply depends on a tool whose result must not be cached.
+    cacheable: bool = True
+    first_audio_ms: Optional[float] = None
+
+    def cancel(self) -> None:
+        """Ask the turn to stop at its next check."""
+        self.cancelled.set()
+
+    def check(self) -> None:
+        """Raise :class:`TurnCancelled` if the turn was cancelled."""
+        if self.cancelled.is_set():
+            raise TurnCancelled()
+
+    def mark_first_audio(self) -> Optional[float]:
+        """
+        Record time-to-first-audio, once.
+        Returns:
+            Optional[float]: Milliseconds since the turn started, or None if already recorded.
+        """
+        if self.first_audio_ms is not None:
+            return None
+        self.first_audio_ms = (time.perf_counter() - self.started) * 1000
+        return self.first_audio_ms
@@ -1,9 +1,11 @@
 import io
+import threading
 from src.logging import get_logger
+from src.tracing import span, traced
 import requests
 import pygame
 import speech_recognition as sr
-from typing import Any
+from typing import Any, Callable, Optional
 
 try:
     import pyttsx3
@@ -26,49 +28,105 @@ class VoiceIO:
         self.microphone = sr.Microphone()
         pygame.mixer.init()
         self.logger = get_logger(__name__)
+        self._speak_lock = threading.Lock()
+        self._engine = None
 
-    def speak(self, text: str) -> None:
+    def speak(self, text: str, on_start: Optional[Callable[[], None]] = None) -> None:
         """
         Speak the given text using ElevenLabs TTS or fallback to pyttsx3.
         Args:
             text (str): The text to speak.
+            on_start (Optional[Callable[[], None]]): Called when playback begins.
         """
-        self.logger.info("AI: %s", text)
-        if self.cfg.api_key:
-            try:
-                resp = requests.post(
-                    self.cfg.tts_url,
-                    json={
-                        "text": text,
-                        "model_id": "eleven_monolingual_v1",
-                        "voice_settings": {
-                            "stability": 0.5,
-                            "similarity_boost": 0.75,
-                        },
-                    },
-                    headers={
-                        "Accept": "audio/mpeg",
-                        "Content-Type": "application/json",
-                        "xi-api-key": self.cfg.api_key,
+        self.play(text, self.synthesize(text), on_start)
+
+    @traced("tts.synthesize")
+    def synthesize(self, text: str) -> Optional[bytes]:
+        """
+        Fetch ElevenLabs audio for the text without playing it.
+        Args:
+            text (str): The text to synthesize.
+        Returns:
+            Optional[bytes]: MPEG audio, or None if the offline engine should be used.
+        """
+        if not self.cfg.api_key:
+            return None
+        try:
+            resp = requests.post(
+                self.cfg.tts_url,
+                json={
+                    "text": text,
+                    "model_id": "eleven_monolingual_v1",
+                    "voice_settings": {
+                        "stability": 0.5,
+                        "similarity_boost": 0.75,
                     },
-                    timeout=20,
-                )
-                resp.raise_for_status()
-                pygame.mixer.music.load(io.BytesIO(resp.content))
-                pygame.mixer.music.play()
-                while pygame.mixer.music.get_busy():
-                    pygame.time.wait(120)
-                return
-            except Exception as exc:
-                self.logger.warning(
-                    "ElevenLabs TTS failed: %s – using offline engine", exc
-                )
-        if pyttsx3:
-            engine = pyttsx3.init()
-            engine.say(text)
-            engine.runAndWait()
-        else:
-            self.logger.warning("No TTS engine available. Text will not be spoken.")
+                },
+                headers={
+                    "Accept": "audio/mpeg",
+                    "Content-Type": "application/json",
+                    "xi-api-key": self.cfg.api_key,
+                },
+                timeout=20,
+            )
+            resp.raise_for_status()
+            return resp.content
+        except Exception as exc:
+            self.logger.warning(
+                "ElevenLabs TTS failed: %s – using offline engine", exc
+            )
+            return None
+
+    def play(
+        self,
+        text: str,
+        audio: Optional[bytes] = None,
+        on_start: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Play synthesized audio, or speak the text with the offline engine.
+        Args:
+            text (str): The text being spoken.
+            audio (Optional[bytes]): Audio from :meth:`synthesize`, if any.
+            on_start (Optional[Callable[[], None]]): Called when playback begins.
+        """
+        # Reminders are spoken from the scheduler thread; serialize playback.
+        with self._speak_lock, span("tts.play"):
+            self.logger.info("AI: %s", text)
+            if audio is not None:
+                try:
+                    pygame.mixer.music.load(io.BytesIO(audio))
+                    if on_start:
+                        on_start()
+                    pygame.mixer.music.play()
+                    while pygame.mixer.music.get_busy():
+                        pygame.time.wait(120)
+                    return
+                except Exception as exc:
+                    self.logger.warning(
+                        "Audio playback failed: %s – using offline engine", exc
+                    )
+            if pyttsx3:
+                engine = self._engine = pyttsx3.init()
+                engine.say(text)
+                if on_start:
+                    on_start()
+                try:
+                    engine.runAndWait()
+                finally:
+                    self._engine = None
+            else:
+                self.logger.warning("No TTS engine available. Text will not be spoken.")
+
+    def stop(self) -> None:
+        """Cut off whatever is playing right now (used when the user barges in)."""
+        try:
+            pygame.mixer.music.stop()
+        except Exception as exc:
+            self.logger.debug("Could not stop playback: %s", exc)
+        engine = self._engine
+        if engine is not None:
+            engine.stop()
 
     def listen(self) -> str:
         """
@@ -81,12 +139,14 @@ class VoiceIO:
                 src, duration=self.cfg.ambient_adjust_sec
             )
             try:
-                audio = self.recognizer.listen(
-                    src,
-                    timeout=self.cfg.listen_timeout,
-                    phrase_time_limit=self.cfg.phrase_time_limit,
-                )
-                return self.recognizer.recognize_google(audio).lower()
+                with span("listen"):
+                    audio = self.recognizer.listen(
+                        src,
+                        timeout=self.cfg.listen_timeout,
+                        phrase_time_limit=self.cfg.phrase_time_limit,
+                    )
+                with span("stt"):
+                    return self.recognizer.recognize_google(audio).lower()
             except (sr.WaitTimeoutError, sr.UnknownValueError):
                 return ""
             except sr.RequestError as err:
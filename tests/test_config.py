@@ -0,0 +1,54 @@
+import src.config as config
+from src.config import Settings
+
+FALSY_YAML = """\
+lazy_plugins: false
+memory_flush_interval_ms: 0
+barge_in: false
+intent_routing: false
+embedding_cache_size: 0
+archive_interactions: false
+embedding_rescore: false
+embedding_cache_persist: false
+"""
+
+
+def test_falsy_yaml_values_are_kept(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text(FALSY_YAML, encoding="utf-8")
+    monkeypatch.setattr(config, "CONFIG_YAML", str(path))
+    for key in ("LAZY_PLUGINS", "MEMORY_FLUSH_INTERVAL_MS", "BARGE_IN", "INTENT_ROUTING",
+                "EMBEDDING_CACHE_SIZE", "ARCHIVE_INTERACTIONS", "EMBEDDING_RESCORE",
+                "EMBEDDING_CACHE_PERSIST"):
+        monkeypatch.delenv(key, raising=False)
+
+    cfg = Settings.load()
+
+    assert cfg.lazy_plugins is False
+    assert cfg.memory_flush_interval_ms == 0
+    assert cfg.barge_in is False
+    assert cfg.intent_routing is False
+    assert cfg.embedding_cache_size == 0
+    assert cfg.archive_interactions is False
+    assert cfg.embedding_rescore is False
+    assert cfg.embedding_cache_persist is False
+
+
+def test_missing_yaml_keys_use_defaults(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "CONFIG_YAML", str(tmp_path / "absent.yaml"))
+    monkeypatch.delenv("LAZY_PLUGINS", raising=False)
+    monkeypatch.delenv("EMBEDDING_CACHE_SIZE", raising=False)
+
+    cfg = Settings.load()
+
+    assert cfg.lazy_plugins is True
+    assert cfg.embedding_cache_size == 1024
+
+
+def test_environment_overrides_yaml(tmp_path, monkeypatch):
+    path = tmp_path / "config.yaml"
+    path.write_text("barge_in: true\n", encoding="utf-8")
+    monkeypatch.setattr(config, "CONFIG_YAML", str(path))
+    monkeypatch.setenv("BARGE_IN", "false")
+
+    assert Settings.load().barge_in is False